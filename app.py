@@ -1,5 +1,20 @@
 # app.py - Complete version with all features
 from schedule_requests import SCHEDULE_REQUESTS
+from metrics import METRICS, init_app as init_metrics
+from sync_trace import SyncTrace, SYNC_TRACES
+from snapshot import load_data_file
+from roster_store import RosterStore, parse_month_key
+from roster_overlay import RosterOverlay
+from wire_format import encode_roster, dumps_compact, COMPACT_FORMAT
+from roster_projection import RosterProjection, ProjectionError, parse_list
+from employee_search import EMPLOYEE_SEARCH
+from employee_summary import EMPLOYEE_SUMMARIES
+from employee_index import EmployeeIndex
+from shift_catalog import SHIFT_CATALOG
+from roster_history import ROSTER_HISTORY, RosterHistoryError, parse_as_of
+from retention import ARCHIVES, compact_modifications, cutoff_month, cutoff_time
+from overlay_history import OverlayHistory
+from employee_bulk import apply_rows, BulkEmployeeError
 from flask import Flask, render_template, send_from_directory, request, jsonify, session, redirect, url_for
 import os
 import json
@@ -9,9 +24,16 @@ import io
 import copy
 import calendar
 import re
+import logging
+import threading
+from log_config import setup_logging
+
+setup_logging()
+logger = logging.getLogger('app')  # not __name__, which is __main__ when run directly
 
 app = Flask(__name__)
 app.secret_key = 'your-secret-key-here'  # Change this in production
+init_metrics(app, METRICS)
 
 # Admin authentication
 ADMIN_USERS = {
@@ -21,7 +43,7 @@ ADMIN_USERS = {
 
 # Data storage
 GOOGLE_SYNCED_DATA = {}      # Original data from Google Sheets
-ADMIN_MODIFIED_DATA = {}     # Admin-modified data
+ADMIN_MODIFIED_DATA = {}     # Admin view: Google data + ADMIN_OVERLAY (read-only, rebuilt by update_display_data)
 CURRENT_DISPLAY_DATA = {}    # Combined data for roster viewer
 MODIFIED_SHIFTS_DATA = {}    # Track modified shifts history
 GOOGLE_SHEETS_LINKS = {}     # Store Google Sheets links by month
@@ -30,78 +52,153 @@ GOOGLE_SHEETS_LINKS = {}     # Store Google Sheets links by month
 DATA_DIR = 'data'
 GOOGLE_DATA_FILE = os.path.join(DATA_DIR, 'google_data.json')
 ADMIN_DATA_FILE = os.path.join(DATA_DIR, 'admin_data.json')
+ADMIN_OVERLAY_FILE = os.path.join(DATA_DIR, 'admin_overlay.json')
 MODIFIED_SHIFTS_FILE = os.path.join(DATA_DIR, 'modified_shifts.json')
 GOOGLE_LINKS_FILE = os.path.join(DATA_DIR, 'google_links.json')
+ROSTER_DIR = os.path.join(DATA_DIR, 'roster')
+
+# Google data is always mirrored to binary snapshots (see snapshot.py);
+# set ROSTER_WRITE_JSON=0 to skip writing the JSON partition files on every save
+WRITE_JSON_DATA = os.environ.get('ROSTER_WRITE_JSON', '1') != '0'
+
+# Month-partitioned storage; google_data.json is only read to migrate
+GOOGLE_STORE = RosterStore(ROSTER_DIR, 'google', write_json=WRITE_JSON_DATA)
+# Admin changes are a sparse overlay on Google data (see roster_overlay.py);
+# admin_data.json and data/roster/admin/ are only read to migrate
+ADMIN_OVERLAY = RosterOverlay(ADMIN_OVERLAY_FILE)
+OVERLAY_HISTORY = OverlayHistory(ADMIN_OVERLAY)   # undo/redo of admin edits
+LEGACY_ADMIN_STORE = RosterStore(ROSTER_DIR, 'admin', write_json=False)
+
+# id -> (team, position, employee) for the Google data and the admin/display view
+GOOGLE_INDEX = EmployeeIndex('google')
+ADMIN_INDEX = EmployeeIndex('admin')
+
+# Bumped by every update_display_data(); derived caches (coverage) key on it
+ROSTER_VERSION = 0
+
+# Data files are loaded on the first request instead of at import
+_data_loaded = False
+_data_load_lock = threading.Lock()
 
 def ensure_data_dir():
     """Ensure data directory exists"""
     if not os.path.exists(DATA_DIR):
         os.makedirs(DATA_DIR)
 
-def save_google_data():
-    """Save Google data to file"""
+def save_roster(store, data, months=None):
+    """Write changed month partitions; returns (written, data without inactive months)
+
+    The trimmed dataset is a new object when months were evicted, for the
+    caller to swap in: data itself may be shared with the current view."""
+    ensure_data_dir()
+    written = store.save(data, months=months, known_keys=GOOGLE_SHEETS_LINKS.keys())
+    return written, store.evict_inactive(data, known_keys=GOOGLE_SHEETS_LINKS.keys())
+
+def date_month_keys(store, data, date_indexes):
+    """Get the partition keys touched by edits at the given date indexes"""
+    headers = data.get('headers', [])
+    return {store.month_key(headers[i], GOOGLE_SHEETS_LINKS.keys()) for i in date_indexes if 0 <= i < len(headers)}
+
+def roster_month_key(header):
+    """Get the month partition key of a date header"""
+    return GOOGLE_STORE.month_key(header, GOOGLE_SHEETS_LINKS.keys())
+
+@METRICS.timed('save_google_data')
+def save_google_data(months=None):
+    """Save Google data to file (only the given month partitions when months is set);
+    callers rebuild the view afterwards, as months may have been evicted"""
+    global GOOGLE_SYNCED_DATA
     try:
-        ensure_data_dir()
-        with open(GOOGLE_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(GOOGLE_SYNCED_DATA, f, indent=2, ensure_ascii=False)
-        print("Google data saved successfully")
-    except Exception as e:
-        print(f"Error saving Google data: {e}")
+        written, GOOGLE_SYNCED_DATA = save_roster(GOOGLE_STORE, GOOGLE_SYNCED_DATA, months)
+        logger.debug("Google data saved", extra={'partitions': written})
+    except Exception:
+        logger.exception("Error saving Google data", extra={'directory': GOOGLE_STORE.directory})
 
+@METRICS.timed('save_admin_data')
 def save_admin_data():
-    """Save admin data to file"""
+    """Save the admin overlay to file"""
     try:
         ensure_data_dir()
-        with open(ADMIN_DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(ADMIN_MODIFIED_DATA, f, indent=2, ensure_ascii=False)
-        print("Admin data saved successfully")
-    except Exception as e:
-        print(f"Error saving admin data: {e}")
+        ADMIN_OVERLAY.save()
+        logger.debug("Admin overlay saved", extra={'file': ADMIN_OVERLAY_FILE})
+    except Exception:
+        logger.exception("Error saving admin overlay", extra={'file': ADMIN_OVERLAY_FILE})
 
+@METRICS.timed('save_modified_shifts')
 def save_modified_shifts():
     """Save modified shifts data to file"""
     try:
         ensure_data_dir()
         with open(MODIFIED_SHIFTS_FILE, 'w', encoding='utf-8') as f:
             json.dump(MODIFIED_SHIFTS_DATA, f, indent=2, ensure_ascii=False)
-        print("Modified shifts data saved successfully")
-    except Exception as e:
-        print(f"Error saving modified shifts data: {e}")
+        logger.debug("Modified shifts data saved", extra={'file': MODIFIED_SHIFTS_FILE})
+    except Exception:
+        logger.exception("Error saving modified shifts data", extra={'file': MODIFIED_SHIFTS_FILE})
 
+@METRICS.timed('save_google_links')
 def save_google_links():
     """Save Google Sheets links to file"""
     try:
         ensure_data_dir()
         with open(GOOGLE_LINKS_FILE, 'w', encoding='utf-8') as f:
             json.dump(GOOGLE_SHEETS_LINKS, f, indent=2, ensure_ascii=False)
-        print("Google links saved successfully")
-    except Exception as e:
-        print(f"Error saving Google links: {e}")
+        logger.debug("Google links saved", extra={'file': GOOGLE_LINKS_FILE})
+    except Exception:
+        logger.exception("Error saving Google links", extra={'file': GOOGLE_LINKS_FILE})
+
+def read_json_file(path):
+    """Read a JSON data file"""
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def load_roster(store, legacy_file):
+    """Load the active months of a partitioned roster, migrating a legacy single-file roster first"""
+    if store.exists():
+        return store.load()
+    
+    data = load_data_file(legacy_file, read_json_file)
+    if data is None:
+        return None
+    logger.info("Migrating roster to month partitions", extra={'file': legacy_file, 'directory': store.directory})
+    _, data = save_roster(store, data)
+    return data
 
 def load_google_data():
-    """Load Google data from file"""
+    """Load Google data from its month partitions"""
     global GOOGLE_SYNCED_DATA
     try:
-        if os.path.exists(GOOGLE_DATA_FILE):
-            with open(GOOGLE_DATA_FILE, 'r', encoding='utf-8') as f:
-                GOOGLE_SYNCED_DATA = json.load(f)
-            print("Google data loaded successfully")
+        data = load_roster(GOOGLE_STORE, GOOGLE_DATA_FILE)
+        if data is not None:
+            GOOGLE_SYNCED_DATA = data
+            logger.info("Google data loaded", extra={'months': GOOGLE_STORE.resident_months})
             return True
-    except Exception as e:
-        print(f"Error loading Google data: {e}")
+    except Exception:
+        logger.exception("Error loading Google data", extra={'directory': GOOGLE_STORE.directory})
     return False
 
 def load_admin_data():
-    """Load admin data from file"""
-    global ADMIN_MODIFIED_DATA
+    """Load the admin overlay, migrating a legacy full admin roster first (call after load_google_data)"""
     try:
-        if os.path.exists(ADMIN_DATA_FILE):
-            with open(ADMIN_DATA_FILE, 'r', encoding='utf-8') as f:
-                ADMIN_MODIFIED_DATA = json.load(f)
-            print("Admin data loaded successfully")
+        if ADMIN_OVERLAY.load():
+            logger.info("Admin overlay loaded", extra=ADMIN_OVERLAY.stats())
             return True
-    except Exception as e:
-        print(f"Error loading admin data: {e}")
+        
+        if LEGACY_ADMIN_STORE.exists():
+            legacy_data = LEGACY_ADMIN_STORE.load()
+        else:
+            legacy_data = load_data_file(ADMIN_DATA_FILE, read_json_file)
+        if legacy_data is None:
+            return False
+        
+        # Migrate into the existing instance: OVERLAY_HISTORY records through it
+        migrated = RosterOverlay.from_diff(ADMIN_OVERLAY_FILE, GOOGLE_SYNCED_DATA, legacy_data, roster_month_key)
+        ADMIN_OVERLAY.replace(migrated.data)
+        OVERLAY_HISTORY.clear()
+        save_admin_data()
+        logger.info("Migrated admin roster to an overlay", extra=ADMIN_OVERLAY.stats())
+        return True
+    except Exception:
+        logger.exception("Error loading admin overlay", extra={'file': ADMIN_OVERLAY_FILE})
     return False
 
 def load_modified_shifts():
@@ -111,7 +208,7 @@ def load_modified_shifts():
         if os.path.exists(MODIFIED_SHIFTS_FILE):
             with open(MODIFIED_SHIFTS_FILE, 'r', encoding='utf-8') as f:
                 MODIFIED_SHIFTS_DATA = json.load(f)
-            print("Modified shifts data loaded successfully")
+            logger.info("Modified shifts data loaded", extra={'file': MODIFIED_SHIFTS_FILE})
             return True
         else:
             MODIFIED_SHIFTS_DATA = {
@@ -119,8 +216,8 @@ def load_modified_shifts():
                 'monthly_stats': {}
             }
             return True
-    except Exception as e:
-        print(f"Error loading modified shifts data: {e}")
+    except Exception:
+        logger.exception("Error loading modified shifts data", extra={'file': MODIFIED_SHIFTS_FILE})
         MODIFIED_SHIFTS_DATA = {
             'modifications': [],
             'monthly_stats': {}
@@ -134,76 +231,126 @@ def load_google_links():
         if os.path.exists(GOOGLE_LINKS_FILE):
             with open(GOOGLE_LINKS_FILE, 'r', encoding='utf-8') as f:
                 GOOGLE_SHEETS_LINKS = json.load(f)
-            print("Google links loaded successfully")
+            logger.info("Google links loaded", extra={'file': GOOGLE_LINKS_FILE})
             return True
         else:
             GOOGLE_SHEETS_LINKS = {}
             return True
-    except Exception as e:
-        print(f"Error loading Google links: {e}")
+    except Exception:
+        logger.exception("Error loading Google links", extra={'file': GOOGLE_LINKS_FILE})
         GOOGLE_SHEETS_LINKS = {}
     return False
 
 def update_data_loader_urls():
     """Update the data loader with current Google Sheets URLs"""
     try:
-        from data_loader import DATA_LOADER
-        
         # The DataLoader now reloads URLs automatically in loadAllCSVData()
         # So we don't need to manually set them
         urls = list(GOOGLE_SHEETS_LINKS.values())
-        print(f"Google Sheets URLs available: {len(urls)} URLs")
-        print(f"URLs: {urls}")
+        logger.info("Google Sheets URLs available", extra={'url_count': len(urls)})
+        logger.debug("Google Sheets URLs", extra={'urls': urls})
         
         return True
-    except Exception as e:
-        print(f"Error in update_data_loader_urls: {e}")
+    except Exception:
+        logger.exception("Error in update_data_loader_urls")
         return False
 
 def deep_copy_data(data):
     """Create a deep copy of the data structure"""
     return copy.deepcopy(data)
 
+@METRICS.timed('update_display_data')
 def update_display_data():
-    """Combine Google data and admin modifications for display - FIXED VERSION"""
-    global CURRENT_DISPLAY_DATA
-    
-    if not GOOGLE_SYNCED_DATA:
-        CURRENT_DISPLAY_DATA = deep_copy_data(ADMIN_MODIFIED_DATA)
-        return
-    
-    # Start with Google data as base
-    CURRENT_DISPLAY_DATA = deep_copy_data(GOOGLE_SYNCED_DATA)
-    
-    # Apply admin modifications where they exist
-    if ADMIN_MODIFIED_DATA.get('teams'):
-        for team_name, admin_team in ADMIN_MODIFIED_DATA['teams'].items():
-            if team_name in CURRENT_DISPLAY_DATA['teams']:
-                # Update team structure first
-                CURRENT_DISPLAY_DATA['teams'][team_name] = deep_copy_data(admin_team)
-            else:
-                # Add new team if it doesn't exist in Google data
-                CURRENT_DISPLAY_DATA['teams'][team_name] = deep_copy_data(admin_team)
-        
-        # Remove teams that were deleted in admin data
-        teams_to_remove = []
-        for team_name in CURRENT_DISPLAY_DATA['teams']:
-            if team_name not in ADMIN_MODIFIED_DATA['teams']:
-                teams_to_remove.append(team_name)
-        
-        for team_name in teams_to_remove:
-            del CURRENT_DISPLAY_DATA['teams'][team_name]
-    
-    # Update allEmployees list
-    all_employees = []
-    for team_name, employees in CURRENT_DISPLAY_DATA['teams'].items():
-        for emp in employees:
-            emp['currentTeam'] = team_name
-            all_employees.append(emp)
-    CURRENT_DISPLAY_DATA['allEmployees'] = all_employees
-
-def track_modified_shift(employee_id, date_index, old_shift, new_shift, employee_name, team_name, date_header, modified_by):
-    """Track when a shift is modified"""
+    """Rebuild the admin/display view as Google data + admin overlay"""
+    global CURRENT_DISPLAY_DATA, ADMIN_MODIFIED_DATA, ROSTER_VERSION
+    
+    # Unchanged employees are shared with GOOGLE_SYNCED_DATA, not copied
+    with METRICS.timer('update_display_data.apply_overlay'):
+        view = ADMIN_OVERLAY.apply(GOOGLE_SYNCED_DATA or {}, roster_month_key)
+    
+    ADMIN_MODIFIED_DATA = view
+    CURRENT_DISPLAY_DATA = view
+    ROSTER_VERSION += 1
+    with METRICS.timer('update_display_data.index'):
+        ADMIN_INDEX.build(view)
+    try:
+        ROSTER_HISTORY.maybe_checkpoint(view)
+    except Exception:
+        logger.exception("Error writing roster checkpoint", extra={'reason': 'periodic'})
+
+def checkpoint_roster(reason):
+    """Checkpoint the display roster after a change that is not a cell edit (coalesced)"""
+    try:
+        ROSTER_HISTORY.structural_change(CURRENT_DISPLAY_DATA, reason)
+    except Exception:
+        logger.exception("Error writing roster checkpoint", extra={'reason': reason})
+
+def employee_index(data):
+    """Get the up-to-date id index of GOOGLE_SYNCED_DATA or the admin/display view"""
+    if data is GOOGLE_SYNCED_DATA:
+        return GOOGLE_INDEX.ensure(data)
+    if data is ADMIN_MODIFIED_DATA:
+        return ADMIN_INDEX.ensure(data)
+    return EmployeeIndex('adhoc').build(data)
+
+def find_employee(data, employee_id):
+    """Find (team name, employee) by id in a roster dataset"""
+    return employee_index(data).find(employee_id)
+
+def shift_lookup(data):
+    """Get a (employee id, date header) -> shift function over a roster dataset;
+    it returns None for an unknown employee or date"""
+    date_positions = {header: i for i, header in enumerate(data.get('headers', []))}
+    index = employee_index(data)
+    
+    def current_shift(employee_id, date):
+        _, employee = index.find(employee_id)
+        date_index = date_positions.get(date)
+        if employee is None or date_index is None:
+            return None
+        schedule = employee.get('schedule', [])
+        return schedule[date_index] if date_index < len(schedule) else ''
+    return current_shift
+
+def reindex_employee(employee_id, old_id=None):
+    """Refresh one employee's search entry and summary from the display view"""
+    if old_id and old_id != employee_id:
+        EMPLOYEE_SEARCH.remove(old_id)
+    team_name, employee = find_employee(CURRENT_DISPLAY_DATA, employee_id)
+    if employee:
+        EMPLOYEE_SEARCH.add(employee_id, employee.get('name', ''), team_name)
+    else:
+        EMPLOYEE_SEARCH.remove(employee_id)
+    EMPLOYEE_SUMMARIES.refresh_employee(employee_id, employee, old_id=old_id if old_id != employee_id else None)
+
+def unindex_employee(employee_id):
+    """Drop a deleted employee from the search index and summaries"""
+    EMPLOYEE_SEARCH.remove(employee_id)
+    EMPLOYEE_SUMMARIES.remove(employee_id)
+
+def google_shift(employee_id, date_index):
+    """Google's value for an admin cell, '' if Google has no such employee or date"""
+    _, google_employee = find_employee(GOOGLE_SYNCED_DATA, ADMIN_OVERLAY.base_id(employee_id))
+    if google_employee and date_index < len(google_employee.get('schedule', [])):
+        return google_employee['schedule'][date_index]
+    return ''
+
+def set_admin_shift(employee_id, date_index, new_shift):
+    """Override one admin cell; returns the previous admin shift"""
+    headers = ADMIN_MODIFIED_DATA.get('headers', [])
+    header = headers[date_index]
+    _, employee = find_employee(ADMIN_MODIFIED_DATA, employee_id)
+    old_shift = employee['schedule'][date_index] if employee and date_index < len(employee['schedule']) else ''
+    
+    # Setting the cell back to Google's value removes the override
+    base_shift = google_shift(employee_id, date_index)
+    ADMIN_OVERLAY.set_shift(employee_id, roster_month_key(header), header, new_shift, base_shift=base_shift)
+    EMPLOYEE_SUMMARIES.update_cell(employee_id, roster_month_key(header), old_shift, new_shift)
+    ROSTER_HISTORY.record_cell(employee_id, header, old_shift, new_shift)
+    return old_shift
+
+def track_modified_shift(employee_id, date_index, old_shift, new_shift, employee_name, team_name, date_header, modified_by, save=True):
+    """Track when a shift is modified; batch callers pass save=False and call save_tracked_shifts() once"""
     modification = {
         'employee_id': employee_id,
         'employee_name': employee_name,
@@ -246,23 +393,40 @@ def track_modified_shift(employee_id, date_index, old_shift, new_shift, employee
     # Convert set to list for JSON serialization
     stats['employees_modified'] = list(stats['employees_modified'])
     
+    if save:
+        save_tracked_shifts()
+
+def save_tracked_shifts():
+    """Persist tracked modifications, archiving old ones first when retention is due"""
+    if not apply_retention():
+        save_modified_shifts()
+
+_retention_day = None
+
+def apply_retention(force=False):
+    """Archive old modifications and resolved requests, at most once a day
+    unless forced; returns the counts moved, or None when it did not run"""
+    global _retention_day
+    today = datetime.now().date()
+    if not force and _retention_day == today:
+        return None
+    _retention_day = today
+    try:
+        moved = {
+            'modifications': compact_modifications(MODIFIED_SHIFTS_DATA, ARCHIVES, cutoff_month()),
+            'requests': SCHEDULE_REQUESTS.archive_resolved(ARCHIVES, cutoff_time())
+        }
+    except Exception:
+        logger.exception("Error archiving history")
+        return None
     save_modified_shifts()
+    if any(moved.values()):
+        logger.info("History archived", extra=moved)
+    return moved
 
 def get_shift_display(shift_code):
     """Get human-readable shift display"""
-    shift_map = {
-        "M2": "8 AM – 5 PM",
-        "M3": "9 AM – 6 PM",
-        "M4": "10 AM – 7 PM",
-        "D1": "12 PM – 9 PM",
-        "D2": "1 PM – 10 PM",
-        "DO": "OFF",
-        "SL": "Sick Leave",
-        "CL": "Casual Leave",
-        "EL": "Emergency Leave",
-        "": "N/A"
-    }
-    return shift_map.get(shift_code, shift_code)
+    return SHIFT_CATALOG.display(shift_code)
 
 def extract_month_from_headers(headers):
     """Extract month from date headers"""
@@ -335,27 +499,23 @@ def apply_shift_change(request_data):
     new_shift = request_data['requested_shift']
     
     # Find employee in admin data
-    for team_name, employees in ADMIN_MODIFIED_DATA.get('teams', {}).items():
-        for employee in employees:
-            if employee['id'] == employee_id:
-                # Find date index
-                if date in ADMIN_MODIFIED_DATA.get('headers', []):
-                    date_index = ADMIN_MODIFIED_DATA['headers'].index(date)
-                    if date_index < len(employee['schedule']):
-                        # Update the shift
-                        employee['schedule'][date_index] = new_shift
-                        # Track the modification
-                        track_modified_shift(
-                            employee_id=employee_id,
-                            date_index=date_index,
-                            old_shift=request_data['current_shift'],
-                            new_shift=new_shift,
-                            employee_name=employee['name'],
-                            team_name=team_name,
-                            date_header=date,
-                            modified_by=f"Schedule Request (Approved by {request_data.get('approved_by', 'admin')})"
-                        )
-                break
+    team_name, employee = find_employee(ADMIN_MODIFIED_DATA, employee_id)
+    if employee and date in ADMIN_MODIFIED_DATA.get('headers', []):
+        date_index = ADMIN_MODIFIED_DATA['headers'].index(date)
+        if date_index < len(employee['schedule']):
+            # Update the shift
+            set_admin_shift(employee_id, date_index, new_shift)
+            # Track the modification
+            track_modified_shift(
+                employee_id=employee_id,
+                date_index=date_index,
+                old_shift=request_data['current_shift'],
+                new_shift=new_shift,
+                employee_name=employee['name'],
+                team_name=team_name,
+                date_header=date,
+                modified_by=f"Schedule Request (Approved by {request_data.get('approved_by', 'admin')})"
+            )
 
 def apply_swap(request_data):
     """Apply approved swap to admin data"""
@@ -364,19 +524,8 @@ def apply_swap(request_data):
     date = request_data['date']
     
     # Find both employees in admin data
-    requester_employee = None
-    target_employee = None
-    requester_team = None
-    target_team = None
-    
-    for team_name, employees in ADMIN_MODIFIED_DATA.get('teams', {}).items():
-        for employee in employees:
-            if employee['id'] == requester_id:
-                requester_employee = employee
-                requester_team = team_name
-            if employee['id'] == target_id:
-                target_employee = employee
-                target_team = team_name
+    requester_team, requester_employee = find_employee(ADMIN_MODIFIED_DATA, requester_id)
+    target_team, target_employee = find_employee(ADMIN_MODIFIED_DATA, target_id)
     
     if requester_employee and target_employee and date in ADMIN_MODIFIED_DATA.get('headers', []):
         date_index = ADMIN_MODIFIED_DATA['headers'].index(date)
@@ -386,8 +535,8 @@ def apply_swap(request_data):
             requester_old_shift = requester_employee['schedule'][date_index]
             target_old_shift = target_employee['schedule'][date_index]
             
-            requester_employee['schedule'][date_index] = target_old_shift
-            target_employee['schedule'][date_index] = requester_old_shift
+            set_admin_shift(requester_id, date_index, target_old_shift)
+            set_admin_shift(target_id, date_index, requester_old_shift)
             
             # Track modifications for both employees
             track_modified_shift(
@@ -412,14 +561,33 @@ def apply_swap(request_data):
                 modified_by=f"Swap Request (Approved by {request_data.get('approved_by', 'admin')})"
             )
 
-# Load data on startup
+def ensure_data_loaded():
+    """Load all data files once, on first use rather than at import"""
+    global _data_loaded
+    if _data_loaded:
+        return
+    with _data_load_lock:
+        if _data_loaded:
+            return
+        with METRICS.timer('load_all_data'):
+            load_google_links()  # first, its month keys date the roster partitions
+            load_google_data()
+            load_admin_data()
+            load_modified_shifts()
+            apply_retention(force=True)
+            ROSTER_HISTORY.load()
+            update_data_loader_urls()  # NEW: Update data loader with URLs
+            update_display_data()
+            EMPLOYEE_SEARCH.rebuild(CURRENT_DISPLAY_DATA)
+            EMPLOYEE_SUMMARIES.rebuild(CURRENT_DISPLAY_DATA, roster_month_key)
+        _data_loaded = True
+
 ensure_data_dir()
-load_google_data()
-load_admin_data()
-load_modified_shifts()
-load_google_links()
-update_data_loader_urls()  # NEW: Update data loader with URLs
-update_display_data()
+
+@app.before_request
+def load_data_before_request():
+    """Make sure data files are loaded before any handler reads them"""
+    ensure_data_loaded()
 
 @app.route('/')
 def index():
@@ -473,8 +641,10 @@ def sync_google_sheets():
     if not session.get('admin_logged_in'):
         return jsonify({'error': 'Unauthorized'}), 401
     
+    trace = None
     try:
         from data_loader import DATA_LOADER
+        from sync_merge import merge_sync
         
         # Update data loader with current URLs before syncing
         update_data_loader_urls()
@@ -486,64 +656,108 @@ def sync_google_sheets():
                 'error': 'No Google Sheets links configured. Please add links in "Google Sheets Links Management" first.'
             })
         
-        print(f"Syncing from {len(GOOGLE_SHEETS_LINKS)} Google Sheets URLs...")
+        logger.info("Syncing Google Sheets", extra={'sheet_count': len(GOOGLE_SHEETS_LINKS)})
+        
+        trace = SyncTrace(triggered_by=session.get('admin_username', 'unknown'))
         
         # Load data from Google Sheets
-        google_data = DATA_LOADER.loadAllCSVData()
+        with trace.phase('load_all_csv_data'):
+            google_data = DATA_LOADER.loadAllCSVData(trace=trace)
         
         # Store in Google synced data
         global GOOGLE_SYNCED_DATA
-        GOOGLE_SYNCED_DATA = deep_copy_data(google_data)
+        previous_google = GOOGLE_SYNCED_DATA
+        with trace.phase('copy_google_data'):
+            GOOGLE_SYNCED_DATA = deep_copy_data(google_data)
         
         # Save to file
-        save_google_data()
+        with trace.phase('save_google_data'):
+            save_google_data()
         
-        # Initialize admin modified data structure if empty
-        global ADMIN_MODIFIED_DATA
-        if not ADMIN_MODIFIED_DATA:
-            ADMIN_MODIFIED_DATA = deep_copy_data(google_data)
-            save_admin_data()
-        else:
-            # Merge new employees from Google data into admin modified data
-            for team_name, google_team in google_data['teams'].items():
-                if team_name not in ADMIN_MODIFIED_DATA['teams']:
-                    ADMIN_MODIFIED_DATA['teams'][team_name] = []
-                
-                for google_employee in google_team:
-                    employee_exists = False
-                    for admin_employee in ADMIN_MODIFIED_DATA['teams'][team_name]:
-                        if admin_employee['id'] == google_employee['id']:
-                            employee_exists = True
-                            break
-                    
-                    if not employee_exists:
-                        ADMIN_MODIFIED_DATA['teams'][team_name].append(deep_copy_data(google_employee))
-            
+        # Fold the new Google data into the admin overlay; the admin view is
+        # then rebuilt as Google data + overlay, keeping every admin override
+        with trace.phase('sync_merge'):
+            merge = merge_sync(ADMIN_OVERLAY, previous_google, GOOGLE_SYNCED_DATA)
+        trace.count('new_employees', merge['counts']['newEmployees'])
+        trace.count('moved_employees', merge['counts']['movedEmployees'])
+        trace.count('headers_added', merge['counts']['headersAdded'])
+        if any(merge['overlay'][name] for name in ('adopted', 'teamOverridesDropped', 'deletionsDropped')):
             save_admin_data()
+        # Undo steps were taken against the previous Google data
+        OVERLAY_HISTORY.clear()
         
-        update_display_data()
+        previous_view = CURRENT_DISPLAY_DATA
+        with trace.phase('update_display_data'):
+            update_display_data()
+        with trace.phase('search_index'):
+            EMPLOYEE_SEARCH.rebuild(CURRENT_DISPLAY_DATA)
+        with trace.phase('employee_summaries'):
+            EMPLOYEE_SUMMARIES.sync(previous_view, CURRENT_DISPLAY_DATA, roster_month_key)
+        with trace.phase('checkpoint'):
+            checkpoint_roster('sync')
+        
+        trace.finish('success')
+        SYNC_TRACES.add(trace)
         
         return jsonify({
             'success': True, 
-            'message': f'Google Sheets synced successfully. Loaded {len(google_data.get("allEmployees", []))} employees from {len(GOOGLE_SHEETS_LINKS)} sheets.'
+            'message': f'Google Sheets synced successfully. Loaded {len(google_data.get("allEmployees", []))} employees from {len(GOOGLE_SHEETS_LINKS)} sheets.',
+            'merge': merge,
+            'trace': trace.to_dict()
         })
     except Exception as e:
-        import traceback
-        error_details = traceback.format_exc()
-        print(f"Google Sheets sync error: {error_details}")
+        logger.exception("Google Sheets sync error")
+        if trace:
+            trace.finish('error', str(e))
+            SYNC_TRACES.add(trace)
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/admin/api/sync-traces')
+def get_sync_traces():
+    """Get recent Google Sheets sync traces, newest first"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    limit = request.args.get('limit', type=int)
+    return jsonify({'success': True, 'traces': SYNC_TRACES.recent(limit)})
+
+def roster_response(data, extra=None):
+    """Respond with a roster, projected by ?teams/employees/month/start/end and
+    in the compact wire format when ?format=compact; extra fields are added
+    to the payload"""
+    projection = RosterProjection.from_args(request.args)
+    date_offset = None
+    if not projection.is_empty():
+        try:
+            data = projection.apply(data, roster_month_key)
+        except ProjectionError as e:
+            return jsonify({'error': str(e)}), 400
+        date_offset = data['dateOffset']
+    
+    if request.args.get('format') == COMPACT_FORMAT:
+        payload = encode_roster(data)
+        if date_offset is not None:
+            payload['dateOffset'] = date_offset
+        payload.update(extra or {})
+        return app.response_class(dumps_compact(payload), mimetype='application/json')
+    
+    payload = {
+        'teams': data.get('teams', {}),
+        'headers': data.get('headers', []),
+        'allEmployees': data.get('allEmployees', [])
+    }
+    if date_offset is not None:
+        payload['dateOffset'] = date_offset
+    payload.update(extra or {})
+    return jsonify(payload)
+
 @app.route('/admin/api/get-google-data')
 def get_google_data():
     """Get Google synced data for admin panel"""
     if not session.get('admin_logged_in'):
         return jsonify({'error': 'Unauthorized'}), 401
     
-    return jsonify({
-        'teams': GOOGLE_SYNCED_DATA.get('teams', {}),
-        'headers': GOOGLE_SYNCED_DATA.get('headers', []),
-        'allEmployees': GOOGLE_SYNCED_DATA.get('allEmployees', [])
-    })
+    return roster_response(GOOGLE_SYNCED_DATA)
 
 @app.route('/admin/api/get-admin-data')
 def get_admin_data():
@@ -551,16 +765,74 @@ def get_admin_data():
     if not session.get('admin_logged_in'):
         return jsonify({'error': 'Unauthorized'}), 401
     
-    return jsonify({
-        'teams': ADMIN_MODIFIED_DATA.get('teams', {}),
-        'headers': ADMIN_MODIFIED_DATA.get('headers', []),
-        'allEmployees': ADMIN_MODIFIED_DATA.get('allEmployees', [])
-    })
+    return roster_response(ADMIN_MODIFIED_DATA)
+
+@app.route('/admin/api/roster-diff')
+def get_roster_diff():
+    """Cell-level differences of the admin view from Google data"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from roster_diff import ROSTER_DIFF, project_diff
+    
+    diff = ROSTER_DIFF.get(GOOGLE_SYNCED_DATA or {}, ADMIN_MODIFIED_DATA or {}, ROSTER_VERSION)
+    projection = RosterProjection.from_args(request.args)
+    if not projection.is_empty():
+        try:
+            date_window = projection.date_window(diff['headers'], roster_month_key) if projection.has_date_window() else None
+        except ProjectionError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        team_of = lambda employee_id: find_employee(ADMIN_MODIFIED_DATA, employee_id)[0]
+        diff = project_diff(diff, team_of, projection.teams, projection.employee_ids, date_window)
+    return jsonify(dict(diff, success=True))
 
 @app.route('/admin/api/get-display-data')
 def get_display_data():
     """Get combined data for roster viewer"""
-    return jsonify(CURRENT_DISPLAY_DATA)
+    return roster_response(CURRENT_DISPLAY_DATA)
+
+@app.route('/admin/api/roster-as-of')
+def get_roster_as_of():
+    """The display roster as it was at ?at= (ISO timestamp, or a date for the end of that day)"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        at = parse_as_of(request.args.get('at'))
+        with METRICS.timer('roster_as_of'):
+            data, info = ROSTER_HISTORY.as_of(at)
+    except RosterHistoryError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return roster_response(data, extra={'asOf': at, 'history': info})
+
+@app.route('/admin/api/roster-history')
+def get_roster_history():
+    """Checkpoint and journal statistics of the roster history"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({'success': True, 'stats': ROSTER_HISTORY.stats(), 'checkpoints': ROSTER_HISTORY.checkpoints[-50:]})
+
+@app.route('/api/employees/search')
+def search_employees():
+    """Search employees by name or id prefix, with fuzzy fallback"""
+    query = request.args.get('q', '')
+    limit = min(request.args.get('limit', 10, type=int), 50)
+    
+    if len(query.strip()) < 2:
+        return jsonify({'success': True, 'results': []})
+    
+    return jsonify({'success': True, 'results': EMPLOYEE_SEARCH.search(query, limit)})
+
+@app.route('/api/employees/<employee_id>/summary')
+def get_employee_summary(employee_id):
+    """Monthly shift counts, work/off/leave days and hours of one employee"""
+    months = parse_list(request.args.get('months'))
+    summary = EMPLOYEE_SUMMARIES.summary(employee_id, months)
+    if summary is None:
+        return jsonify({'success': False, 'error': f'Employee {employee_id} not found'}), 404
+    
+    return jsonify({'success': True, 'employeeId': employee_id, 'months': summary})
 
 @app.route('/admin/api/get-employee-shift-history', methods=['POST'])
 def get_employee_shift_history():
@@ -571,41 +843,235 @@ def get_employee_shift_history():
     data = request.json
     employee_id = data.get('employeeId')
     
-    employee_google = None
-    employee_admin = None
-    
-    for team in GOOGLE_SYNCED_DATA.get('teams', {}).values():
-        for employee in team:
-            if employee['id'] == employee_id:
-                employee_google = employee
-                break
-        if employee_google:
-            break
-    
-    for team in ADMIN_MODIFIED_DATA.get('teams', {}).values():
-        for employee in team:
-            if employee['id'] == employee_id:
-                employee_admin = employee
-                break
-        if employee_admin:
-            break
+    _, employee_google = find_employee(GOOGLE_SYNCED_DATA, ADMIN_OVERLAY.base_id(employee_id))
+    _, employee_admin = find_employee(ADMIN_MODIFIED_DATA, employee_id)
     
     if not employee_google and not employee_admin:
         return jsonify({'error': 'Employee not found'}), 404
     
+    # Optional date window (month/start/end), in the body or the query string
+    headers = GOOGLE_SYNCED_DATA.get('headers', [])
+    projection = RosterProjection.from_args({**request.args.to_dict(), **data})
+    try:
+        lo, hi = projection.date_window(headers, roster_month_key) if projection.has_date_window() else (0, len(headers))
+    except ProjectionError as e:
+        return jsonify({'error': str(e)}), 400
+    window_headers = set(headers[lo:hi])
+    
     employee_modifications = []
     for modification in MODIFIED_SHIFTS_DATA.get('modifications', []):
         if modification['employee_id'] == employee_id:
+            if projection.has_date_window() and modification.get('date_header') not in window_headers:
+                continue
             employee_modifications.append(modification)
     
+    # Archived (non-resident) months are read from their partitions on request
+    archived_months = {}
+    base_id = ADMIN_OVERLAY.base_id(employee_id)
+    for month_key in data.get('months', []):
+        # Only stored months: keys become partition file names
+        if not isinstance(month_key, str) or not parse_month_key(month_key) or month_key not in GOOGLE_STORE.months:
+            continue
+        if month_key in GOOGLE_STORE.resident_months:
+            continue
+        google_partition = GOOGLE_STORE.load_month(month_key)
+        if not google_partition:
+            continue
+        google_schedule = google_partition['schedules'].get(base_id, [''] * len(google_partition['headers']))
+        cells = ADMIN_OVERLAY.month_cells(base_id, month_key)
+        archived_months[month_key] = {
+            'headers': google_partition['headers'],
+            'google_schedule': google_schedule,
+            'admin_schedule': [cells.get(header, shift) for header, shift in zip(google_partition['headers'], google_schedule)]
+        }
+    
+    employee = employee_admin or employee_google
+    if (lo, hi) != (0, len(headers)):
+        employee = dict(employee, schedule=employee.get('schedule', [])[lo:hi])
+    
     return jsonify({
-        'employee': employee_admin or employee_google,
-        'google_schedule': employee_google['schedule'] if employee_google else [],
-        'admin_schedule': employee_admin['schedule'] if employee_admin else [],
+        'employee': employee,
+        'google_schedule': employee_google['schedule'][lo:hi] if employee_google else [],
+        'admin_schedule': employee_admin['schedule'][lo:hi] if employee_admin else [],
         'modifications': employee_modifications,
-        'headers': GOOGLE_SYNCED_DATA.get('headers', [])
+        'headers': headers[lo:hi],
+        'dateOffset': lo,
+        'archived_months': archived_months
     })
 
+@app.route('/admin/api/roster-months')
+def get_roster_months():
+    """List stored roster months and which of them are loaded in memory"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'success': True,
+        'google': GOOGLE_STORE.month_summary(),
+        'admin': ADMIN_OVERLAY.month_summary(),
+        'overlay': ADMIN_OVERLAY.stats()
+    })
+
+@app.route('/admin/api/coverage')
+def get_coverage():
+    """Headcount per team, shift and date, flagged against staffing targets"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from staffing_coverage import COVERAGE
+    
+    projection = RosterProjection.from_args(request.args)
+    headers = CURRENT_DISPLAY_DATA.get('headers', [])
+    try:
+        date_window = projection.date_window(headers, roster_month_key) if projection.has_date_window() else None
+    except ProjectionError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    report = COVERAGE.report(
+        CURRENT_DISPLAY_DATA,
+        ROSTER_VERSION,
+        teams=projection.teams,
+        date_window=date_window,
+        shifts=parse_list(request.args.get('shifts')),
+        month_key=roster_month_key
+    )
+    return jsonify(dict(report, success=True))
+
+@app.route('/admin/api/staffing-targets', methods=['GET', 'POST'])
+def staffing_targets():
+    """Get or replace the min/max staffing targets used by the coverage report"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from staffing_coverage import COVERAGE
+    
+    if request.method == 'GET':
+        return jsonify({'success': True, 'targets': COVERAGE.targets})
+    
+    data = request.get_json()
+    if not data:
+        return jsonify({'success': False, 'error': 'No JSON data provided'}), 400
+    try:
+        targets = COVERAGE.save_targets(data)
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'success': False, 'error': f'Invalid staffing targets: {e}'}), 400
+    
+    return jsonify({'success': True, 'targets': targets})
+
+@app.route('/api/shift-catalog')
+def get_shift_catalog():
+    """Shift codes with labels, times, hours and categories"""
+    return jsonify({'success': True, 'shifts': SHIFT_CATALOG.to_list()})
+
+@app.route('/admin/api/shift-catalog', methods=['POST'])
+def save_shift_catalog():
+    """Replace the shift catalog"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    data = request.get_json()
+    if not data or not isinstance(data.get('shifts'), list):
+        return jsonify({'success': False, 'error': 'shifts list is required'}), 400
+    try:
+        shifts = SHIFT_CATALOG.save(data['shifts'])
+    except (TypeError, ValueError, AttributeError) as e:
+        return jsonify({'success': False, 'error': f'Invalid shift catalog: {e}'}), 400
+    
+    return jsonify({'success': True, 'shifts': shifts})
+
+@app.route('/admin/api/workload-report')
+def get_workload_report():
+    """Monthly hours, off/leave days, night shifts and streaks per employee and team"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from workload_report import WORKLOAD_REPORTS
+    
+    headers = CURRENT_DISPLAY_DATA.get('headers', [])
+    months = list(dict.fromkeys(roster_month_key(header) for header in headers))
+    month = request.args.get('month') or datetime.now().strftime('%b-%Y')
+    if month not in months:
+        if request.args.get('month'):
+            return jsonify({'success': False, 'error': f'Month {month} is not loaded', 'months': months}), 404
+        month = months[-1] if months else month
+    
+    report = WORKLOAD_REPORTS.month_report(CURRENT_DISPLAY_DATA, ROSTER_VERSION, month, roster_month_key)
+    
+    teams = parse_list(request.args.get('teams'))
+    employee_ids = parse_list(request.args.get('employees'))
+    if teams or employee_ids:
+        report = dict(
+            report,
+            employees=[row for row in report['employees']
+                       if (not teams or row['team'] in teams) and (not employee_ids or row['id'] in employee_ids)],
+            teams={name: row for name, row in report['teams'].items() if not teams or name in teams}
+        )
+    
+    return jsonify(dict(report, success=True, months=months))
+
+@app.route('/admin/api/auto-roster', methods=['POST'])
+def auto_roster():
+    """Generate a month from staffing targets; with apply, write it into the admin overlay as a draft"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from auto_roster import generate_month, AutoRosterError
+    from staffing_coverage import COVERAGE
+    
+    data = request.get_json() or {}
+    month = data.get('month')
+    if not month:
+        return jsonify({'success': False, 'error': 'month is required'}), 400
+    
+    try:
+        with METRICS.timer('auto_roster'):
+            draft = generate_month(
+                ADMIN_MODIFIED_DATA, month, roster_month_key, COVERAGE,
+                teams=set(parse_list(data.get('teams')) or []),
+                off_days=int(data['offDays']) if data.get('offDays') is not None else None,
+                max_consecutive_days=int(data.get('maxConsecutiveDays', 6)),
+                seed=data.get('seed')
+            )
+    except (AutoRosterError, TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
+    changed = 0
+    if data.get('apply'):
+        # Written cell by cell so unchanged cells and cells matching Google add no overrides
+        offset = draft['dateOffset']
+        headers = ADMIN_MODIFIED_DATA.get('headers', [])
+        modified_by = f"Auto Roster (by {session.get('admin_username', 'unknown')})"
+        with OVERLAY_HISTORY.action(f'Auto roster {month}'):
+            for employees in draft['teams'].values():
+                for row in employees:
+                    team_name, employee = find_employee(ADMIN_MODIFIED_DATA, row['id'])
+                    current = employee.get('schedule', [])
+                    for i, shift in enumerate(row['schedule']):
+                        date_index = offset + i
+                        old_shift = current[date_index] if date_index < len(current) else ''
+                        if date_index >= len(current) or old_shift != shift:
+                            set_admin_shift(row['id'], date_index, shift)
+                            track_modified_shift(
+                                employee_id=row['id'],
+                                date_index=date_index,
+                                old_shift=old_shift,
+                                new_shift=shift,
+                                employee_name=employee.get('name', ''),
+                                team_name=team_name,
+                                date_header=headers[date_index] if date_index < len(headers) else f"Date_{date_index}",
+                                modified_by=modified_by,
+                                save=False
+                            )
+                            changed += 1
+        if changed:
+            save_tracked_shifts()
+            save_admin_data()
+            update_display_data()
+        logger.info("Auto roster applied", extra={'month': month, 'cells': changed,
+                                                  'by': session.get('admin_username', 'unknown')})
+    
+    return jsonify(dict(draft, success=True, applied=bool(data.get('apply')), changedCells=changed))
+
 @app.route('/admin/api/get-modified-shifts')
 def get_modified_shifts():
     """Get modified shifts statistics"""
@@ -632,6 +1098,51 @@ def get_modified_shifts():
         'current_month': current_month
     })
 
+@app.route('/admin/api/archives')
+def get_archives():
+    """Archived months of modification history and resolved requests"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify({
+        'success': True,
+        'archives': ARCHIVES.summary(),
+        'hot': {
+            'modifications': len(MODIFIED_SHIFTS_DATA.get('modifications', [])),
+            'shift_change_requests': len(SCHEDULE_REQUESTS.requests['shift_change_requests']),
+            'swap_requests': len(SCHEDULE_REQUESTS.requests['swap_requests'])
+        },
+        'retention': {'firstHotMonth': cutoff_month(), 'requestsResolvedBefore': cutoff_time()}
+    })
+
+@app.route('/admin/api/archives/<kind>')
+def get_archive_month(kind):
+    """Records of one archived month (?month=YYYY-MM), optionally for ?employeeId= and ?status="""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    month = request.args.get('month')
+    employee_id = request.args.get('employeeId')
+    try:
+        if kind == 'requests':
+            records = SCHEDULE_REQUESTS.get_archived_requests(ARCHIVES, month, employee_id, request.args.get('status'))
+        else:
+            records = [m for m in ARCHIVES.read(kind, month) if employee_id is None or m['employee_id'] == employee_id]
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 404
+    return jsonify({'success': True, 'kind': kind, 'month': month, 'records': records})
+
+@app.route('/admin/api/archives/compact', methods=['POST'])
+def compact_archives():
+    """Apply the retention policy now"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    moved = apply_retention(force=True)
+    if moved is None:
+        return jsonify({'success': False, 'error': 'Archiving failed, see the server log'}), 500
+    return jsonify({'success': True, 'moved': moved})
+
 @app.route('/admin/api/update-shift', methods=['POST'])
 def update_shift():
     """Update shift in admin modified data"""
@@ -647,71 +1158,136 @@ def update_shift():
         date_index = data.get('dateIndex')
         new_shift = data.get('newShift')
         data_source = data.get('source', 'admin')
-        google_shift = data.get('googleShift', '')
         
         if not employee_id or date_index is None:
             return jsonify({'success': False, 'error': 'Missing required fields: employeeId and dateIndex are required'}), 400
         
         target_data = ADMIN_MODIFIED_DATA if data_source == 'admin' else GOOGLE_SYNCED_DATA
         
-        employee_found = False
-        for team_name, team in target_data.get('teams', {}).items():
-            for employee in team:
-                if employee['id'] == employee_id:
-                    employee_found = True
-                    if 0 <= date_index < len(employee['schedule']):
-                        old_shift = employee['schedule'][date_index]
-                        employee['schedule'][date_index] = new_shift
-                        
-                        if data_source == 'admin' and new_shift != google_shift:
-                            date_header = ADMIN_MODIFIED_DATA.get('headers', [])[date_index] if date_index < len(ADMIN_MODIFIED_DATA.get('headers', [])) else f"Date_{date_index}"
-                            track_modified_shift(
-                                employee_id=employee_id,
-                                date_index=date_index,
-                                old_shift=google_shift,
-                                new_shift=new_shift,
-                                employee_name=employee['name'],
-                                team_name=team_name,
-                                date_header=date_header,
-                                modified_by=session.get('admin_username', 'unknown')
-                            )
-                        
-                        if data_source == 'admin':
-                            save_admin_data()
-                        else:
-                            save_google_data()
-                        
-                        if data_source == 'admin':
-                            update_display_data()
-                        
-                        return jsonify({'success': True})
-                    else:
-                        return jsonify({'success': False, 'error': f'Date index {date_index} out of range. Schedule length: {len(employee["schedule"])}'}), 400
-        
-        if not employee_found:
+        team_name, employee = find_employee(target_data, employee_id)
+        if not employee:
             return jsonify({'success': False, 'error': f'Employee {employee_id} not found'}), 404
-            
+        
+        if not 0 <= date_index < len(employee['schedule']):
+            return jsonify({'success': False, 'error': f'Date index {date_index} out of range. Schedule length: {len(employee["schedule"])}'}), 400
+        
+        if data_source == 'admin':
+            with OVERLAY_HISTORY.action(f'Set {employee_id} on {ADMIN_MODIFIED_DATA["headers"][date_index]} to {new_shift or "(empty)"}'):
+                set_admin_shift(employee_id, date_index, new_shift)
+        else:
+            # The displayed cell only changes if no admin override hides it
+            _, shown_employee = find_employee(ADMIN_MODIFIED_DATA, employee_id)
+            shown_shift = shown_employee['schedule'][date_index] if shown_employee else None
+            employee['schedule'][date_index] = new_shift
+        
+        # Compare against Google's cell on the server, not a client-supplied value
+        base_shift = google_shift(employee_id, date_index) if data_source == 'admin' else None
+        if data_source == 'admin' and new_shift != base_shift:
+            date_header = ADMIN_MODIFIED_DATA.get('headers', [])[date_index] if date_index < len(ADMIN_MODIFIED_DATA.get('headers', [])) else f"Date_{date_index}"
+            track_modified_shift(
+                employee_id=employee_id,
+                date_index=date_index,
+                old_shift=base_shift,
+                new_shift=new_shift,
+                employee_name=employee['name'],
+                team_name=team_name,
+                date_header=date_header,
+                modified_by=session.get('admin_username', 'unknown')
+            )
+        
+        if data_source == 'admin':
+            save_admin_data()
+        else:
+            save_google_data(months=date_month_keys(GOOGLE_STORE, GOOGLE_SYNCED_DATA, [date_index]))
+        
+        update_display_data()
+        
+        if data_source != 'admin' and shown_employee:
+            _, shown_employee = find_employee(ADMIN_MODIFIED_DATA, employee_id)
+            header = ADMIN_MODIFIED_DATA['headers'][date_index]
+            EMPLOYEE_SUMMARIES.update_cell(employee_id, roster_month_key(header), shown_shift, shown_employee['schedule'][date_index])
+            ROSTER_HISTORY.record_cell(employee_id, header, shown_shift, shown_employee['schedule'][date_index])
+        
+        return jsonify({'success': True})
+        
     except Exception as e:
-        print(f"Error in update_shift: {str(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Error in update_shift")
         return jsonify({'success': False, 'error': f'Server error: {str(e)}'}), 500
-    
-    return jsonify({'success': False, 'error': 'Employee or date not found'})
+
+def refresh_after_overlay_change(reason):
+    """Persist the overlay and rebuild the view and its indexes after a bulk overlay change"""
+    save_admin_data()
+    previous_view = CURRENT_DISPLAY_DATA
+    update_display_data()
+    EMPLOYEE_SEARCH.rebuild(CURRENT_DISPLAY_DATA)
+    EMPLOYEE_SUMMARIES.sync(previous_view, CURRENT_DISPLAY_DATA, roster_month_key)
+    checkpoint_roster(reason)
 
 @app.route('/admin/api/reset-to-google', methods=['POST'])
 def reset_to_google():
-    """Reset admin modifications to Google data"""
+    """Reset admin modifications to Google data: all of them, or only the shift
+    changes of some teams/employees and/or a month or start/end date range"""
     if not session.get('admin_logged_in'):
         return jsonify({'error': 'Unauthorized'}), 401
     
-    global ADMIN_MODIFIED_DATA
-    ADMIN_MODIFIED_DATA = deep_copy_data(GOOGLE_SYNCED_DATA)
+    projection = RosterProjection.from_args(request.get_json(silent=True) or {})
+    if projection.is_empty():
+        with OVERLAY_HISTORY.action('Reset to Google data'):
+            ADMIN_OVERLAY.clear()
+        message = 'Reset to Google Sheets data'
+    else:
+        headers = ADMIN_MODIFIED_DATA.get('headers', [])
+        try:
+            window = projection.date_window(headers, roster_month_key) if projection.has_date_window() else None
+        except ProjectionError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        base_ids = None
+        if projection.teams is not None or projection.employee_ids is not None:
+            base_ids = ADMIN_OVERLAY.base_ids(
+                employee['id']
+                for team_name, employees in ADMIN_MODIFIED_DATA.get('teams', {}).items()
+                if projection.teams is None or team_name in projection.teams
+                for employee in employees if projection.keep_employee(employee)
+            )
+        with OVERLAY_HISTORY.action('Reset shifts to Google data'):
+            reset = ADMIN_OVERLAY.reset_cells(base_ids, set(headers[window[0]:window[1]]) if window else None)
+        message = f'Reset {reset} modified shift{"" if reset == 1 else "s"} to Google Sheets data'
     
-    save_admin_data()
-    update_display_data()
+    refresh_after_overlay_change('reset')
+    
+    return jsonify({'success': True, 'message': message})
+
+@app.route('/admin/api/undo', methods=['POST'])
+def undo_admin_change():
+    """Undo the latest admin edit"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    version = OVERLAY_HISTORY.undo()
+    if version is None:
+        return jsonify({'success': False, 'error': 'Nothing to undo'}), 409
+    refresh_after_overlay_change('undo')
+    return jsonify({'success': True, 'message': f"Undid: {version['label']}", 'history': OVERLAY_HISTORY.summary()})
+
+@app.route('/admin/api/redo', methods=['POST'])
+def redo_admin_change():
+    """Redo the latest undone admin edit"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
     
-    return jsonify({'success': True, 'message': 'Reset to Google Sheets data'})
+    version = OVERLAY_HISTORY.redo()
+    if version is None:
+        return jsonify({'success': False, 'error': 'Nothing to redo'}), 409
+    refresh_after_overlay_change('redo')
+    return jsonify({'success': True, 'message': f"Redid: {version['label']}", 'history': OVERLAY_HISTORY.summary()})
+
+@app.route('/admin/api/undo-history')
+def get_undo_history():
+    """Labels of the admin edits that can be undone and redone, newest first"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    return jsonify(dict(OVERLAY_HISTORY.summary(), success=True))
 
 @app.route('/admin/api/save-team', methods=['POST'])
 def save_team():
@@ -727,18 +1303,20 @@ def save_team():
         if not team_name:
             return jsonify({'success': False, 'error': 'Team name is required'})
         
-        global ADMIN_MODIFIED_DATA
-        
         if action == 'add':
-            if team_name not in ADMIN_MODIFIED_DATA['teams']:
-                ADMIN_MODIFIED_DATA['teams'][team_name] = []
+            if team_name not in ADMIN_MODIFIED_DATA.get('teams', {}):
+                with OVERLAY_HISTORY.action(f'Add team {team_name}'):
+                    ADMIN_OVERLAY.add_team(team_name)
         elif action == 'edit':
             old_name = data.get('oldName')
-            if old_name and old_name in ADMIN_MODIFIED_DATA['teams']:
-                ADMIN_MODIFIED_DATA['teams'][team_name] = ADMIN_MODIFIED_DATA['teams'].pop(old_name)
+            if old_name and old_name in ADMIN_MODIFIED_DATA.get('teams', {}):
+                with OVERLAY_HISTORY.action(f'Rename team {old_name} to {team_name}'):
+                    ADMIN_OVERLAY.rename_team(old_name, team_name)
+                EMPLOYEE_SEARCH.rename_team(old_name, team_name)
         
         save_admin_data()
         update_display_data()
+        checkpoint_roster('save-team')
         
         return jsonify({'success': True})
         
@@ -761,71 +1339,65 @@ def save_employee():
         if not all([name, emp_id, team]):
             return jsonify({'success': False, 'error': 'All fields are required'})
         
-        global ADMIN_MODIFIED_DATA
+        old_id = data.get('oldId', emp_id)
+        index = employee_index(ADMIN_MODIFIED_DATA)
         
         if action == 'add':
-            new_employee = {
-                'name': name,
-                'id': emp_id,
-                'schedule': [''] * len(ADMIN_MODIFIED_DATA.get('headers', []))
-            }
-            
-            if team not in ADMIN_MODIFIED_DATA['teams']:
-                ADMIN_MODIFIED_DATA['teams'][team] = []
-            
-            ADMIN_MODIFIED_DATA['teams'][team].append(new_employee)
+            index.check_new_id(emp_id)
+            with OVERLAY_HISTORY.action(f'Add employee {emp_id}'):
+                ADMIN_OVERLAY.add_employee(emp_id, name, team)
             
         elif action == 'edit':
-            old_id = data.get('oldId', emp_id)
-            old_team = data.get('oldTeam', team)
-            
-            employee_found = False
-            
-            # Remove from old team if team changed
-            if old_team in ADMIN_MODIFIED_DATA['teams']:
-                for i, emp in enumerate(ADMIN_MODIFIED_DATA['teams'][old_team]):
-                    if emp['id'] == old_id:
-                        # Remove from old team
-                        removed_employee = ADMIN_MODIFIED_DATA['teams'][old_team].pop(i)
-                        
-                        # Update employee data
-                        removed_employee['name'] = name
-                        removed_employee['id'] = emp_id
-                        
-                        # Add to new team
-                        if team not in ADMIN_MODIFIED_DATA['teams']:
-                            ADMIN_MODIFIED_DATA['teams'][team] = []
-                        ADMIN_MODIFIED_DATA['teams'][team].append(removed_employee)
-                        
-                        employee_found = True
-                        break
-            
-            # If not found by old data, search all teams
-            if not employee_found:
-                for team_name, employees in ADMIN_MODIFIED_DATA['teams'].items():
-                    for i, emp in enumerate(employees):
-                        if emp['id'] == emp_id:
-                            # Update in place
-                            emp['name'] = name
-                            # If team changed, move the employee
-                            if team_name != team:
-                                moved_employee = ADMIN_MODIFIED_DATA['teams'][team_name].pop(i)
-                                if team not in ADMIN_MODIFIED_DATA['teams']:
-                                    ADMIN_MODIFIED_DATA['teams'][team] = []
-                                ADMIN_MODIFIED_DATA['teams'][team].append(moved_employee)
-                            employee_found = True
-                            break
-                    if employee_found:
-                        break
+            # Look up by the old id first, then by the new one
+            with OVERLAY_HISTORY.action(f'Edit employee {emp_id}'):
+                if old_id in index:
+                    index.check_new_id(emp_id, current_id=old_id)
+                    ADMIN_OVERLAY.update_employee(old_id, name=name, team=team, new_id=emp_id)
+                elif emp_id in index:
+                    ADMIN_OVERLAY.update_employee(emp_id, name=name, team=team)
         
         save_admin_data()
         update_display_data()  # Ensure display data is updated immediately
+        reindex_employee(emp_id, old_id)
+        checkpoint_roster('save-employee')
         
         return jsonify({'success': True})
         
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/admin/api/employees/bulk', methods=['POST'])
+def bulk_employees():
+    """Apply a list of employee adds, edits, moves and deletes in one request
+
+    Body: {'rows': [{'action': 'add'|'edit'|'move'|'delete', 'id', 'oldId'?, 'name'?, 'team'?}]}.
+    Rows are validated and applied in order (see employee_bulk.py) as one undo
+    step; the overlay is saved and the view rebuilt once for the whole batch.
+    """
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    try:
+        data = request.get_json(silent=True) or {}
+        rows = data.get('rows')
+        index = employee_index(ADMIN_MODIFIED_DATA)
+        team_names = set(ADMIN_MODIFIED_DATA.get('teams', {}))
+        
+        with METRICS.timer('bulk_employees'):
+            with OVERLAY_HISTORY.action(f'Bulk employee update ({len(rows) if isinstance(rows, list) else 0} rows)'):
+                results = apply_rows(ADMIN_OVERLAY, index, team_names, rows)
+            applied = sum(1 for result in results if result['success'])
+            if applied:
+                refresh_after_overlay_change('bulk-employees')
+        
+        return jsonify({'success': True, 'applied': applied, 'failed': len(results) - applied, 'results': results})
+        
+    except BulkEmployeeError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.exception("Error in bulk_employees")
+        return jsonify({'success': False, 'error': str(e)})
+
 @app.route('/admin/api/delete-team', methods=['POST'])
 def delete_team():
     """Delete a team"""
@@ -836,13 +1408,16 @@ def delete_team():
         data = request.get_json()
         team_name = data.get('teamName')
         
-        global ADMIN_MODIFIED_DATA
-        
-        if team_name in ADMIN_MODIFIED_DATA['teams']:
-            del ADMIN_MODIFIED_DATA['teams'][team_name]
+        if team_name in ADMIN_MODIFIED_DATA.get('teams', {}):
+            employee_ids = [emp['id'] for emp in ADMIN_MODIFIED_DATA['teams'][team_name]]
+            with OVERLAY_HISTORY.action(f'Delete team {team_name}'):
+                ADMIN_OVERLAY.delete_team(team_name, employee_ids)
+            for employee_id in employee_ids:
+                unindex_employee(employee_id)
             
         save_admin_data()
         update_display_data()
+        checkpoint_roster('delete-team')
         
         return jsonify({'success': True})
         
@@ -859,20 +1434,15 @@ def delete_employee():
         data = request.get_json()
         employee_id = data.get('employeeId')
         
-        global ADMIN_MODIFIED_DATA
-        
-        employee_found = False
-        for team_name, employees in ADMIN_MODIFIED_DATA['teams'].items():
-            for i, emp in enumerate(employees):
-                if emp['id'] == employee_id:
-                    ADMIN_MODIFIED_DATA['teams'][team_name].pop(i)
-                    employee_found = True
-                    break
-            if employee_found:
-                break
+        _, employee = find_employee(ADMIN_MODIFIED_DATA, employee_id)
+        if employee:
+            with OVERLAY_HISTORY.action(f'Delete employee {employee_id}'):
+                ADMIN_OVERLAY.delete_employee(employee_id)
+            unindex_employee(employee_id)
         
         save_admin_data()
         update_display_data()  # Ensure display data is updated immediately
+        checkpoint_roster('delete-employee')
         
         return jsonify({'success': True})
         
@@ -1022,17 +1592,15 @@ def upload_csv():
                 new_headers = existing_headers + normalized_headers
             
             GOOGLE_SYNCED_DATA['headers'] = new_headers
+            google_index = employee_index(GOOGLE_SYNCED_DATA)
             
             for team_name, imported_employees in imported_teams.items():
                 if team_name not in GOOGLE_SYNCED_DATA['teams']:
                     GOOGLE_SYNCED_DATA['teams'][team_name] = []
                 
                 for imported_emp in imported_employees:
-                    existing_emp = None
-                    for emp in GOOGLE_SYNCED_DATA['teams'][team_name]:
-                        if emp['id'] == imported_emp['id']:
-                            existing_emp = emp
-                            break
+                    # Ids are unique across teams: a known id updates that employee wherever it is
+                    _, existing_emp = google_index.find(imported_emp['id'])
                     
                     if existing_emp:
                         while len(existing_emp['schedule']) < len(new_headers):
@@ -1056,6 +1624,7 @@ def upload_csv():
                                 new_emp['schedule'][header_index] = imported_emp['schedule'][i]
                         
                         GOOGLE_SYNCED_DATA['teams'][team_name].append(new_emp)
+                        google_index.add(team_name, new_emp)
             
             all_employees = []
             for team_name, employees in GOOGLE_SYNCED_DATA['teams'].items():
@@ -1065,22 +1634,19 @@ def upload_csv():
             GOOGLE_SYNCED_DATA['allEmployees'] = all_employees
             
             save_google_data()
-            
-            global ADMIN_MODIFIED_DATA
-            if not ADMIN_MODIFIED_DATA:
-                ADMIN_MODIFIED_DATA = deep_copy_data(GOOGLE_SYNCED_DATA)
-                save_admin_data()
-            
             update_display_data()
+            EMPLOYEE_SEARCH.rebuild(CURRENT_DISPLAY_DATA)
+            # Schedules were edited in place, so recount instead of diffing views
+            EMPLOYEE_SUMMARIES.rebuild(CURRENT_DISPLAY_DATA, roster_month_key)
+            checkpoint_roster('upload')
+            OVERLAY_HISTORY.clear()
             
             return jsonify({
                 'success': True, 
                 'message': f'CSV imported successfully for {detected_month}! Merged {len(imported_teams)} teams.'
             })
         except Exception as e:
-            import traceback
-            error_details = traceback.format_exc()
-            print(f"CSV import error: {error_details}")
+            logger.exception("CSV import error", extra={'filename': file.filename})
             return jsonify({'success': False, 'error': f'Error processing CSV: {str(e)}'})
     
     return jsonify({'success': False, 'error': 'Invalid file format'})
@@ -1126,17 +1692,25 @@ def submit_shift_change_request():
         data = request.get_json()
         employee_id = data.get('employeeId')
         employee_name = data.get('employeeName')
-        team = data.get('team')
         date = data.get('date')
         current_shift = data.get('currentShift')
         requested_shift = data.get('requestedShift')
         reason = data.get('reason')
         
-        if not all([employee_id, employee_name, team, date, current_shift, requested_shift, reason]):
+        if not all([employee_id, date, requested_shift, reason]):
             return jsonify({'success': False, 'error': 'All fields are required'})
         
+        from request_validation import REQUEST_VALIDATOR, RequestValidationError
+        try:
+            team, employee, current_shift = REQUEST_VALIDATOR.validate_shift_change(
+                ADMIN_MODIFIED_DATA, employee_index(ADMIN_MODIFIED_DATA), ROSTER_VERSION, SCHEDULE_REQUESTS,
+                employee_id, date, current_shift, requested_shift
+            )
+        except RequestValidationError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
+        
         request_data = SCHEDULE_REQUESTS.add_shift_change_request(
-            employee_id, employee_name, team, date, current_shift, requested_shift, reason
+            employee_id, employee['name'] or employee_name, team, date, current_shift, requested_shift, reason
         )
         
         return jsonify({'success': True, 'request': request_data})
@@ -1153,17 +1727,25 @@ def submit_swap_request():
         requester_name = data.get('requesterName')
         target_employee_id = data.get('targetEmployeeId')
         target_employee_name = data.get('targetEmployeeName')
-        team = data.get('team')
         date = data.get('date')
         requester_shift = data.get('requesterShift')
         target_shift = data.get('targetShift')
         reason = data.get('reason')
         
-        if not all([requester_id, requester_name, target_employee_id, target_employee_name, team, date, requester_shift, target_shift, reason]):
+        if not all([requester_id, target_employee_id, date, reason]):
             return jsonify({'success': False, 'error': 'All fields are required'})
         
+        from request_validation import REQUEST_VALIDATOR, RequestValidationError
+        try:
+            team, requester, _, target, requester_shift, target_shift = REQUEST_VALIDATOR.validate_swap(
+                ADMIN_MODIFIED_DATA, employee_index(ADMIN_MODIFIED_DATA), ROSTER_VERSION, SCHEDULE_REQUESTS,
+                requester_id, target_employee_id, date, requester_shift, target_shift
+            )
+        except RequestValidationError as e:
+            return jsonify({'success': False, 'error': str(e)}), e.status
+        
         request_data = SCHEDULE_REQUESTS.add_swap_request(
-            requester_id, requester_name, target_employee_id, target_employee_name, 
+            requester_id, requester['name'] or requester_name, target_employee_id, target['name'] or target_employee_name,
             team, date, requester_shift, target_shift, reason
         )
         
@@ -1191,6 +1773,52 @@ def get_team_members():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/api/schedule-requests/swap-candidates', methods=['POST'])
+def get_swap_candidates():
+    """Find employees working the wanted shifts on days in a date window"""
+    try:
+        from swap_candidates import SHIFT_DATE_INDEX, find_swap_candidates
+        
+        data = request.get_json() or {}
+        employee_id = data.get('employeeId')
+        if not employee_id:
+            return jsonify({'success': False, 'error': 'Employee ID is required'}), 400
+        
+        projection = RosterProjection(month=data.get('month'), start=data.get('start'), end=data.get('end'))
+        if not projection.has_date_window():
+            return jsonify({'success': False, 'error': 'month or start/end is required'}), 400
+        
+        team_name, employee = find_employee(ADMIN_MODIFIED_DATA, employee_id)
+        if not employee:
+            return jsonify({'success': False, 'error': f'Employee {employee_id} not found'}), 404
+        
+        headers = ADMIN_MODIFIED_DATA.get('headers', [])
+        try:
+            date_window = projection.date_window(headers, roster_month_key)
+        except ProjectionError as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+        
+        # Own team by default; crossTeam searches every team, or the listed ones
+        teams = {team_name}
+        if data.get('crossTeam'):
+            teams = set(parse_list(data.get('teams')) or []) or None
+        
+        index = SHIFT_DATE_INDEX.ensure(ADMIN_MODIFIED_DATA, ROSTER_VERSION)
+        candidates, total = find_swap_candidates(
+            index, headers, employee, team_name, date_window,
+            want_shifts=parse_list(data.get('wantShifts')),
+            your_shifts=parse_list(data.get('yourShifts')),
+            teams=teams,
+            limit=min(int(data.get('limit', 20)), 100)
+        )
+        
+        return jsonify({'success': True, 'candidates': candidates, 'total': total,
+                        'headers': headers[date_window[0]:date_window[1]], 'dateOffset': date_window[0]})
+        
+    except Exception as e:
+        logger.exception("Error finding swap candidates")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/api/schedule-requests/get-employee-requests', methods=['POST'])
 def get_employee_requests():
     """Get requests for a specific employee"""
@@ -1201,7 +1829,7 @@ def get_employee_requests():
         if not employee_id:
             return jsonify({'success': False, 'error': 'Employee ID is required'})
         
-        requests = SCHEDULE_REQUESTS.get_employee_requests(employee_id)
+        requests = SCHEDULE_REQUESTS.get_employee_requests(employee_id, ARCHIVES)
         
         return jsonify({'success': True, 'requests': requests})
         
@@ -1219,8 +1847,8 @@ def get_pending_schedule_requests():
     stats = {
         'pending_count': SCHEDULE_REQUESTS.requests['pending_count'],
         'approved_count': SCHEDULE_REQUESTS.requests['approved_count'],
-        'total_shift_change': len(SCHEDULE_REQUESTS.requests['shift_change_requests']),
-        'total_swap': len(SCHEDULE_REQUESTS.requests['swap_requests'])
+        'total_shift_change': SCHEDULE_REQUESTS.total_count('shift_change_requests'),
+        'total_swap': SCHEDULE_REQUESTS.total_count('swap_requests')
     }
     
     return jsonify({
@@ -1250,15 +1878,17 @@ def update_schedule_request_status():
         
         if not updated_request:
             return jsonify({'success': False, 'error': 'Request not found'})
+        apply_retention()
         
         # If approved, update the admin modified data
         if status == 'approved':
-            if updated_request['type'] == 'shift_change':
-                # Update single employee's shift
-                apply_shift_change(updated_request)
-            elif updated_request['type'] == 'swap':
-                # Swap shifts between two employees
-                apply_swap(updated_request)
+            with OVERLAY_HISTORY.action(f'Approve request {request_id}'):
+                if updated_request['type'] == 'shift_change':
+                    # Update single employee's shift
+                    apply_shift_change(updated_request)
+                elif updated_request['type'] == 'swap':
+                    # Swap shifts between two employees
+                    apply_swap(updated_request)
             
             save_admin_data()
             update_display_data()
@@ -1268,6 +1898,70 @@ def update_schedule_request_status():
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)})
 
+@app.route('/admin/api/schedule-requests/matches')
+def get_schedule_request_matches():
+    """Sets of pending requests that can be approved together as one rotation"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from swap_matching import find_matches, DEFAULT_MAX_CYCLE_LENGTH
+    
+    max_length = min(request.args.get('maxLength', DEFAULT_MAX_CYCLE_LENGTH, type=int), 10)
+    with METRICS.timer('schedule_request_matching'):
+        matches = find_matches(SCHEDULE_REQUESTS.get_pending_requests(), shift_lookup(ADMIN_MODIFIED_DATA), max_length)
+    
+    return jsonify({'success': True, 'matches': matches})
+
+@app.route('/admin/api/schedule-requests/approve-match', methods=['POST'])
+def approve_schedule_request_match():
+    """Approve a matched set of requests: every employee gets the shift they asked for"""
+    if not session.get('admin_logged_in'):
+        return jsonify({'error': 'Unauthorized'}), 401
+    
+    from swap_matching import check_match
+    
+    try:
+        data = request.get_json() or {}
+        request_ids = data.get('requestIds') or []
+        requests = [SCHEDULE_REQUESTS.get_request(request_id) for request_id in request_ids]
+        if not requests or None in requests:
+            return jsonify({'success': False, 'error': 'Request not found'}), 404
+        
+        # Re-check against the current roster: it may have changed since the match was listed
+        try:
+            nodes = check_match(requests, shift_lookup(ADMIN_MODIFIED_DATA))
+        except ValueError as e:
+            return jsonify({'success': False, 'error': str(e)}), 409
+        
+        approved_by = session.get('admin_username', 'admin')
+        date_index = ADMIN_MODIFIED_DATA['headers'].index(nodes[0]['date'])
+        with OVERLAY_HISTORY.action(f'Approve matched requests {", ".join(request_ids)}'):
+            for node in nodes:
+                team_name, employee = find_employee(ADMIN_MODIFIED_DATA, node['employee_id'])
+                set_admin_shift(node['employee_id'], date_index, node['to'])
+                track_modified_shift(
+                    employee_id=node['employee_id'],
+                    date_index=date_index,
+                    old_shift=node['from'],
+                    new_shift=node['to'],
+                    employee_name=employee['name'],
+                    team_name=team_name,
+                    date_header=node['date'],
+                    modified_by=f"Matched Requests (Approved by {approved_by})",
+                    save=False
+                )
+        save_tracked_shifts()
+        
+        updated = SCHEDULE_REQUESTS.update_requests_status(request_ids, 'approved', approved_by)
+        save_admin_data()
+        update_display_data()
+        
+        return jsonify({'success': True, 'requests': updated})
+        
+    except Exception as e:
+        logger.exception("Error approving matched requests")
+        return jsonify({'success': False, 'error': str(e)}), 500
+
 @app.route('/static/<path:path>')
 def serve_static(path):
     """Serve static files"""
@@ -1314,6 +2008,8 @@ if __name__ == '__main__':
             print(f"   - {file}")
         print("\nPlease ensure all files are in the correct locations.")
     
+    ensure_data_loaded()
+    
     print("\n🚀 Cartup CxP Roster Viewer Server Starting...")
     print("📍 Local URL: http://localhost:5000")
     print("👑 Admin Panel: http://localhost:5000/admin")
@@ -0,0 +1,267 @@
+# auto_roster.py - Generate a month's schedule per team from staffing rules
+#
+# Inputs, per team and month:
+#   - coverage targets per shift and day (min/max, from staffing_coverage,
+#     including its weekday and date overrides)
+#   - the number of off days each employee gets in the month
+#   - the maximum number of consecutive working days
+#   - leave already on the roster (catalog category 'leave'), which is kept
+#
+# Two phases, both on (employees x dates) NumPy arrays:
+#
+#   1. Off days. Each employee starts with evenly spaced off days, staggered
+#      across the team. A local search then moves single off days between
+#      dates to remove days where fewer people are available than the shift
+#      minimums need, and working streaks above the maximum. Every move keeps
+#      each employee's off-day count.
+#   2. Shifts. Day by day, the available employees fill each shift's minimum
+#      first, then the shift with the most room left. An employee keeps the
+#      previous day's shift when possible, and is otherwise given the shift
+#      they have worked least this month.
+#
+# The result is a draft in the roster's {'teams', 'headers', 'schedule'}
+# shape; app.py can write it into the admin overlay.
+import random
+import time
+
+import numpy as np
+
+from shift_catalog import SHIFT_CATALOG, WORK_CATEGORIES
+from workload_report import run_lengths, MAX_CONSECUTIVE_DAYS
+
+OFF_DAYS_PER_WEEK = 2
+MAX_ITERATIONS_PER_EMPLOYEE = 40
+
+class AutoRosterError(ValueError):
+    pass
+
+def streak_excess(working_row, max_run):
+    """Working days beyond max_run, summed over every streak of one employee"""
+    excess = 0
+    run = 0
+    for working in working_row:
+        run = run + 1 if working else 0
+        if run > max_run:
+            excess += 1
+    return excess
+
+class TeamRoster:
+    """Off-day search and shift assignment for one team's month"""
+    def __init__(self, leave, shifts, minimums, maximums, off_days, max_run, rng):
+        self.leave = leave                    # employees x dates, True where leave is kept
+        self.shifts = shifts                  # working shift codes
+        self.minimums = minimums              # dates x shifts
+        self.maximums = maximums              # dates x shifts, -1 for no maximum
+        self.off_days = off_days
+        self.max_run = max_run
+        self.rng = rng
+        self.employee_count, self.date_count = leave.shape
+        self.required = minimums.sum(axis=1)
+        self.iterations = 0
+
+    def initial_offs(self):
+        """Evenly spaced off days, staggered by employee, skipping leave days"""
+        off = np.zeros_like(self.leave)
+        for e in range(self.employee_count):
+            free = np.flatnonzero(~self.leave[e])
+            count = min(self.off_days, len(free))
+            if not count:
+                continue
+            step = len(free) / count
+            # Golden-ratio offsets spread the team's off days over the month
+            start = (e * 0.618034 % 1) * step
+            off[e, free[[int(start + i * step) for i in range(count)]]] = True
+        return off
+
+    def search_offs(self):
+        off = self.initial_offs()
+        excess = np.array([streak_excess(~off[e] & ~self.leave[e], self.max_run) for e in range(self.employee_count)])
+        stuck = set()
+
+        for iteration in range(MAX_ITERATIONS_PER_EMPLOYEE * max(1, self.employee_count)):
+            self.iterations = iteration + 1
+            working = ~off & ~self.leave
+            surplus = working.sum(axis=0) - self.required
+
+            move = None
+            short_days = [d for d in np.argsort(surplus, kind='stable') if surplus[d] < 0 and ('day', d) not in stuck]
+            long_streaks = [e for e in np.flatnonzero(excess > 0) if ('employee', e) not in stuck]
+            if short_days:
+                issue = ('day', short_days[0])
+                move = self.move_off_away(off, excess, surplus, short_days[0])
+            elif long_streaks:
+                issue = ('employee', long_streaks[0])
+                move = self.break_streak(off, excess, surplus, long_streaks[0])
+            else:
+                break
+
+            if move is None:
+                stuck.add(issue)
+                continue
+            e, from_day, to_day, new_excess = move
+            off[e, from_day] = False
+            off[e, to_day] = True
+            excess[e] = new_excess
+            stuck.clear()
+        return off
+
+    def try_move(self, off, e, from_day, to_day):
+        """Streak excess of employee e if its off day moved from from_day to to_day"""
+        row = off[e].copy()
+        row[from_day] = False
+        row[to_day] = True
+        return streak_excess(~row & ~self.leave[e], self.max_run)
+
+    def move_off_away(self, off, excess, surplus, day):
+        """Move someone's off day away from an understaffed day"""
+        best = None
+        candidates = list(np.flatnonzero(off[:, day]))
+        self.rng.shuffle(candidates)
+        for e in candidates:
+            targets = np.flatnonzero(~off[e] & ~self.leave[e] & (surplus > 0))
+            for to_day in targets:
+                new_excess = self.try_move(off, e, day, to_day)
+                if new_excess > excess[e]:
+                    continue
+                score = (new_excess - excess[e], -surplus[to_day])
+                if best is None or score < best[0]:
+                    best = (score, (e, day, to_day, new_excess))
+        return best[1] if best else None
+
+    def break_streak(self, off, excess, surplus, e):
+        """Move one of e's off days into its over-long streak"""
+        working = ~off[e] & ~self.leave[e]
+        runs = run_lengths(working[None, :])[0]
+        too_long = np.flatnonzero(runs > self.max_run)
+        # Candidate days inside the first streak that runs too long
+        end = too_long[0]
+        while end + 1 < self.date_count and working[end + 1]:
+            end += 1
+        start = end - runs[end] + 1
+        best = None
+        for to_day in range(start, end + 1):
+            for from_day in np.flatnonzero(off[e]):
+                new_excess = self.try_move(off, e, from_day, to_day)
+                if new_excess >= excess[e]:
+                    continue
+                # Prefer not to leave a day short: take the off from the fullest day
+                score = (new_excess, surplus[from_day] < 0, -surplus[to_day] + surplus[from_day])
+                if best is None or score < best[0]:
+                    best = (score, (e, from_day, to_day, new_excess))
+        return best[1] if best else None
+
+    def assign_shifts(self, off):
+        """Shift index per working cell, -1 elsewhere"""
+        assigned = np.full(self.leave.shape, -1, dtype=np.int64)
+        worked = np.zeros((self.employee_count, len(self.shifts)), dtype=np.int64)
+        working = ~off & ~self.leave
+
+        for d in range(self.date_count):
+            available = list(np.flatnonzero(working[:, d]))
+            self.rng.shuffle(available)
+            counts = np.zeros(len(self.shifts), dtype=np.int64)
+            previous = assigned[:, d - 1] if d else np.full(self.employee_count, -1)
+
+            def take(e, s):
+                assigned[e, d] = s
+                counts[s] += 1
+                worked[e, s] += 1
+                available.remove(e)
+
+            # Minimums first, preferring people who worked the shift yesterday
+            for s in np.argsort(-self.minimums[d], kind='stable'):
+                while counts[s] < self.minimums[d, s] and available:
+                    e = min(available, key=lambda e: (previous[e] != s, worked[e, s]))
+                    take(e, s)
+
+            # Everyone else: yesterday's shift if it has room, else the emptiest shift
+            for e in list(available):
+                room = np.where(self.maximums[d] >= 0, self.maximums[d] - counts, np.iinfo(np.int64).max)
+                if previous[e] >= 0 and room[previous[e]] > 0:
+                    take(e, previous[e])
+                    continue
+                open_shifts = np.flatnonzero(room > 0)
+                if not len(open_shifts):
+                    break  # Every shift is at its maximum; the rest stay off
+                s = min(open_shifts, key=lambda s: (counts[s] - self.minimums[d, s], worked[e, s]))
+                take(e, s)
+        return assigned
+
+def month_dates(headers, month, month_key):
+    dates = [i for i, header in enumerate(headers) if month_key(header) == month]
+    if not dates:
+        raise AutoRosterError(f"Month {month} has no dates in the roster")
+    return dates[0], dates[-1] + 1
+
+def generate_month(data, month, month_key, coverage, teams=None, off_days=None,
+                   max_consecutive_days=MAX_CONSECUTIVE_DAYS, seed=None, catalog=SHIFT_CATALOG):
+    """Generate a draft month for the selected teams of data
+
+    Returns {'month', 'headers', 'dateOffset', 'teams': {team: [{'id', 'name',
+    'schedule'}]}, 'stats'}; schedules cover the month's dates only.
+    """
+    started = time.perf_counter()
+    headers = data.get('headers', [])
+    lo, hi = month_dates(headers, month, month_key)
+    date_count = hi - lo
+
+    codes = [shift['code'] for shift in catalog.to_list()]
+    work_shifts = [code for code in codes if code and catalog.category(code) in WORK_CATEGORIES]
+    off_codes = [code for code in codes if catalog.category(code) == 'off']
+    if not work_shifts or not off_codes:
+        raise AutoRosterError("The shift catalog needs at least one working shift and one off shift")
+    off_code = off_codes[0]
+    if off_days is None:
+        off_days = round(date_count * OFF_DAYS_PER_WEEK / 7)
+    if not 0 <= off_days <= date_count:
+        raise AutoRosterError(f"offDays must be between 0 and {date_count}")
+    if max_consecutive_days < 1:
+        raise AutoRosterError("maxConsecutiveDays must be at least 1")
+
+    rng = random.Random(seed)
+    result = {'month': month, 'headers': headers[lo:hi], 'dateOffset': lo, 'teams': {}, 'stats': {}}
+    totals = {'employees': 0, 'shortfall': 0, 'overMaximum': 0, 'streakViolations': 0, 'iterations': 0}
+
+    for team_name, employees in data.get('teams', {}).items():
+        if teams and team_name not in teams:
+            continue
+        if not employees:
+            result['teams'][team_name] = []
+            continue
+
+        current = [employee.get('schedule', [])[lo:hi] for employee in employees]
+        leave = np.array([[i < len(schedule) and catalog.category(schedule[i]) == 'leave' for i in range(date_count)]
+                          for schedule in current], dtype=bool)
+
+        minimums, maximums = coverage.target_grid(team_name, work_shifts, headers[lo:hi], month_key)
+        minimums = np.maximum(minimums, 0)
+
+        problem = TeamRoster(leave, work_shifts, minimums, maximums, off_days, max_consecutive_days, rng)
+        off = problem.search_offs()
+        assigned = problem.assign_shifts(off)
+
+        rows = []
+        for e, employee in enumerate(employees):
+            schedule = []
+            for d in range(date_count):
+                if leave[e, d]:
+                    schedule.append(current[e][d])
+                elif assigned[e, d] >= 0:
+                    schedule.append(work_shifts[assigned[e, d]])
+                else:
+                    schedule.append(off_code)
+            rows.append({'id': employee['id'], 'name': employee.get('name', ''), 'schedule': schedule})
+        result['teams'][team_name] = rows
+
+        counts = np.stack([(assigned == s).sum(axis=0) for s in range(len(work_shifts))], axis=1)
+        working = assigned >= 0
+        totals['employees'] += len(employees)
+        totals['shortfall'] += int(np.maximum(minimums - counts, 0).sum())
+        totals['overMaximum'] += int(np.where(maximums >= 0, np.maximum(counts - maximums, 0), 0).sum())
+        totals['streakViolations'] += int(sum(streak_excess(working[e], max_consecutive_days) > 0
+                                              for e in range(len(employees))))
+        totals['iterations'] += problem.iterations
+
+    result['stats'] = dict(totals, offDays=off_days, maxConsecutiveDays=max_consecutive_days,
+                           ms=round((time.perf_counter() - started) * 1000, 1))
+    return result
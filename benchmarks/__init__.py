@@ -0,0 +1 @@
+# benchmarks - Synthetic roster data and performance measurements for the data pipeline
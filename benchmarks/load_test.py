@@ -0,0 +1,326 @@
+# benchmarks/load_test.py - End-to-end HTTP load test against the Flask app
+#
+# Boots app.py in a subprocess against a temporary data directory, serves the
+# synthetic roster from a local stand-in for the published Google Sheets CSVs,
+# syncs it and then drives a mix of viewers, agents and admins.
+#
+# Usage (from the repository root):
+#   python -m benchmarks.load_test
+#   python -m benchmarks.load_test --users 32 --duration 60 --mix viewer=80,agent=15,admin=5
+#   python -m benchmarks.load_test --url http://localhost:5000   (use an already running server)
+import argparse
+import json
+import math
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+
+from benchmarks.roster_generator import RosterGenerator
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+ADMIN_USERNAME = 'admin'
+ADMIN_PASSWORD = 'password123'
+DEFAULT_MIX = {'viewer': 80, 'agent': 15, 'admin': 5}
+
+def free_port():
+    """Find a free local TCP port"""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+def start_sheets_server(csvs):
+    """Serve {month_key: csv text} at /sheets/<month_key>.csv like a published Google Sheet"""
+    class SheetsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            month_key = self.path.rsplit('/', 1)[-1].replace('.csv', '')
+            body = csvs.get(month_key)
+            if body is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            payload = body.encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/csv; charset=utf-8')
+            self.send_header('Content-Length', str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', free_port()), SheetsHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+def start_app(workdir, port, log_file):
+    """Boot app.py in a subprocess with its data directory inside workdir"""
+    env = dict(os.environ)
+    env['PYTHONPATH'] = REPO_ROOT + os.pathsep + env.get('PYTHONPATH', '')
+    command = [
+        sys.executable, '-c',
+        f"import app; app.app.run(host='127.0.0.1', port={port}, threaded=True, debug=False)"
+    ]
+    process = subprocess.Popen(command, cwd=workdir, env=env, stdout=log_file, stderr=subprocess.STDOUT)
+
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('App process exited during startup, see the server log')
+        try:
+            requests.get(base_url + '/admin', timeout=1)
+            return process, base_url
+        except requests.ConnectionError:
+            time.sleep(0.2)
+    process.terminate()
+    raise RuntimeError('App did not start within 30 seconds')
+
+def admin_session(base_url):
+    """Log in as admin and return the authenticated session"""
+    session = requests.Session()
+    response = session.post(base_url + '/admin/login', data={'username': ADMIN_USERNAME, 'password': ADMIN_PASSWORD})
+    if not response.json().get('success'):
+        raise RuntimeError('Admin login failed')
+    return session
+
+class LatencyRecorder:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(int)
+
+    def record(self, route, elapsed_ms, ok):
+        with self.lock:
+            self.latencies[route].append(elapsed_ms)
+            if not ok:
+                self.errors[route] += 1
+
+    def report(self, duration):
+        """Per-route count, errors, throughput and latency percentiles"""
+        report = {}
+        for route, values in sorted(self.latencies.items()):
+            values = sorted(values)
+            report[route] = {
+                'requests': len(values),
+                'errors': self.errors.get(route, 0),
+                'throughput_rps': round(len(values) / duration, 2),
+                'p50_ms': round(percentile(values, 50), 2),
+                'p95_ms': round(percentile(values, 95), 2),
+                'p99_ms': round(percentile(values, 99), 2),
+                'max_ms': round(values[-1], 2)
+            }
+        return report
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100.0 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class VirtualUser:
+    def __init__(self, base_url, roster, recorder, rng, admin):
+        self.base_url = base_url
+        self.roster = roster
+        self.recorder = recorder
+        self.rng = rng
+        self.session = admin_session(base_url) if admin else requests.Session()
+
+    def call(self, route, method, path, **kwargs):
+        start = time.perf_counter()
+        ok = False
+        response = None
+        try:
+            response = self.session.request(method, self.base_url + path, timeout=30, **kwargs)
+            ok = response.status_code < 400
+            if ok and response.headers.get('Content-Type', '').startswith('application/json'):
+                body = response.json()
+                ok = not (isinstance(body, dict) and body.get('success') is False)
+        except requests.RequestException:
+            ok = False
+        self.recorder.record(route, (time.perf_counter() - start) * 1000, ok)
+        return response
+
+    def pick_employee(self):
+        team = self.rng.choice(list(self.roster['teams'].keys()))
+        return team, self.rng.choice(self.roster['teams'][team])
+
+    def viewer(self):
+        self.call('GET get-display-data', 'GET', '/admin/api/get-display-data')
+
+    def agent(self):
+        team, employee = self.pick_employee()
+        headers = self.roster['headers']
+        date_index = self.rng.randrange(len(headers))
+        date = headers[date_index]
+
+        response = self.call('POST get-team-members', 'POST', '/api/schedule-requests/get-team-members', json={
+            'teamName': team, 'currentEmployeeId': employee['id'], 'date': date
+        })
+        members = response.json().get('teamMembers', []) if response is not None and response.ok else []
+        if not members:
+            return
+        # Submissions are checked against the live roster, so read the
+        # requester's current shift instead of the generated one
+        response = self.call('GET projected-display', 'GET', '/admin/api/get-display-data', params={
+            'employees': employee['id'], 'start': date, 'end': date
+        })
+        current = response.json() if response is not None and response.ok else {}
+        shown = current.get('allEmployees', [])
+        if not shown:
+            return
+        requester_shift = (shown[0].get('schedule') or [''])[0]
+        swappable = [member for member in members if member['shift'] != requester_shift]
+        if not swappable:
+            return
+        target = self.rng.choice(swappable)
+        self.call('POST submit-swap-request', 'POST', '/api/schedule-requests/submit-swap-request', json={
+            'requesterId': employee['id'],
+            'requesterName': employee['name'],
+            'targetEmployeeId': target['id'],
+            'targetEmployeeName': target['name'],
+            'team': team,
+            'date': date,
+            'requesterShift': requester_shift,
+            'targetShift': target['shift'],
+            'reason': 'load test'
+        })
+
+    def admin(self):
+        if self.rng.random() < 0.5:
+            team, employee = self.pick_employee()
+            date_index = self.rng.randrange(len(self.roster['headers']))
+            self.call('POST update-shift', 'POST', '/admin/api/update-shift', json={
+                'employeeId': employee['id'],
+                'dateIndex': date_index,
+                'newShift': self.rng.choice(['M2', 'M3', 'D1', 'D2', 'DO']),
+                'source': 'admin',
+                'googleShift': employee['schedule'][date_index]
+            })
+        else:
+            response = self.call('GET get-pending', 'GET', '/admin/api/schedule-requests/get-pending')
+            pending = response.json().get('pending_requests', []) if response is not None and response.ok else []
+            if pending:
+                self.call('POST update-status', 'POST', '/admin/api/schedule-requests/update-status', json={
+                    'requestId': self.rng.choice(pending)['id'],
+                    'status': self.rng.choice(['approved', 'rejected'])
+                })
+
+def run_user(user, role, stop_at):
+    action = getattr(user, role)
+    while time.time() < stop_at:
+        action()
+
+def parse_mix(text):
+    """Parse a role mix like 'viewer=80,agent=15,admin=5'"""
+    mix = {}
+    for part in text.split(','):
+        role, _, weight = part.partition('=')
+        if role.strip() not in DEFAULT_MIX:
+            raise ValueError(f"Unknown role in mix: {role}")
+        mix[role.strip()] = int(weight)
+    return mix
+
+def assign_roles(users, mix):
+    """Split the virtual users across roles in proportion to the mix"""
+    total = sum(mix.values())
+    roles = []
+    for role, weight in mix.items():
+        roles.extend([role] * max(1 if weight else 0, round(users * weight / total)))
+    return roles[:users] if len(roles) >= users else roles + ['viewer'] * (users - len(roles))
+
+def print_report(report, duration):
+    print(f"\n{'route':<28}{'reqs':>8}{'errs':>7}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    total = 0
+    for route, stats in report.items():
+        total += stats['requests']
+        print(f"{route:<28}{stats['requests']:>8}{stats['errors']:>7}{stats['throughput_rps']:>9.1f}"
+              f"{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}")
+    print(f"\nTotal: {total} requests in {duration:.1f}s ({total / duration:.1f} req/s)")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='HTTP load test for the roster app')
+    parser.add_argument('--teams', type=int, default=4)
+    parser.add_argument('--employees', type=int, default=25, help='Employees per team')
+    parser.add_argument('--months', type=int, default=2)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--users', type=int, default=16, help='Concurrent virtual users')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run the mix')
+    parser.add_argument('--mix', default='viewer=80,agent=15,admin=5')
+    parser.add_argument('--url', default='', help='Target an already running server instead of booting one')
+    parser.add_argument('--output', default='', help='Write the report as JSON to this file')
+    args = parser.parse_args(argv)
+
+    generator = RosterGenerator(teams=args.teams, employees_per_team=args.employees, months=args.months, seed=args.seed)
+    roster = generator.roster()
+    mix = parse_mix(args.mix)
+
+    sheets_server = None
+    process = None
+    log_file = None
+    try:
+        if args.url:
+            base_url = args.url.rstrip('/')
+        else:
+            workdir = tempfile.mkdtemp(prefix='roster-load-')
+            os.makedirs(os.path.join(workdir, 'data'))
+            sheets_server, sheets_url = start_sheets_server(generator.sheets_csvs())
+            links = {key: f"{sheets_url}/sheets/{key}.csv" for key in generator.sheets_csvs()}
+            with open(os.path.join(workdir, 'data', 'google_links.json'), 'w', encoding='utf-8') as f:
+                json.dump(links, f, indent=2)
+
+            log_file = open(os.path.join(workdir, 'server.log'), 'w')
+            process, base_url = start_app(workdir, free_port(), log_file)
+            print(f"App started at {base_url} (data and log in {workdir})")
+
+            sync = admin_session(base_url).post(base_url + '/admin/api/sync-google-sheets').json()
+            if not sync.get('success'):
+                raise RuntimeError(f"Initial sync failed: {sync.get('error')}")
+            print(sync['message'])
+
+        recorder = LatencyRecorder()
+        roles = assign_roles(args.users, mix)
+        print(f"Running {len(roles)} users for {args.duration:.0f}s: " +
+              ', '.join(f"{role}={roles.count(role)}" for role in DEFAULT_MIX))
+
+        users = [
+            VirtualUser(base_url, roster, recorder, random.Random(f"{args.seed}-{i}"), admin=(role == 'admin'))
+            for i, role in enumerate(roles)
+        ]
+        start = time.time()
+        stop_at = start + args.duration
+        threads = [threading.Thread(target=run_user, args=(user, role, stop_at)) for user, role in zip(users, roles)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = time.time() - start
+
+        report = recorder.report(duration)
+        print_report(report, duration)
+
+        if args.output:
+            with open(args.output, 'w', encoding='utf-8') as f:
+                json.dump({'duration_s': round(duration, 2), 'users': len(roles), 'mix': mix, 'routes': report}, f, indent=2)
+            print(f"Report written to {args.output}")
+        return 0
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+        if log_file:
+            log_file.close()
+        if sheets_server:
+            sheets_server.shutdown()
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,218 @@
+# benchmarks/roster_generator.py - Seeded synthetic roster generator
+import calendar
+import random
+from datetime import datetime
+
+MONTH_NAMES = ['Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec']
+
+# Relative weights of each shift code in a generated schedule
+DEFAULT_SHIFT_MIX = {
+    'M2': 20,
+    'M3': 20,
+    'M4': 10,
+    'D1': 15,
+    'D2': 10,
+    'DO': 20,
+    'SL': 2,
+    'CL': 2,
+    'EL': 1
+}
+
+class RosterGenerator:
+    def __init__(self, teams=4, employees_per_team=25, months=2, start_year=None, start_month=None,
+                 shift_mix=None, seed=42):
+        now = datetime.now()
+        self.teams = teams
+        self.employees_per_team = employees_per_team
+        self.months = months
+        self.start_year = start_year or now.year
+        self.start_month = start_month or now.month
+        self.shift_mix = shift_mix or DEFAULT_SHIFT_MIX
+        self.seed = seed
+
+        self._codes = list(self.shift_mix.keys())
+        self._weights = list(self.shift_mix.values())
+
+    def team_names(self):
+        """Get the generated team names"""
+        return [f"TEAM-{i + 1:02d}" for i in range(self.teams)]
+
+    def employees(self):
+        """Get (team, name, id) for every generated employee"""
+        employees = []
+        for t, team in enumerate(self.team_names()):
+            for e in range(self.employees_per_team):
+                number = t * self.employees_per_team + e + 1
+                employees.append((team, f"Agent {number:05d}", f"EMP-{number:05d}"))
+        return employees
+
+    def month_keys(self):
+        """Get (year, month) tuples for every generated month"""
+        keys = []
+        year, month = self.start_year, self.start_month
+        for _ in range(self.months):
+            keys.append((year, month))
+            month += 1
+            if month > 12:
+                month = 1
+                year += 1
+        return keys
+
+    def month_link_key(self, year, month):
+        """Get the GOOGLE_SHEETS_LINKS style key for a month, e.g. Oct-2025"""
+        return f"{MONTH_NAMES[month - 1]}-{year}"
+
+    def month_headers(self, year, month):
+        """Get the date headers for a month, e.g. 1Oct ... 31Oct"""
+        num_days = calendar.monthrange(year, month)[1]
+        return [f"{day}{MONTH_NAMES[month - 1]}" for day in range(1, num_days + 1)]
+
+    def month_schedules(self, year, month):
+        """Get {employee_id: [shift, ...]} for a month, stable for a given seed"""
+        rng = random.Random(f"{self.seed}-{year}-{month}")
+        num_days = calendar.monthrange(year, month)[1]
+        schedules = {}
+        for _, _, emp_id in self.employees():
+            schedules[emp_id] = rng.choices(self._codes, weights=self._weights, k=num_days)
+        return schedules
+
+    def sheets_csv(self, year, month):
+        """CSV text in the published Google Sheets layout read by DataLoader.parseCSV
+
+        Line 1 is a free-form title row, line 2 holds Team,Name,ID plus the
+        dates, and the team name is only filled in on the first row of each team.
+        """
+        headers = self.month_headers(year, month)
+        schedules = self.month_schedules(year, month)
+        lines = [
+            f"{MONTH_NAMES[month - 1]} {year} Roster" + ',' * (len(headers) + 2),
+            'Team,Name,ID,' + ','.join(headers)
+        ]
+        previous_team = None
+        for team, name, emp_id in self.employees():
+            team_cell = team if team != previous_team else ''
+            previous_team = team
+            lines.append(','.join([team_cell, name, emp_id] + schedules[emp_id]))
+        return '\n'.join(lines) + '\n'
+
+    def upload_csv(self, year, month):
+        """CSV text in the template layout read by the /admin/api/upload-csv endpoint
+
+        Line 1 holds Team,Name,ID plus the dates, line 2 is the ",,Date" spacer
+        row from the downloadable template and every row repeats its team.
+        """
+        headers = self.month_headers(year, month)
+        schedules = self.month_schedules(year, month)
+        lines = [
+            'Team,Name,ID,' + ','.join(headers),
+            ',,Date,' + ','.join([''] * len(headers))
+        ]
+        for team, name, emp_id in self.employees():
+            lines.append(','.join([team, name, emp_id] + schedules[emp_id]))
+        return '\n'.join(lines) + '\n'
+
+    def sheets_csvs(self):
+        """Get {month_link_key: sheets csv text} for every generated month"""
+        return {
+            self.month_link_key(year, month): self.sheets_csv(year, month)
+            for year, month in self.month_keys()
+        }
+
+    def roster(self):
+        """Build a roster in the merged teams/headers/allEmployees shape used by app.py"""
+        headers = []
+        schedules = {}
+        for year, month in self.month_keys():
+            month_schedules = self.month_schedules(year, month)
+            headers.extend(self.month_headers(year, month))
+            for emp_id, shifts in month_schedules.items():
+                schedules.setdefault(emp_id, []).extend(shifts)
+
+        teams = {}
+        all_employees = []
+        for team, name, emp_id in self.employees():
+            employee = {
+                'name': name,
+                'id': emp_id,
+                'currentTeam': team,
+                'allTeams': [team],
+                'schedule': schedules[emp_id],
+                'team': team
+            }
+            teams.setdefault(team, []).append(employee)
+            all_employees.append(employee)
+
+        return {
+            'teams': teams,
+            'headers': headers,
+            'allEmployees': all_employees
+        }
+
+    def schedule_requests(self, count, roster=None):
+        """Build shift change and swap requests in the schedule_requests.json shape"""
+        roster = roster or self.roster()
+        rng = random.Random(f"{self.seed}-requests")
+        headers = roster['headers']
+        statuses = ['pending', 'approved', 'rejected']
+        shift_change_requests = []
+        swap_requests = []
+
+        for i in range(count):
+            team = rng.choice(list(roster['teams'].keys()))
+            members = roster['teams'][team]
+            date_index = rng.randrange(len(headers))
+            requester = rng.choice(members)
+            status = rng.choice(statuses)
+
+            if i % 2 == 0:
+                shift_change_requests.append({
+                    'id': f"shift_change_{len(shift_change_requests) + 1}",
+                    'employee_id': requester['id'],
+                    'employee_name': requester['name'],
+                    'team': team,
+                    'date': headers[date_index],
+                    'current_shift': requester['schedule'][date_index],
+                    'requested_shift': rng.choice(self._codes),
+                    'reason': 'synthetic',
+                    'status': status,
+                    'type': 'shift_change',
+                    'created_at': datetime.now().isoformat(),
+                    'approved_at': None,
+                    'approved_by': None
+                })
+            else:
+                target = rng.choice(members)
+                swap_requests.append({
+                    'id': f"swap_{len(swap_requests) + 1}",
+                    'requester_id': requester['id'],
+                    'requester_name': requester['name'],
+                    'target_employee_id': target['id'],
+                    'target_employee_name': target['name'],
+                    'team': team,
+                    'date': headers[date_index],
+                    'requester_shift': requester['schedule'][date_index],
+                    'target_shift': target['schedule'][date_index],
+                    'reason': 'synthetic',
+                    'status': status,
+                    'type': 'swap',
+                    'created_at': datetime.now().isoformat(),
+                    'approved_at': None,
+                    'approved_by': None
+                })
+
+        return {
+            'shift_change_requests': shift_change_requests,
+            'swap_requests': swap_requests,
+            'approved_count': len([r for r in shift_change_requests + swap_requests if r['status'] == 'approved']),
+            'pending_count': len([r for r in shift_change_requests + swap_requests if r['status'] == 'pending'])
+        }
+
+def parse_shift_mix(text):
+    """Parse a shift mix like 'M2=20,DO=10' into a weights dict"""
+    shift_mix = {}
+    for part in text.split(','):
+        if not part.strip():
+            continue
+        code, _, weight = part.partition('=')
+        shift_mix[code.strip()] = float(weight) if weight else 1.0
+    return shift_mix
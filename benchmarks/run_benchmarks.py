@@ -0,0 +1,350 @@
+# benchmarks/run_benchmarks.py - Micro-benchmarks for the roster data pipeline
+#
+# Usage (from the repository root):
+#   python -m benchmarks.run_benchmarks
+#   python -m benchmarks.run_benchmarks --teams 10 --employees 100 --months 3
+#   python -m benchmarks.run_benchmarks --save-baseline
+#   python -m benchmarks.run_benchmarks --fail-on-regression
+#
+# Every run works inside a temporary data directory, so the files in data/
+# are never touched.
+import argparse
+import contextlib
+import copy
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.roster_generator import RosterGenerator, parse_shift_mix
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BENCH_DIR = os.path.join(REPO_ROOT, 'benchmarks')
+DEFAULT_BASELINE_FILE = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_RESULTS_FILE = os.path.join(BENCH_DIR, 'results', 'latest.json')
+
+def import_app(workdir):
+    """Import app.py with its relative data paths pointing at workdir"""
+    os.chdir(workdir)
+    os.makedirs('data', exist_ok=True)
+    if REPO_ROOT not in sys.path:
+        sys.path.insert(0, REPO_ROOT)
+    # Keep log output from the measured code out of the timings
+    os.environ.setdefault('LOG_LEVEL', 'WARNING')
+    with quiet():
+        import app
+        from data_loader import DATA_LOADER
+        from schedule_requests import SCHEDULE_REQUESTS
+    return app, DATA_LOADER, SCHEDULE_REQUESTS
+
+@contextlib.contextmanager
+def quiet():
+    """Silence print() output from the code being measured"""
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+def measure(fn, setup=None, repeat=20, warmup=2):
+    """Run fn repeatedly and return timing statistics in milliseconds"""
+    timings = []
+    for i in range(warmup + repeat):
+        state = setup() if setup else None
+        with quiet():
+            start = time.perf_counter()
+            fn(state) if setup else fn()
+            elapsed = (time.perf_counter() - start) * 1000
+        if i >= warmup:
+            timings.append(elapsed)
+
+    timings.sort()
+    return {
+        'min_ms': round(timings[0], 4),
+        'median_ms': round(statistics.median(timings), 4),
+        'mean_ms': round(statistics.fmean(timings), 4),
+        'p95_ms': round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 4),
+        'max_ms': round(timings[-1], 4),
+        'runs': len(timings)
+    }
+
+def run_benchmarks(generator, repeat, request_count):
+    """Run every benchmark and return {name: stats}"""
+    workdir = tempfile.mkdtemp(prefix='roster-bench-')
+    original_cwd = os.getcwd()
+    app, data_loader, schedule_requests = import_app(workdir)
+
+    try:
+        roster = generator.roster()
+        csvs = generator.sheets_csvs()
+        first_csv = next(iter(csvs.values()))
+        results = {}
+
+        # parseCSV on a single month sheet
+        results['parse_csv'] = measure(lambda: data_loader.parseCSV(first_csv), repeat=repeat)
+
+        # loadAllCSVData merge across every generated month, served from memory
+        urls = list(csvs.keys())
+        data_loader.load_google_sheets_urls = lambda: urls
+        data_loader.loadCSVFromGoogleSheets = lambda url: csvs[url]
+        results['load_all_csv_data'] = measure(data_loader.loadAllCSVData, repeat=repeat)
+
+        # update_display_data: Google data plus an admin overlay editing one cell per employee
+        app.GOOGLE_SYNCED_DATA = copy.deepcopy(roster)
+        app.ADMIN_OVERLAY.clear()
+        for i, edited in enumerate(roster['allEmployees']):
+            header = roster['headers'][i % len(roster['headers'])]
+            app.ADMIN_OVERLAY.set_shift(edited['id'], app.roster_month_key(header), header, 'SL')
+        results['update_display_data'] = measure(app.update_display_data, repeat=repeat)
+
+        # Serializing the display roster in the default and compact wire formats
+        from wire_format import encode_roster, dumps_compact
+        results['serialize_roster_full'] = measure(
+            lambda: json.dumps(app.CURRENT_DISPLAY_DATA, sort_keys=True), repeat=repeat
+        )
+        results['serialize_roster_compact'] = measure(
+            lambda: dumps_compact(encode_roster(app.CURRENT_DISPLAY_DATA)), repeat=repeat
+        )
+
+        # Employee search over the display roster: prefix hit and fuzzy fallback
+        from employee_search import EmployeeSearchIndex
+        search_index = EmployeeSearchIndex()
+        results['employee_search_rebuild'] = measure(lambda: search_index.rebuild(app.CURRENT_DISPLAY_DATA), repeat=repeat)
+        searched = roster['allEmployees'][-1]
+        results['employee_search_prefix'] = measure(lambda: search_index.search(searched['id'][:6]), repeat=repeat)
+        results['employee_search_fuzzy'] = measure(lambda: search_index.search('agnet'), repeat=repeat)
+
+        # Coverage cube of the display roster: full build, then a cached month report
+        from staffing_coverage import CoverageCube, CoverageEngine
+        results['coverage_build'] = measure(lambda: CoverageCube.build(app.CURRENT_DISPLAY_DATA), repeat=repeat)
+        coverage = CoverageEngine(os.path.join(workdir, 'staffing_targets.json'))
+        month_window = (0, min(31, len(roster['headers'])))
+        results['coverage_report_cached'] = measure(
+            lambda: coverage.report(app.CURRENT_DISPLAY_DATA, app.ROSTER_VERSION, date_window=month_window), repeat=repeat
+        )
+
+        # Monthly workload report of the first month, built from scratch
+        from workload_report import WorkloadReports
+        first_month = app.roster_month_key(roster['headers'][0])
+        results['workload_report_month'] = measure(
+            lambda: WorkloadReports().build(app.CURRENT_DISPLAY_DATA, first_month, app.roster_month_key), repeat=repeat
+        )
+
+        # Employee summaries: full count of the display roster, then one cell edit
+        from employee_summary import EmployeeSummaries
+        summaries = EmployeeSummaries()
+        results['employee_summaries_rebuild'] = measure(
+            lambda: summaries.rebuild(app.CURRENT_DISPLAY_DATA, app.roster_month_key), repeat=repeat
+        )
+        summarized = roster['allEmployees'][0]
+        results['employee_summaries_update_cell'] = measure(
+            lambda: summaries.update_cell(summarized['id'], first_month, 'M2', 'D1'), repeat=repeat
+        )
+
+        # Swap candidates for one employee over a week, across every team
+        from swap_candidates import ShiftDateIndex, find_swap_candidates
+        shift_index = ShiftDateIndex()
+        results['shift_date_index_build'] = measure(lambda: shift_index.build(app.CURRENT_DISPLAY_DATA), repeat=repeat)
+        requester = app.CURRENT_DISPLAY_DATA['allEmployees'][0]
+        results['swap_candidates_week'] = measure(
+            lambda: find_swap_candidates(shift_index, app.CURRENT_DISPLAY_DATA['headers'], requester,
+                                         requester.get('currentTeam'), (0, 7), want_shifts=['D1'], teams=None),
+            repeat=repeat
+        )
+
+        # Auto-roster of the first month for every team, against fixed minimums
+        from auto_roster import generate_month
+        targets = CoverageEngine(os.path.join(workdir, 'auto_roster_targets.json'))
+        targets.targets = {'default': {'M2': {'min': 3}, 'M3': {'min': 3}, 'D1': {'min': 2}}, 'teams': {}}
+        results['auto_roster_month'] = measure(
+            lambda: generate_month(app.CURRENT_DISPLAY_DATA, first_month, app.roster_month_key, targets, seed=1),
+            repeat=repeat
+        )
+
+        # Google-vs-admin diff with one overridden cell per employee, computed from scratch
+        from roster_diff import diff_rosters
+        results['roster_diff'] = measure(
+            lambda: diff_rosters(app.GOOGLE_SYNCED_DATA, app.ADMIN_MODIFIED_DATA), repeat=repeat
+        )
+
+        # As-of query replaying a full checkpoint interval of journaled cell edits
+        from roster_history import RosterHistory, CHECKPOINT_INTERVAL
+        history = RosterHistory(os.path.join(workdir, 'roster_history')).load()
+        history.checkpoint(app.CURRENT_DISPLAY_DATA, 'benchmark')
+        journaled = app.CURRENT_DISPLAY_DATA['allEmployees']
+        for i in range(CHECKPOINT_INTERVAL - 1):
+            history.record_cell(journaled[i % len(journaled)]['id'], roster['headers'][i % len(roster['headers'])], 'M2', 'SL' if i % 2 else 'CL')
+        as_of = datetime.now().isoformat(timespec='microseconds')
+        results['roster_as_of'] = measure(lambda: history.as_of(as_of), repeat=repeat)
+
+        # One admin cell edit recorded as an undo step, then undone
+        from overlay_history import OverlayHistory
+        undo_history = OverlayHistory(app.ADMIN_OVERLAY)
+        undone = roster['allEmployees'][0]
+        undo_month = app.roster_month_key(roster['headers'][1])
+
+        def edit_and_undo():
+            with undo_history.action('benchmark'):
+                app.ADMIN_OVERLAY.set_shift(undone['id'], undo_month, roster['headers'][1], 'CL')
+            undo_history.undo()
+        results['overlay_edit_undo'] = measure(edit_and_undo, repeat=repeat)
+
+        # Importing 500 new employees through the bulk employee rows, then undoing it
+        from employee_bulk import apply_rows
+        bulk_teams = list(app.ADMIN_MODIFIED_DATA['teams'])
+        bulk_rows = [{'action': 'add', 'id': f'BULK-{i:05d}', 'name': f'Bulk Agent {i}', 'team': bulk_teams[i % len(bulk_teams)]}
+                     for i in range(500)]
+
+        def import_and_undo():
+            with undo_history.action('benchmark'):
+                apply_rows(app.ADMIN_OVERLAY, app.employee_index(app.ADMIN_MODIFIED_DATA), set(bulk_teams), bulk_rows)
+            undo_history.undo()
+        results['bulk_employee_import'] = measure(import_and_undo, repeat=repeat)
+
+        # track_modified_shift, including the modified_shifts.json rewrite
+        employee = roster['allEmployees'][0]
+        app.MODIFIED_SHIFTS_DATA = {'modifications': [], 'monthly_stats': {}}
+        results['track_modified_shift'] = measure(
+            lambda: app.track_modified_shift(
+                employee_id=employee['id'],
+                date_index=0,
+                old_shift='M2',
+                new_shift='D1',
+                employee_name=employee['name'],
+                team_name=employee['currentTeam'],
+                date_header=roster['headers'][0],
+                modified_by='benchmark'
+            ),
+            repeat=repeat
+        )
+
+        # ScheduleRequests queries over a synthetic request history
+        schedule_requests.requests = generator.schedule_requests(request_count, roster)
+        schedule_requests.update_counts()
+        team_name = employee['currentTeam']
+        date = roster['headers'][len(roster['headers']) // 2]
+        results['requests_get_pending'] = measure(schedule_requests.get_pending_requests, repeat=repeat)
+        results['requests_get_employee'] = measure(
+            lambda: schedule_requests.get_employee_requests(employee['id']), repeat=repeat
+        )
+        results['requests_get_team_members'] = measure(
+            lambda: schedule_requests.get_team_members(team_name, employee['id'], date, app.ADMIN_MODIFIED_DATA),
+            repeat=repeat
+        )
+
+        # Multi-way matching over the synthetic pending requests
+        from swap_matching import find_matches
+        lookup = app.shift_lookup(app.ADMIN_MODIFIED_DATA)
+        results['requests_find_matches'] = measure(
+            lambda: find_matches(schedule_requests.get_pending_requests(), lookup), repeat=repeat
+        )
+
+        # Persistence of every data file; rosters are written as month partitions
+        results['save_google_data'] = measure(app.save_google_data, repeat=repeat)
+        results['save_admin_data'] = measure(app.save_admin_data, repeat=repeat)
+        edited_months = app.date_month_keys(app.GOOGLE_STORE, app.GOOGLE_SYNCED_DATA, [0])
+        results['save_google_data_one_month'] = measure(
+            lambda: app.save_google_data(months=edited_months), repeat=repeat
+        )
+        results['save_modified_shifts'] = measure(app.save_modified_shifts, repeat=repeat)
+        results['save_schedule_requests'] = measure(schedule_requests.save_requests, repeat=repeat)
+
+        # Cold-start loading of the active month partitions written by save_google_data
+        results['load_google_data_snapshot'] = measure(app.load_google_data, repeat=repeat)
+
+        return results
+    finally:
+        os.chdir(original_cwd)
+
+def compare(results, baseline, threshold):
+    """Compare median timings against a baseline and return the regressed benchmark names"""
+    regressions = []
+    print(f"\n{'benchmark':<28}{'baseline':>12}{'current':>12}{'ratio':>9}")
+    for name, stats in results.items():
+        base = baseline.get('results', {}).get(name)
+        if not base or not base.get('median_ms'):
+            print(f"{name:<28}{'-':>12}{stats['median_ms']:>12.3f}{'new':>9}")
+            continue
+        ratio = stats['median_ms'] / base['median_ms']
+        flag = ' <-- regression' if ratio > threshold else ''
+        print(f"{name:<28}{base['median_ms']:>12.3f}{stats['median_ms']:>12.3f}{ratio:>8.2f}x{flag}")
+        if ratio > threshold:
+            regressions.append(name)
+    return regressions
+
+def write_json(path, payload):
+    """Write a results payload to disk"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(payload, f, indent=2)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run roster data pipeline micro-benchmarks')
+    parser.add_argument('--teams', type=int, default=4)
+    parser.add_argument('--employees', type=int, default=25, help='Employees per team')
+    parser.add_argument('--months', type=int, default=2)
+    parser.add_argument('--shift-mix', default='', help='Shift weights, e.g. M2=20,D1=15,DO=10')
+    parser.add_argument('--requests', type=int, default=500, help='Synthetic schedule requests')
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--repeat', type=int, default=20)
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE_FILE)
+    parser.add_argument('--output', default=DEFAULT_RESULTS_FILE)
+    parser.add_argument('--save-baseline', action='store_true', help='Store this run as the new baseline')
+    parser.add_argument('--threshold', type=float, default=1.25, help='Median ratio counted as a regression')
+    parser.add_argument('--fail-on-regression', action='store_true')
+    args = parser.parse_args(argv)
+
+    generator = RosterGenerator(
+        teams=args.teams,
+        employees_per_team=args.employees,
+        months=args.months,
+        shift_mix=parse_shift_mix(args.shift_mix) if args.shift_mix else None,
+        seed=args.seed
+    )
+
+    print(f"Running benchmarks: {args.teams} teams x {args.employees} employees, {args.months} months")
+    results = run_benchmarks(generator, args.repeat, args.requests)
+
+    payload = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'teams': args.teams,
+            'employees_per_team': args.employees,
+            'months': args.months,
+            'requests': args.requests,
+            'seed': args.seed,
+            'repeat': args.repeat
+        },
+        'results': results
+    }
+    write_json(args.output, payload)
+    print(f"Results written to {args.output}")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('teams') != args.teams or \
+                baseline.get('meta', {}).get('employees_per_team') != args.employees or \
+                baseline.get('meta', {}).get('months') != args.months:
+            print("Warning: baseline was recorded with a different roster size")
+        regressions = compare(results, baseline, args.threshold)
+    else:
+        for name, stats in results.items():
+            print(f"{name:<28}{stats['median_ms']:>12.3f} ms")
+
+    if args.save_baseline:
+        write_json(args.baseline, payload)
+        print(f"Baseline saved to {args.baseline}")
+
+    if regressions:
+        print(f"\n{len(regressions)} benchmark(s) regressed beyond {args.threshold:.2f}x")
+        if args.fail_on_regression:
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
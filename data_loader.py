@@ -4,7 +4,12 @@ import io
 import requests
 from datetime import datetime, timedelta
 import json
+import logging
 import os
+import time
+from metrics import METRICS
+
+logger = logging.getLogger(__name__)
 
 class DataLoader:
     def __init__(self):
@@ -23,31 +28,33 @@ class DataLoader:
                     links_data = json.load(f)
                     # Extract all URLs from the stored links
                     urls = list(links_data.values())
-                    print(f"Loaded {len(urls)} Google Sheets URLs from storage")
+                    logger.debug("Loaded Google Sheets URLs from storage", extra={'url_count': len(urls)})
                     return urls
             
-            print("No Google Sheets links found in storage, using empty list")
+            logger.info("No Google Sheets links found in storage, using empty list")
             return []
             
-        except Exception as e:
-            print(f"Error loading Google Sheets URLs: {e}")
+        except Exception:
+            logger.exception("Error loading Google Sheets URLs")
             return []
 
     # Load CSV from Google Sheets
+    @METRICS.timed('fetch_csv')
     def loadCSVFromGoogleSheets(self, url):
         try:
-            print(f"Fetching data from: {url}")
+            logger.debug("Fetching sheet", extra={'url': url})
             response = requests.get(url)
             if response.status_code == 200:
-                print(f"Successfully fetched data from {url}")
+                logger.debug("Fetched sheet", extra={'url': url, 'bytes': len(response.content)})
                 return response.text
             else:
                 raise Exception(f"HTTP error! status: {response.status_code}")
         except Exception as error:
-            print(f"Error loading CSV from {url}: {error}")
+            logger.warning("Error loading CSV", extra={'url': url, 'error': str(error)})
             raise error
 
     # Parse CSV data
+    @METRICS.timed('parse_csv')
     def parseCSV(self, csvText):
         lines = [line.strip() for line in csvText.split('\n') if line.strip()]
         result = {}
@@ -100,7 +107,9 @@ class DataLoader:
         }
 
     # Load and merge all CSV data
-    def loadAllCSVData(self):
+    # Pass a sync_trace.SyncTrace to record per-URL fetch times and phase durations
+    @METRICS.timed('load_all_csv_data')
+    def loadAllCSVData(self, trace=None):
         allTeamsData = {}
         allDateHeaders = []
         monthData = []
@@ -109,7 +118,7 @@ class DataLoader:
         self.GOOGLE_SHEETS_URLS = self.load_google_sheets_urls()
         
         if not self.GOOGLE_SHEETS_URLS:
-            print("No Google Sheets URLs configured. Please add links in the admin panel.")
+            logger.warning("No Google Sheets URLs configured. Please add links in the admin panel.")
             # Return empty data structure
             return {
                 'teams': {},
@@ -117,32 +126,52 @@ class DataLoader:
                 'allEmployees': []
             }
         
-        print(f"Loading data from {len(self.GOOGLE_SHEETS_URLS)} Google Sheets URLs...")
+        logger.info("Loading Google Sheets data", extra={'url_count': len(self.GOOGLE_SHEETS_URLS)})
         
         # First, load all data separately
         for url in self.GOOGLE_SHEETS_URLS:
+            csvText = None
+            fetch_start = time.perf_counter()
             try:
-                print(f"Loading from: {url}")
                 csvText = self.loadCSVFromGoogleSheets(url)
+                if trace:
+                    fetch_seconds = time.perf_counter() - fetch_start
+                    trace.add_phase_time('csv_fetch', fetch_seconds)
+                    trace.record_fetch(url, fetch_seconds, len(csvText.encode('utf-8')), True)
+                
+                parse_start = time.perf_counter()
                 parsedData = self.parseCSV(csvText)
                 monthData.append(parsedData)
+                if trace:
+                    trace.add_phase_time('csv_parse', time.perf_counter() - parse_start)
+                    trace.count('rows_parsed', len(parsedData['allEmployees']))
                 
                 # Collect all unique date headers
                 for header in parsedData['headers']:
                     if header not in allDateHeaders:
                         allDateHeaders.append(header)
-                print(f"Successfully loaded data from {url}")
+                logger.debug("Loaded sheet", extra={'url': url, 'rows': len(parsedData['allEmployees'])})
             except Exception as error:
-                print(f"Error loading data from {url}: {error}")
+                logger.error("Error loading sheet", extra={'url': url, 'error': str(error)})
+                if trace:
+                    if csvText is None:
+                        fetch_seconds = time.perf_counter() - fetch_start
+                        trace.add_phase_time('csv_fetch', fetch_seconds)
+                        trace.record_fetch(url, fetch_seconds, 0, False, str(error))
+                    else:
+                        trace.fetches[-1].update({'ok': False, 'error': f"Parse error: {error}"})
+                    trace.count('failed_sheets')
         
         # If no data was loaded successfully, create sample data
         if not monthData:
-            print("No data loaded from Google Sheets, creating sample data")
+            logger.warning("No data loaded from Google Sheets, creating sample data")
             sample_data = self.create_sample_data()
             monthData.append(sample_data)
             allDateHeaders.extend(sample_data['headers'])
         
         # Now merge the data properly
+        merge_start = time.perf_counter()
+        employees_by_id = {}  # id -> merged employee, across ALL teams
         for month in monthData:
             for team, employees in month['teams'].items():
                 if team not in allTeamsData:
@@ -150,16 +179,7 @@ class DataLoader:
                 
                 for employee in employees:
                     # Find employee across ALL teams
-                    existing_employee = None
-                    
-                    # Search through all teams to find this employee
-                    for search_team, search_employees in allTeamsData.items():
-                        for emp in search_employees:
-                            if emp['id'] == employee['id']:
-                                existing_employee = emp
-                                break
-                        if existing_employee:
-                            break
+                    existing_employee = employees_by_id.get(employee['id'])
                     
                     if existing_employee:
                         # Update existing employee's schedule
@@ -185,6 +205,11 @@ class DataLoader:
                                 new_employee['schedule'][global_index] = employee['schedule'][i]
                         
                         allTeamsData[team].append(new_employee)
+                        employees_by_id[new_employee['id']] = new_employee
+        
+        METRICS.observe_phase('load_all_csv_data.merge', time.perf_counter() - merge_start)
+        if trace:
+            trace.add_phase_time('csv_merge', time.perf_counter() - merge_start)
         
         # Update global data
         self.teamsData = allTeamsData
@@ -197,7 +222,11 @@ class DataLoader:
                 emp['team'] = team
                 self.allEmployees.append(emp)
         
-        print('Data loaded successfully:', {
+        if trace:
+            trace.count('employees_merged', len(self.allEmployees))
+            trace.count('dates', len(self.dateHeaders))
+        
+        logger.info('Data loaded successfully', extra={
             'totalDates': len(self.dateHeaders),
             'totalTeams': len(self.teamsData),
             'totalEmployees': len(self.allEmployees)
@@ -278,7 +307,7 @@ class DataLoader:
                 if date_string in header or header in date_string:
                     return header
             
-            print(f'No matching date found for: {date_string}')
+            logger.debug("No matching date found", extra={'date': date_string})
             return date_string
         
         today_match = find_matching_date(today_formatted, self.dateHeaders)
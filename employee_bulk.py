@@ -0,0 +1,81 @@
+# employee_bulk.py - Apply a batch of employee adds, edits, moves and deletes
+#
+#   {'action': 'add',    'id', 'name', 'team'}
+#   {'action': 'edit',   'id', 'oldId'?, 'name'?, 'team'?}   oldId re-keys the employee
+#   {'action': 'move',   'id', 'team'}
+#   {'action': 'delete', 'id'}
+#
+# Rows are applied in order to the admin overlay. Each row is checked against
+# a working {employee id: team} map that starts from the admin view's id index
+# and follows the rows already applied, so a row may refer to an employee an
+# earlier row added or re-keyed. A row that fails validation changes nothing
+# and the rest still apply. The caller persists and rebuilds the view once.
+ACTIONS = ('add', 'edit', 'move', 'delete')
+MAX_ROWS = 5000
+
+class BulkEmployeeError(ValueError):
+    pass
+
+def clean(value):
+    return value.strip() if isinstance(value, str) else value
+
+def apply_row(overlay, current, team_names, row):
+    """Validate and apply one row, raising BulkEmployeeError if it is invalid"""
+    if not isinstance(row, dict):
+        raise BulkEmployeeError('Row must be an object')
+    action = row.get('action')
+    employee_id = clean(row.get('id'))
+    name = clean(row.get('name')) or None
+    team = clean(row.get('team')) or None
+    if action not in ACTIONS:
+        raise BulkEmployeeError(f"Unknown action '{action}', expected one of {', '.join(ACTIONS)}")
+    if not employee_id:
+        raise BulkEmployeeError('Employee ID is required')
+    if team is not None and team not in team_names:
+        raise BulkEmployeeError(f"Unknown team '{team}'")
+
+    if action == 'add':
+        if not name or not team:
+            raise BulkEmployeeError('Name and team are required')
+        if employee_id in current:
+            raise BulkEmployeeError(f"Employee ID {employee_id} is already used ({current[employee_id]})")
+        overlay.add_employee(employee_id, name, team)
+        current[employee_id] = team
+        return
+
+    old_id = (clean(row.get('oldId')) or employee_id) if action == 'edit' else employee_id
+    if old_id not in current:
+        raise BulkEmployeeError(f"Employee {old_id} not found")
+
+    if action == 'delete':
+        overlay.delete_employee(old_id)
+        del current[old_id]
+        return
+
+    if action == 'move' and not team:
+        raise BulkEmployeeError('Team is required')
+    if action == 'edit' and old_id != employee_id and employee_id in current:
+        raise BulkEmployeeError(f"Employee ID {employee_id} is already used ({current[employee_id]})")
+    overlay.update_employee(old_id, name=name if action == 'edit' else None, team=team,
+                            new_id=employee_id if old_id != employee_id else None)
+    current[employee_id] = team or current.pop(old_id)
+    if old_id != employee_id:
+        current.pop(old_id, None)
+
+def apply_rows(overlay, index, team_names, rows):
+    """Apply rows to overlay; returns [{'row', 'action', 'id', 'success', 'error'?}]"""
+    if not isinstance(rows, list) or not rows:
+        raise BulkEmployeeError('rows must be a non-empty list')
+    if len(rows) > MAX_ROWS:
+        raise BulkEmployeeError(f'At most {MAX_ROWS} rows per request')
+    current = {employee_id: team_name for employee_id, (team_name, _, _) in index.entries.items()}
+    results = []
+    for position, row in enumerate(rows):
+        result = {'row': position, 'action': row.get('action') if isinstance(row, dict) else None,
+                  'id': row.get('id') if isinstance(row, dict) else None}
+        try:
+            apply_row(overlay, current, team_names, row)
+            results.append(dict(result, success=True))
+        except BulkEmployeeError as e:
+            results.append(dict(result, success=False, error=str(e)))
+    return results
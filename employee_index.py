@@ -0,0 +1,68 @@
+# employee_index.py - id -> (team, position, employee) index over a roster dataset
+#
+# An index is bound to one dataset object. ensure(data) rebuilds it when the
+# dataset was replaced (sync, load, update_display_data); code that changes
+# team membership of a dataset in place calls add()/build() itself.
+import logging
+
+logger = logging.getLogger(__name__)
+
+class DuplicateEmployeeError(ValueError):
+    pass
+
+class EmployeeIndex:
+    def __init__(self, name):
+        self.name = name
+        self.entries = {}   # employee id -> (team name, position in team, employee)
+        self.data = None
+
+    def build(self, data):
+        """Index every employee of a {'teams': ...} dataset"""
+        entries = {}
+        duplicates = []
+        for team_name, employees in (data or {}).get('teams', {}).items():
+            for position, employee in enumerate(employees):
+                if employee['id'] in entries:
+                    duplicates.append(employee['id'])
+                    continue  # The first occurrence wins, as the old linear scans did
+                entries[employee['id']] = (team_name, position, employee)
+        if duplicates:
+            logger.warning("Duplicate employee ids in roster", extra={'index': self.name, 'ids': duplicates})
+        self.entries = entries
+        self.data = data
+        return self
+
+    def ensure(self, data):
+        """Rebuild if the index belongs to a different dataset object"""
+        if self.data is not data:
+            self.build(data)
+        return self
+
+    def get(self, employee_id):
+        """(team name, position, employee), or (None, None, None)"""
+        return self.entries.get(employee_id, (None, None, None))
+
+    def find(self, employee_id):
+        """(team name, employee), or (None, None)"""
+        team_name, _, employee = self.get(employee_id)
+        return team_name, employee
+
+    def __contains__(self, employee_id):
+        return employee_id in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def check_new_id(self, employee_id, current_id=None):
+        """Raise DuplicateEmployeeError if employee_id is taken by another employee"""
+        if employee_id in self.entries and employee_id != current_id:
+            team_name, _, employee = self.entries[employee_id]
+            raise DuplicateEmployeeError(
+                f"Employee ID {employee_id} is already used by {employee.get('name', '')} ({team_name})"
+            )
+
+    def add(self, team_name, employee):
+        """Register an employee just appended to data['teams'][team_name]"""
+        self.check_new_id(employee['id'])
+        position = len(self.data['teams'][team_name]) - 1
+        self.entries[employee['id']] = (team_name, position, employee)
@@ -0,0 +1,173 @@
+# employee_search.py - Prefix and fuzzy search over employee names and ids
+#
+# Prefix search: a sorted list of (key, employee id) pairs, where the keys of
+# an employee are its lowercased id, full name and each word of the name. A
+# lookup is one bisect plus a scan of at most `limit` entries.
+#
+# Fuzzy fallback: every distinct name word is also indexed under each of its
+# single-character deletions, so a query word one typo away from a name word
+# is found with len(query) dictionary lookups instead of a scan.
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LIMIT = 10
+FUZZY_MIN_LENGTH = 3
+
+def search_keys(employee_id, name):
+    """Index keys of one employee"""
+    name = (name or '').lower().strip()
+    keys = {employee_id.lower(), name}
+    keys.update(name.split())
+    keys.discard('')
+    return keys
+
+def name_words(name):
+    return set((name or '').lower().split())
+
+def deletions(word):
+    """The word and every variant of it with one character removed"""
+    return {word} | {word[:i] + word[i + 1:] for i in range(len(word))}
+
+def edit_distance(a, b, limit):
+    """Levenshtein distance, or limit + 1 once it is certain to exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        if min(current) > limit:
+            return limit + 1
+        previous = current
+    return previous[-1]
+
+class EmployeeSearchIndex:
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.entries = []     # sorted (key, employee id)
+        self.employees = {}   # employee id -> {'id', 'name', 'team'}
+        self.word_ids = {}    # name word -> employee ids
+        self.variants = {}    # deletion variant -> name words
+
+    def rebuild(self, data):
+        """Index every employee of a {'teams': ...} roster from scratch"""
+        with self.lock:
+            self.entries = []
+            self.employees = {}
+            self.word_ids = {}
+            self.variants = {}
+            for team_name, team in data.get('teams', {}).items():
+                for employee in team:
+                    self.employees[employee['id']] = {'id': employee['id'], 'name': employee.get('name', ''), 'team': team_name}
+                    self.entries.extend((key, employee['id']) for key in search_keys(employee['id'], employee.get('name')))
+                    self.add_words(employee['id'], employee.get('name'))
+            self.entries.sort()
+        logger.debug("Employee search index rebuilt", extra={'employees': len(self.employees), 'keys': len(self.entries)})
+
+    def add_words(self, employee_id, name):
+        for word in name_words(name):
+            if word not in self.word_ids:
+                self.word_ids[word] = set()
+                for variant in deletions(word):
+                    self.variants.setdefault(variant, set()).add(word)
+            self.word_ids[word].add(employee_id)
+
+    def remove_words(self, employee_id, name):
+        for word in name_words(name):
+            ids = self.word_ids.get(word)
+            if ids is None:
+                continue
+            ids.discard(employee_id)
+            if not ids:
+                del self.word_ids[word]
+                for variant in deletions(word):
+                    words = self.variants.get(variant)
+                    if words is not None:
+                        words.discard(word)
+                        if not words:
+                            del self.variants[variant]
+
+    def add(self, employee_id, name, team):
+        """Insert or update one employee"""
+        with self.lock:
+            self.remove(employee_id)
+            self.employees[employee_id] = {'id': employee_id, 'name': name or '', 'team': team}
+            for key in search_keys(employee_id, name):
+                bisect.insort(self.entries, (key, employee_id))
+            self.add_words(employee_id, name)
+
+    def remove(self, employee_id):
+        with self.lock:
+            record = self.employees.pop(employee_id, None)
+            if record is None:
+                return
+            for key in search_keys(employee_id, record['name']):
+                i = bisect.bisect_left(self.entries, (key, employee_id))
+                if i < len(self.entries) and self.entries[i] == (key, employee_id):
+                    del self.entries[i]
+            self.remove_words(employee_id, record['name'])
+
+    def rename_team(self, old_name, new_name):
+        with self.lock:
+            for record in self.employees.values():
+                if record['team'] == old_name:
+                    record['team'] = new_name
+
+    def prefix_matches(self, query, limit):
+        """Up to limit employee ids with a key starting with query
+
+        Keys sort shortest-first within a prefix, so exact matches come first.
+        """
+        found = []
+        i = bisect.bisect_left(self.entries, (query,))
+        while i < len(self.entries) and len(found) < limit:
+            key, employee_id = self.entries[i]
+            if not key.startswith(query):
+                break
+            if employee_id not in found:
+                found.append(employee_id)
+            i += 1
+        return found
+
+    def fuzzy_matches(self, query, limit):
+        """Up to limit employee ids with a name word one edit away from a query word"""
+        found = []
+        for query_word in query.split():
+            if len(query_word) < FUZZY_MIN_LENGTH:
+                continue
+            words = set()
+            for variant in deletions(query_word):
+                words |= self.variants.get(variant, set())
+            for word in sorted(words, key=lambda word: (edit_distance(query_word, word, 1), word)):
+                if edit_distance(query_word, word, 1) > 1:
+                    continue
+                for employee_id in self.word_ids[word]:
+                    if employee_id not in found:
+                        found.append(employee_id)
+                    if len(found) >= limit:
+                        return found
+        return found
+
+    def search(self, query, limit=DEFAULT_LIMIT):
+        """Find employees by id or name prefix, falling back to fuzzy matching"""
+        query = (query or '').lower().strip()
+        if not query:
+            return []
+        with self.lock:
+            results = [dict(self.employees[employee_id], match='prefix') for employee_id in self.prefix_matches(query, limit)]
+            if len(results) < limit and len(query) >= FUZZY_MIN_LENGTH:
+                found = {result['id'] for result in results}
+                for employee_id in self.fuzzy_matches(query, limit * 2):
+                    if len(results) >= limit:
+                        break
+                    if employee_id not in found:
+                        found.add(employee_id)
+                        results.append(dict(self.employees[employee_id], match='fuzzy'))
+            return results
+
+# Global instance, indexing the display roster
+EMPLOYEE_SEARCH = EmployeeSearchIndex()
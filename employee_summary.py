@@ -0,0 +1,142 @@
+# employee_summary.py - Per-employee, per-month shift counters for the display roster
+#
+# Counters are {employee id: {month key: {shift code: days}}}. They are built
+# once from the display roster and then kept current without rescanning it:
+#
+#   update_cell()   one cell edit or approved request: two counter changes
+#   sync()          a new Google sync: only cells that differ are counted
+#   refresh_employee() / remove()  employee add, edit, rename and delete
+#
+# Work/off/leave days and hours are derived from the counters and the shift
+# catalog when a summary is read, so catalog edits need no recount.
+import logging
+import threading
+
+from shift_catalog import SHIFT_CATALOG, WORK_CATEGORIES
+
+logger = logging.getLogger(__name__)
+
+def count_schedule(schedule, months):
+    """{month key: {shift code: days}} of one schedule; months[i] is the month of date i"""
+    counts = {}
+    for month, shift in zip(months, schedule):
+        month_counts = counts.setdefault(month, {})
+        month_counts[shift] = month_counts.get(shift, 0) + 1
+    return counts
+
+class EmployeeSummaries:
+    def __init__(self, catalog=SHIFT_CATALOG):
+        self.catalog = catalog
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.headers = []
+        self.months = []   # month key of each header
+
+    def rebuild(self, data, month_key):
+        """Count every employee of a {'teams', 'headers'} roster from scratch"""
+        with self.lock:
+            self.headers = list(data.get('headers', []))
+            self.months = [month_key(header) for header in self.headers]
+            self.counters = {
+                employee['id']: count_schedule(employee.get('schedule', []), self.months)
+                for employees in data.get('teams', {}).values()
+                for employee in employees
+            }
+        logger.debug("Employee summaries rebuilt", extra={'employees': len(self.counters)})
+
+    def update_cell(self, employee_id, month, old_shift, new_shift):
+        """Move one day of employee_id's month from old_shift to new_shift"""
+        if old_shift == new_shift:
+            return
+        with self.lock:
+            counts = self.counters.get(employee_id, {}).get(month)
+            if counts is None:
+                return
+            if counts.get(old_shift, 0) > 1:
+                counts[old_shift] -= 1
+            else:
+                counts.pop(old_shift, None)
+            counts[new_shift] = counts.get(new_shift, 0) + 1
+
+    def refresh_employee(self, employee_id, employee, old_id=None):
+        """Recount one employee (None removes it), after an add, edit or rename"""
+        with self.lock:
+            if old_id is not None:
+                self.counters.pop(old_id, None)
+            if employee is None:
+                self.counters.pop(employee_id, None)
+            else:
+                self.counters[employee_id] = count_schedule(employee.get('schedule', []), self.months)
+
+    def remove(self, employee_id):
+        self.refresh_employee(employee_id, None)
+
+    def sync(self, old_data, new_data, month_key):
+        """Update counters from the roster before a sync to the one after it"""
+        if list(new_data.get('headers', [])) != self.headers:
+            # Dates were added or dropped: every month column moved
+            self.rebuild(new_data, month_key)
+            return
+
+        old_schedules = {
+            employee['id']: employee.get('schedule', [])
+            for employees in (old_data or {}).get('teams', {}).values()
+            for employee in employees
+        }
+        seen = set()
+        changed_cells = 0
+        for employees in new_data.get('teams', {}).values():
+            for employee in employees:
+                employee_id = employee['id']
+                seen.add(employee_id)
+                schedule = employee.get('schedule', [])
+                old_schedule = old_schedules.get(employee_id)
+                if old_schedule is schedule:
+                    continue
+                if old_schedule is None or employee_id not in self.counters or len(old_schedule) != len(schedule):
+                    self.refresh_employee(employee_id, employee)
+                    continue
+                for i, (old_shift, new_shift) in enumerate(zip(old_schedule, schedule)):
+                    if old_shift != new_shift:
+                        self.update_cell(employee_id, self.months[i], old_shift, new_shift)
+                        changed_cells += 1
+
+        with self.lock:
+            for employee_id in set(self.counters) - seen:
+                del self.counters[employee_id]
+        logger.debug("Employee summaries synced", extra={'changed_cells': changed_cells})
+
+    def month_summary(self, counts):
+        """Day and hour totals of one month's {shift code: days} counters"""
+        summary = {'shifts': dict(counts), 'workDays': 0, 'offDays': 0, 'leaveDays': 0,
+                   'nightShifts': 0, 'unassignedDays': 0, 'hours': 0.0}
+        for shift, days in counts.items():
+            category = self.catalog.category(shift)
+            if category in WORK_CATEGORIES:
+                summary['workDays'] += days
+            if category == 'night':
+                summary['nightShifts'] += days
+            elif category == 'off':
+                summary['offDays'] += days
+            elif category == 'leave':
+                summary['leaveDays'] += days
+            elif category == 'unassigned':
+                summary['unassignedDays'] += days
+            summary['hours'] += days * self.catalog.hours(shift)
+        summary['hours'] = round(summary['hours'], 2)
+        return summary
+
+    def summary(self, employee_id, months=None):
+        """{month key: summary} of one employee, or None if unknown"""
+        with self.lock:
+            counters = self.counters.get(employee_id)
+            if counters is None:
+                return None
+            counters = {month: dict(counts) for month, counts in counters.items() if not months or month in months}
+        return {month: self.month_summary(counts) for month, counts in counters.items()}
+
+    def __contains__(self, employee_id):
+        return employee_id in self.counters
+
+# Global instance, summarizing the display roster
+EMPLOYEE_SUMMARIES = EmployeeSummaries()
@@ -0,0 +1,107 @@
+# log_config.py - Leveled, structured logging written off the request thread
+#
+# Environment variables:
+#   LOG_LEVEL   default level for every module (default INFO)
+#   LOG_LEVELS  per-module overrides, e.g. "app=WARNING,data_loader=DEBUG"
+#   LOG_FORMAT  "text" (default) or "json"
+#   LOG_FILE    write to this file instead of stdout
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+from datetime import datetime
+
+# Attributes every LogRecord has; anything else came from extra={...}
+STANDARD_RECORD_ATTRS = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'taskName'}
+
+_listener = None
+
+class StructuredFormatter(logging.Formatter):
+    def __init__(self, json_output=False):
+        super().__init__()
+        self.json_output = json_output
+
+    def format(self, record):
+        fields = {
+            key: value for key, value in vars(record).items()
+            if key not in STANDARD_RECORD_ATTRS and not key.startswith('_')
+        }
+        timestamp = datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds')
+        message = record.getMessage()
+        exc_text = self.formatException(record.exc_info) if record.exc_info else None
+
+        if self.json_output:
+            entry = {
+                'ts': timestamp,
+                'level': record.levelname,
+                'logger': record.name,
+                'msg': message
+            }
+            entry.update(fields)
+            if exc_text:
+                entry['exc'] = exc_text
+            return json.dumps(entry, default=str, ensure_ascii=False)
+
+        line = f"{timestamp} {record.levelname:<7} {record.name}: {message}"
+        if fields:
+            line += ' ' + ' '.join(f"{key}={format_value(value)}" for key, value in fields.items())
+        if exc_text:
+            line += '\n' + exc_text
+        return line
+
+def format_value(value):
+    """Format an extra field for the text log format"""
+    text = str(value)
+    return json.dumps(text, ensure_ascii=False) if (' ' in text or not text) else text
+
+def parse_levels(text):
+    """Parse 'app=WARNING,data_loader=DEBUG' into {logger name: level}"""
+    levels = {}
+    for part in (text or '').split(','):
+        name, _, level = part.partition('=')
+        if name.strip() and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging(level=None, module_levels=None, json_output=None, log_file=None):
+    """Route all logging through a queue drained by a background thread
+
+    Safe to call more than once; only the first call installs the handlers.
+    """
+    global _listener
+    if _listener is not None:
+        return
+
+    level = level or os.environ.get('LOG_LEVEL', 'INFO').upper()
+    module_levels = module_levels if module_levels is not None else parse_levels(os.environ.get('LOG_LEVELS'))
+    if json_output is None:
+        json_output = os.environ.get('LOG_FORMAT', 'text').lower() == 'json'
+    log_file = log_file or os.environ.get('LOG_FILE')
+
+    if log_file:
+        output_handler = logging.FileHandler(log_file, encoding='utf-8')
+    else:
+        output_handler = logging.StreamHandler(sys.stdout)
+    output_handler.setFormatter(StructuredFormatter(json_output=json_output))
+
+    # Callers only pay for a queue put; formatting and I/O happen on the listener thread
+    log_queue = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(log_queue, output_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    root = logging.getLogger()
+    root.addHandler(logging.handlers.QueueHandler(log_queue))
+    root.setLevel(level)
+    for name, module_level in module_levels.items():
+        logging.getLogger(name).setLevel(module_level)
+
+def stop_logging():
+    """Flush queued records and stop the background writer"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
@@ -0,0 +1,178 @@
+# metrics.py - Request and phase timing metrics in Prometheus text format
+import functools
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Histogram:
+    def __init__(self, name, help_text, buckets, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.label_names = label_names
+        self.series = {}  # label values -> [bucket counts..., +Inf count, sum]
+
+    def observe(self, label_values, value):
+        series = self.series.get(label_values)
+        if series is None:
+            series = self.series[label_values] = [0] * (len(self.buckets) + 2)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                series[i] += 1
+        series[-2] += 1
+        series[-1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for label_values, series in sorted(self.series.items()):
+            labels = format_labels(self.label_names, label_values)
+            for bound, count in zip(self.buckets, series):
+                lines.append(f"{self.name}_bucket{format_labels(self.label_names + ('le',), label_values + (repr(float(bound)),))} {count}")
+            lines.append(f"{self.name}_bucket{format_labels(self.label_names + ('le',), label_values + ('+Inf',))} {series[-2]}")
+            lines.append(f"{self.name}_sum{labels} {series[-1]:.6f}")
+            lines.append(f"{self.name}_count{labels} {series[-2]}")
+        return lines
+
+class Counter:
+    def __init__(self, name, help_text, label_names):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.series = {}
+
+    def inc(self, label_values, amount=1):
+        self.series[label_values] = self.series.get(label_values, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} counter"]
+        for label_values, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{format_labels(self.label_names, label_values)} {value}")
+        return lines
+
+def format_labels(label_names, label_values):
+    """Format label pairs as {a="x",b="y"}"""
+    if not label_names:
+        return ''
+    pairs = []
+    for name, value in zip(label_names, label_values):
+        escaped = str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+        pairs.append(f'{name}="{escaped}"')
+    return '{' + ','.join(pairs) + '}'
+
+class Metrics:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started_at = time.time()
+        self.request_latency = Histogram(
+            'roster_http_request_duration_seconds', 'HTTP request latency by route',
+            LATENCY_BUCKETS, ('route', 'method')
+        )
+        self.response_size = Histogram(
+            'roster_http_response_size_bytes', 'HTTP response body size by route',
+            SIZE_BUCKETS, ('route', 'method')
+        )
+        self.requests_total = Counter(
+            'roster_http_requests_total', 'HTTP requests by route and status code',
+            ('route', 'method', 'status')
+        )
+        self.errors_total = Counter(
+            'roster_http_errors_total', 'HTTP responses with a 4xx/5xx status or a success=false body',
+            ('route', 'method')
+        )
+        self.phase_latency = Histogram(
+            'roster_phase_duration_seconds', 'Duration of internal data pipeline phases',
+            LATENCY_BUCKETS, ('phase',)
+        )
+
+    def observe_request(self, route, method, status, elapsed, size, failed):
+        """Record one finished HTTP request"""
+        with self.lock:
+            self.request_latency.observe((route, method), elapsed)
+            self.response_size.observe((route, method), size)
+            self.requests_total.inc((route, method, str(status)))
+            if failed:
+                self.errors_total.inc((route, method))
+
+    def observe_phase(self, phase, elapsed):
+        """Record the duration of an internal phase"""
+        with self.lock:
+            self.phase_latency.observe((phase,), elapsed)
+
+    @contextmanager
+    def timer(self, phase):
+        """Time a block of code as a named phase"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(phase, time.perf_counter() - start)
+
+    def timed(self, phase):
+        """Decorator version of timer()"""
+        def decorator(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.timer(phase):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def render(self):
+        """Render every metric in the Prometheus text exposition format"""
+        with self.lock:
+            lines = [
+                '# HELP roster_uptime_seconds Seconds since the metrics registry was created',
+                '# TYPE roster_uptime_seconds gauge',
+                f"roster_uptime_seconds {time.time() - self.started_at:.3f}"
+            ]
+            for metric in (self.request_latency, self.response_size, self.requests_total,
+                           self.errors_total, self.phase_latency):
+                lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+def init_app(app, metrics):
+    """Register request timing hooks and the /metrics endpoint on a Flask app"""
+    from flask import g, request
+
+    class FailureFlaggingJSONProvider(type(app.json)):
+        """Flags the request as failed when a {'success': False} payload is serialized"""
+        def response(self, *args, **kwargs):
+            payload = args[0] if len(args) == 1 else kwargs
+            if isinstance(payload, dict) and payload.get('success') is False:
+                g.metrics_failed = True
+            return super().response(*args, **kwargs)
+
+    app.json = FailureFlaggingJSONProvider(app)
+
+    @app.before_request
+    def _start_request_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def _record_request_metrics(response):
+        start = g.pop('metrics_start', None)
+        if start is None:
+            return response
+        # Group by the URL rule so /static/<path> counts as one route
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        if route == '/metrics':
+            return response
+
+        failed = response.status_code >= 400 or g.pop('metrics_failed', False)
+
+        size = response.content_length or 0
+        metrics.observe_request(route, request.method, response.status_code,
+                                time.perf_counter() - start, size, failed)
+        return response
+
+    @app.route('/metrics')
+    def metrics_endpoint():
+        """Expose collected metrics for a local scraper"""
+        return app.response_class(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+# Global instance
+METRICS = Metrics()
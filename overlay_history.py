@@ -0,0 +1,74 @@
+# overlay_history.py - Multi-level undo/redo of admin edits
+#
+# Admin edits only ever change the sparse admin overlay, and the admin view is
+# rebuilt from Google data + overlay with unchanged employees shared. A
+# version therefore only needs the overlay entries one action touched:
+#
+#   with OVERLAY_HISTORY.action('Edit EMP-1 on 3Oct'):
+#       set_admin_shift(...)
+#
+# records {path: previous value} for every overlay path the action edits (see
+# RosterOverlay.remember), so taking a version costs O(changed cells). Undo
+# captures the current values of those paths for redo, then puts the
+# previous ones back. The history is in memory and is cleared when a sync or
+# upload replaces the Google data underneath the overlay.
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+
+MAX_UNDO_STEPS = 100
+
+class OverlayHistory:
+    def __init__(self, overlay, max_steps=MAX_UNDO_STEPS):
+        self.overlay = overlay
+        self.max_steps = max_steps
+        self.lock = threading.Lock()
+        self.undo_stack = []   # [{'label', 'timestamp', 'changes': {path: value}}]
+        self.redo_stack = []
+
+    @contextmanager
+    def action(self, label):
+        """Record the overlay edits made inside the block as one undo step"""
+        local = self.overlay.local
+        if getattr(local, 'recording', None) is not None:
+            yield  # Nested: part of the enclosing action
+            return
+        local.recording = {}
+        try:
+            yield
+        finally:
+            changes, local.recording = local.recording, None
+            if changes:
+                with self.lock:
+                    self.undo_stack.append({'label': label, 'timestamp': datetime.now().isoformat(), 'changes': changes})
+                    del self.undo_stack[:-self.max_steps]
+                    self.redo_stack.clear()
+
+    def step(self, source, target):
+        """Move the newest version from source to target, applying it; returns it or None"""
+        with self.lock:
+            if not source:
+                return None
+            version = source.pop()
+            current = self.overlay.capture(version['changes'])
+            self.overlay.restore(version['changes'])
+            target.append(dict(version, changes=current))
+            return version
+
+    def undo(self):
+        return self.step(self.undo_stack, self.redo_stack)
+
+    def redo(self):
+        return self.step(self.redo_stack, self.undo_stack)
+
+    def clear(self):
+        with self.lock:
+            self.undo_stack.clear()
+            self.redo_stack.clear()
+
+    def summary(self):
+        def describe(version):
+            return {'label': version['label'], 'timestamp': version['timestamp'], 'paths': len(version['changes'])}
+        with self.lock:
+            return {'undo': [describe(v) for v in reversed(self.undo_stack)],
+                    'redo': [describe(v) for v in reversed(self.redo_stack)]}
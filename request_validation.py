@@ -0,0 +1,137 @@
+# request_validation.py - Submit-time checks for shift change and swap requests
+#
+# Submissions are checked against the display roster before they are stored,
+# so that approval never acts on a shift the employee does not actually have:
+#
+#   - the employee (and swap target) exist and are different people
+#   - the date is one of the roster's dates
+#   - the submitted current/target shifts are the roster's shifts for that date
+#   - a shift change asks for a catalog shift different from the current one
+#   - the employee has no other pending request for that date, and a swap
+#     target is not already asked for that shift by another pending swap
+#   - optionally, every affected employee keeps a minimum rest between the
+#     end of one day's shift and the start of the next (ROSTER_MIN_REST_HOURS)
+#
+# Every lookup is a dictionary access: employees through the id index, dates
+# through a header -> position map cached per roster version, and pending
+# requests through ScheduleRequests' pending indexes.
+import os
+import threading
+
+from shift_catalog import SHIFT_CATALOG, parse_time
+
+# Minimum hours between consecutive shifts; unset or 0 disables the rule
+MIN_REST_HOURS = float(os.environ.get('ROSTER_MIN_REST_HOURS', '0') or 0)
+
+class RequestValidationError(ValueError):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class RequestValidator:
+    def __init__(self, catalog=SHIFT_CATALOG, min_rest_hours=MIN_REST_HOURS):
+        self.catalog = catalog
+        self.min_rest_hours = min_rest_hours
+        self.lock = threading.Lock()
+        self.date_positions = {}
+        self.version = None
+
+    def date_index(self, data, version, date):
+        with self.lock:
+            if self.version != version:
+                self.date_positions = {header: i for i, header in enumerate(data.get('headers', []))}
+                self.version = version
+            date_index = self.date_positions.get(date)
+        if date_index is None:
+            raise RequestValidationError(f"Date {date} is not in the roster")
+        return date_index
+
+    def employee(self, index, employee_id, role):
+        team_name, employee = index.find(employee_id)
+        if employee is None:
+            raise RequestValidationError(f"{role} {employee_id} not found", 404)
+        return team_name, employee
+
+    def shift_on(self, employee, date_index):
+        schedule = employee.get('schedule', [])
+        return schedule[date_index] if date_index < len(schedule) else ''
+
+    def check_claimed(self, claimed, actual, who, date):
+        if claimed is not None and claimed != actual:
+            raise RequestValidationError(
+                f"{who} works {actual or 'N/A'} on {date}, not {claimed or 'N/A'}; reload the schedule and try again", 409
+            )
+
+    def check_no_pending(self, pending, employee_id, date):
+        request_id = pending.pending_want(employee_id, date)
+        if request_id:
+            raise RequestValidationError(f"{employee_id} already has pending request {request_id} for {date}", 409)
+
+    def shift_window(self, shift, day):
+        """(start, end) in minutes from the roster's first day, or None for untimed shifts"""
+        entry = self.catalog.get(shift)
+        if not entry or not entry.get('start'):
+            return None
+        start = day * 24 * 60 + parse_time(entry['start'], 'start', shift)
+        return start, start + entry['hours'] * 60
+
+    def check_rest(self, employee, date_index, new_shift, who):
+        """Enforce the minimum rest around new_shift on date_index"""
+        if not self.min_rest_hours:
+            return
+        new_window = self.shift_window(new_shift, date_index)
+        if new_window is None:
+            return
+        rest = self.min_rest_hours * 60
+        schedule = employee.get('schedule', [])
+        if date_index > 0:
+            previous = self.shift_window(self.shift_on(employee, date_index - 1), date_index - 1)
+            if previous and new_window[0] - previous[1] < rest:
+                raise RequestValidationError(
+                    f"{who} would have less than {self.min_rest_hours:g}h rest after {schedule[date_index - 1]} the day before"
+                )
+        if date_index + 1 < len(schedule):
+            following = self.shift_window(schedule[date_index + 1], date_index + 1)
+            if following and following[0] - new_window[1] < rest:
+                raise RequestValidationError(
+                    f"{who} would have less than {self.min_rest_hours:g}h rest before {schedule[date_index + 1]} the day after"
+                )
+
+    def validate_shift_change(self, data, index, version, pending, employee_id, date, current_shift, requested_shift):
+        """Check a shift change submission; returns (team name, employee, actual current shift)"""
+        team_name, employee = self.employee(index, employee_id, 'Employee')
+        date_index = self.date_index(data, version, date)
+        actual = self.shift_on(employee, date_index)
+        self.check_claimed(current_shift, actual, employee_id, date)
+        if requested_shift == actual:
+            raise RequestValidationError(f"{employee_id} already works {actual or 'N/A'} on {date}")
+        if not requested_shift or self.catalog.get(requested_shift) is None:
+            raise RequestValidationError(f"Unknown shift '{requested_shift}'")
+        self.check_no_pending(pending, employee_id, date)
+        self.check_rest(employee, date_index, requested_shift, employee_id)
+        return team_name, employee, actual
+
+    def validate_swap(self, data, index, version, pending, requester_id, target_id, date, requester_shift, target_shift):
+        """Check a swap submission; returns (requester team, requester, target team, target,
+        actual requester shift, actual target shift)"""
+        if requester_id == target_id:
+            raise RequestValidationError("An employee cannot swap with themselves")
+        requester_team, requester = self.employee(index, requester_id, 'Requester')
+        target_team, target = self.employee(index, target_id, 'Target employee')
+        date_index = self.date_index(data, version, date)
+        actual_requester = self.shift_on(requester, date_index)
+        actual_target = self.shift_on(target, date_index)
+        self.check_claimed(requester_shift, actual_requester, requester_id, date)
+        self.check_claimed(target_shift, actual_target, target_id, date)
+        if actual_requester == actual_target:
+            raise RequestValidationError(f"Both employees work {actual_target or 'N/A'} on {date}; there is nothing to swap")
+        self.check_no_pending(pending, requester_id, date)
+        request_id = pending.pending_target(target_id, date)
+        if request_id:
+            raise RequestValidationError(f"{target_id}'s shift on {date} is already requested by pending swap {request_id}", 409)
+        self.check_rest(requester, date_index, actual_target, requester_id)
+        self.check_rest(target, date_index, actual_requester, target_id)
+        return requester_team, requester, target_team, target, actual_requester, actual_target
+
+# Global instance
+REQUEST_VALIDATOR = RequestValidator()
@@ -0,0 +1,134 @@
+# retention.py - Month archives for modification history and resolved requests
+#
+# modified_shifts.json and schedule_requests.json are rewritten on every
+# change, so only recent records stay in them:
+#
+#   modifications       the last RETAIN_MONTHS months (by month_year) stay hot;
+#                       older ones move to modifications-<YYYY-MM>.json.
+#                       monthly_stats is a roll-up and always stays.
+#   schedule requests   pending requests always stay hot; approved/rejected
+#                       ones resolved more than RETAIN_REQUEST_DAYS ago move to
+#                       requests-<YYYY-MM>.json, by the month they were created.
+#
+# Archives are plain JSON lists under data/archive and are read on demand,
+# with the most recently read ones kept in memory. Appending skips records
+# the month already holds (by record_key), so a compaction that is re-run
+# after a failed save does not archive anything twice.
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_DIR = 'data/archive'
+ARCHIVE_KINDS = ('modifications', 'requests')
+RETAIN_MONTHS = int(os.environ.get('ROSTER_RETAIN_MONTHS', '3'))
+RETAIN_REQUEST_DAYS = int(os.environ.get('ROSTER_RETAIN_REQUEST_DAYS', '30'))
+ARCHIVE_CACHE_SIZE = 6
+MONTH_PATTERN = re.compile(r'^\d{4}-\d{2}$')
+
+def cutoff_month(now=None, retain_months=RETAIN_MONTHS):
+    """First 'YYYY-MM' month that stays hot: the current month and the retain_months - 1 before it"""
+    now = now or datetime.now()
+    index = now.year * 12 + now.month - 1 - max(retain_months - 1, 0)
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+def cutoff_time(now=None, retain_days=RETAIN_REQUEST_DAYS):
+    """ISO timestamp before which resolved requests are archived"""
+    return ((now or datetime.now()) - timedelta(days=retain_days)).isoformat()
+
+def record_key(kind, record):
+    """Identity of an archived record: the request id, or what a modification changed and when"""
+    if kind == 'requests':
+        return record.get('id')
+    return (record.get('timestamp'), record.get('employee_id'), record.get('date_header'),
+            record.get('old_shift'), record.get('new_shift'))
+
+def resolved_at(request):
+    return request.get('resolved_at') or request.get('approved_at') or request.get('created_at') or ''
+
+class HistoryArchive:
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        self.lock = threading.Lock()
+        self._cache = OrderedDict()   # (kind, month) -> records
+
+    def path(self, kind, month):
+        if kind not in ARCHIVE_KINDS or not MONTH_PATTERN.match(month or ''):
+            raise ValueError(f"Unknown archive {kind} {month}")
+        return os.path.join(self.directory, f'{kind}-{month}.json')
+
+    def months(self, kind):
+        """Archived months of one kind, oldest first"""
+        if not os.path.isdir(self.directory):
+            return []
+        prefix = f'{kind}-'
+        return sorted(name[len(prefix):-len('.json')] for name in os.listdir(self.directory)
+                      if name.startswith(prefix) and name.endswith('.json'))
+
+    def read(self, kind, month):
+        """Records of one archive month; [] when there is none"""
+        path = self.path(kind, month)
+        with self.lock:
+            return self.load(kind, month, path)
+
+    def load(self, kind, month, path):
+        """read() with the lock held"""
+        key = (kind, month)
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            return self._cache[key]
+        records = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                records = json.load(f)
+        self._cache[key] = records
+        while len(self._cache) > ARCHIVE_CACHE_SIZE:
+            self._cache.popitem(last=False)
+        return records
+
+    def append(self, kind, month, records):
+        """Add records to an archive month, skipping ones it already holds; atomically rewrites its file"""
+        path = self.path(kind, month)
+        with self.lock:
+            merged = list(self.load(kind, month, path))
+            seen = {record_key(kind, record) for record in merged}
+            for record in records:
+                key = record_key(kind, record)
+                if key not in seen:
+                    seen.add(key)
+                    merged.append(record)
+            os.makedirs(self.directory, exist_ok=True)
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(merged, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            self._cache[(kind, month)] = merged
+        return len(merged)
+
+    def summary(self):
+        return {kind: [{'month': month, 'bytes': os.path.getsize(self.path(kind, month))} for month in self.months(kind)]
+                for kind in ARCHIVE_KINDS}
+
+def compact_modifications(data, archive, first_hot_month):
+    """Move modifications before first_hot_month into month archives; returns the count moved"""
+    hot = []
+    old = {}
+    for modification in data.get('modifications', []):
+        month = modification.get('month_year') or (modification.get('timestamp') or '')[:7]
+        if month and month < first_hot_month:
+            old.setdefault(month, []).append(modification)
+        else:
+            hot.append(modification)
+    for month, records in old.items():
+        archive.append('modifications', month, records)
+    if old:
+        data['modifications'] = hot
+    return sum(len(records) for records in old.values())
+
+# Global instance
+ARCHIVES = HistoryArchive()
@@ -0,0 +1,140 @@
+# roster_diff.py - Cell-level diff of two rosters, aligned by employee id and date
+#
+#   {
+#     'headers': [...],                      # dates of the compared roster
+#     'changed': [[employee id, date index, base shift, shift], ...],
+#     'added':   [{'id', 'name', 'team'}],   # only in the compared roster
+#     'removed': [{'id', 'name', 'team'}],   # only in the base roster
+#     'moved':   [{'id', 'from', 'to'}],     # team changed
+#     'renamed': [{'id', 'from', 'to'}],     # name changed
+#     'headersAdded': [...], 'headersRemoved': [...],
+#     'counts': {...}
+#   }
+#
+# Schedules that are the same list object (the admin view shares unchanged
+# employees with the Google data) are skipped without looking at them. The
+# rest are encoded as rows of shift code indexes, and all changed cells come
+# out of a single array comparison.
+import threading
+
+import numpy as np
+
+from metrics import METRICS
+
+def employees_by_id(data):
+    """{employee id: (team name, employee)}, first occurrence wins"""
+    found = {}
+    for team_name, employees in (data or {}).get('teams', {}).items():
+        for employee in employees:
+            found.setdefault(employee['id'], (team_name, employee))
+    return found
+
+def diff_rosters(base, other):
+    """Diff other against base (e.g. admin view against Google data)"""
+    base_employees = employees_by_id(base)
+    other_employees = employees_by_id(other)
+    base_headers = (base or {}).get('headers', [])
+    headers = (other or {}).get('headers', [])
+
+    # Column of each compared date in the base roster, -1 if base lacks it
+    base_positions = {header: i for i, header in enumerate(base_headers)}
+    same_headers = base_headers == headers
+    columns = None if same_headers else np.array([base_positions.get(header, -1) for header in headers], dtype=np.int64)
+
+    result = {'headers': headers, 'changed': [], 'added': [], 'removed': [], 'moved': [], 'renamed': [],
+              'headersAdded': [header for header in headers if header not in base_positions],
+              'headersRemoved': [header for header in base_headers if header not in set(headers)]}
+
+    compared = []
+    for employee_id, (team_name, employee) in other_employees.items():
+        if employee_id not in base_employees:
+            result['added'].append({'id': employee_id, 'name': employee.get('name', ''), 'team': team_name})
+            continue
+        base_team, base_employee = base_employees[employee_id]
+        if base_team != team_name:
+            result['moved'].append({'id': employee_id, 'from': base_team, 'to': team_name})
+        if base_employee.get('name', '') != employee.get('name', ''):
+            result['renamed'].append({'id': employee_id, 'from': base_employee.get('name', ''), 'to': employee.get('name', '')})
+        if same_headers and base_employee.get('schedule') is employee.get('schedule'):
+            continue
+        compared.append((employee_id, base_employee.get('schedule', []), employee.get('schedule', [])))
+
+    for employee_id, (team_name, employee) in base_employees.items():
+        if employee_id not in other_employees:
+            result['removed'].append({'id': employee_id, 'name': employee.get('name', ''), 'team': team_name})
+
+    if compared:
+        date_count = len(headers)
+        code_index = {'': 0}
+        base_rows = np.zeros((len(compared), len(base_headers)), dtype=np.int32)
+        rows = np.zeros((len(compared), date_count), dtype=np.int32)
+        for row, (_, base_schedule, schedule) in enumerate(compared):
+            for shift in set(base_schedule).union(schedule).difference(code_index):
+                code_index[shift] = len(code_index)
+            base_schedule = base_schedule[:len(base_headers)]
+            schedule = schedule[:date_count]
+            base_rows[row, :len(base_schedule)] = [code_index[shift] for shift in base_schedule]
+            rows[row, :len(schedule)] = [code_index[shift] for shift in schedule]
+
+        if same_headers:
+            aligned = base_rows
+        else:
+            # Dates missing from base compare against '' (code 0)
+            aligned = np.where(columns >= 0, base_rows[:, np.maximum(columns, 0)], 0)
+        codes = list(code_index)
+        for row, date_index in zip(*np.nonzero(aligned != rows)):
+            result['changed'].append([compared[row][0], int(date_index),
+                                      codes[aligned[row, date_index]], codes[rows[row, date_index]]])
+
+    result['counts'] = {
+        'changed': len(result['changed']),
+        'changedEmployees': len({cell[0] for cell in result['changed']}),
+        'added': len(result['added']),
+        'removed': len(result['removed']),
+        'moved': len(result['moved']),
+        'renamed': len(result['renamed'])
+    }
+    return result
+
+def project_diff(diff, team_of, teams=None, employee_ids=None, date_window=None):
+    """Narrow a diff to some teams, employees and a date window
+
+    team_of(employee id) gives the team of a changed employee in the compared
+    roster. Counts are recomputed; dates keep their full-roster indexes.
+    """
+    def keep(employee_id, team_name):
+        return ((teams is None or team_name in teams)
+                and (employee_ids is None or employee_id in employee_ids))
+
+    lo, hi = date_window or (0, len(diff['headers']))
+    projected = dict(diff)
+    projected['changed'] = [cell for cell in diff['changed']
+                            if lo <= cell[1] < hi and keep(cell[0], team_of(cell[0]))]
+    for key in ('added', 'removed'):
+        projected[key] = [entry for entry in diff[key] if keep(entry['id'], entry['team'])]
+    projected['moved'] = [entry for entry in diff['moved']
+                          if keep(entry['id'], entry['from']) or keep(entry['id'], entry['to'])]
+    projected['renamed'] = [entry for entry in diff['renamed'] if keep(entry['id'], team_of(entry['id']))]
+    projected['counts'] = dict(diff['counts'],
+                               changed=len(projected['changed']),
+                               changedEmployees=len({cell[0] for cell in projected['changed']}),
+                               **{key: len(projected[key]) for key in ('added', 'removed', 'moved', 'renamed')})
+    return projected
+
+class RosterDiffCache:
+    """The Google-vs-admin diff, recomputed only when the roster version changes"""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None
+        self.diff = None
+
+    def get(self, base, other, version):
+        with self.lock:
+            if self.diff is None or self.version != version:
+                with METRICS.timer('roster_diff'):
+                    self.diff = diff_rosters(base, other)
+                self.version = version
+            return self.diff
+
+# Global instance, diffing the admin view against GOOGLE_SYNCED_DATA
+ROSTER_DIFF = RosterDiffCache()
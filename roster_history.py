@@ -0,0 +1,266 @@
+# roster_history.py - Roster checkpoints plus a cell journal for as-of queries
+#
+#   <directory>/checkpoints.json          [{'id', 'timestamp', 'reason', 'file', 'journal', ...}]
+#   <directory>/checkpoint-<id>.snap      the display roster at that time (snapshot.py format)
+#   <directory>/journal-<id>.jsonl        the displayed cell changes made after checkpoint <id>,
+#                                         one per line: {"ts", "id", "date", "old", "new"}
+#
+# Cell edits are journaled. Anything else that changes the roster (a sync,
+# an upload, employee and team edits, a reset, undo/redo) asks for a new
+# checkpoint, and so does every CHECKPOINT_INTERVAL journaled edits. The
+# roster at time T is the last checkpoint taken at or before T with its
+# journal replayed up to T, so a query never replays more than one interval
+# of edits.
+#
+# Syncs and uploads always checkpoint. Other structural changes are
+# coalesced: at most one checkpoint per CHECKPOINT_MIN_SECONDS, the deferred
+# one being written on the next view rebuild after the window has passed.
+# As-of queries inside that window therefore miss the structural change;
+# cell edits are always exact.
+#
+# Checkpoints older than RETAIN_DAYS, or beyond the newest MAX_CHECKPOINTS,
+# are deleted together with their journals; the newest one is always kept.
+import json
+import logging
+import os
+import re
+import threading
+from datetime import datetime, timedelta
+
+from snapshot import write_snapshot, read_snapshot, pack_roster, unpack_roster
+
+logger = logging.getLogger(__name__)
+
+ROSTER_HISTORY_DIR = 'data/roster_history'
+CHECKPOINT_INTERVAL = int(os.environ.get('ROSTER_CHECKPOINT_INTERVAL', '500'))
+CHECKPOINT_MIN_SECONDS = int(os.environ.get('ROSTER_CHECKPOINT_MIN_SECONDS', '300'))
+RETAIN_DAYS = int(os.environ.get('ROSTER_HISTORY_RETAIN_DAYS', '90'))
+MAX_CHECKPOINTS = int(os.environ.get('ROSTER_HISTORY_MAX_CHECKPOINTS', '200'))
+FORCED_REASONS = ('initial', 'sync', 'upload')   # bulk cell changes that are never journaled
+JOURNAL_PATTERN = re.compile(r'^journal-(\d+)\.jsonl$')
+
+class RosterHistoryError(ValueError):
+    pass
+
+def parse_as_of(value):
+    """Normalize an as-of timestamp; a bare date means the end of that day"""
+    try:
+        moment = datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise RosterHistoryError(f"Invalid timestamp '{value}', expected ISO format like 2025-10-03T14:00")
+    if len(value) == 10:
+        moment = moment.replace(hour=23, minute=59, second=59, microsecond=999999)
+    return moment.isoformat(timespec='microseconds')
+
+def journal_name(checkpoint_id):
+    """Journal of the edits after checkpoint_id (0: before the first checkpoint)"""
+    return f'journal-{checkpoint_id:06d}.jsonl'
+
+class RosterHistory:
+    def __init__(self, directory=ROSTER_HISTORY_DIR, checkpoint_interval=CHECKPOINT_INTERVAL,
+                 min_seconds=CHECKPOINT_MIN_SECONDS, retain_days=RETAIN_DAYS, max_checkpoints=MAX_CHECKPOINTS):
+        self.directory = directory
+        self.checkpoint_interval = checkpoint_interval
+        self.min_seconds = min_seconds
+        self.retain_days = retain_days
+        self.max_checkpoints = max_checkpoints
+        self.index_file = os.path.join(directory, 'checkpoints.json')
+        self.lock = threading.Lock()
+        self.checkpoints = []
+        self.pending = 0          # journal entries since the last checkpoint
+        self.deferred = None      # reason of a coalesced checkpoint not written yet
+        self.cached = None        # (checkpoint id, roster) of the last checkpoint read
+        self.loaded = False
+
+    def load(self):
+        """Load the checkpoint list and count the current journal"""
+        with self.lock:
+            self.checkpoints = []
+            if os.path.exists(self.index_file):
+                with open(self.index_file, 'r', encoding='utf-8') as f:
+                    self.checkpoints = json.load(f)
+            self.split_legacy_journal()
+            self.pending = 0
+            path = self.journal_path()
+            if os.path.exists(path):
+                with open(path, 'rb') as f:
+                    self.pending = sum(1 for _ in f)
+            self.loaded = True
+        return self
+
+    def split_legacy_journal(self):
+        """Split a single journal.jsonl (with 'journalOffset' checkpoints) into per-checkpoint journals"""
+        legacy_path = os.path.join(self.directory, 'journal.jsonl')
+        if not os.path.exists(legacy_path):
+            return
+        with open(legacy_path, 'rb') as f:
+            journal = f.read()
+        bounds = [(0, 0)] + [(checkpoint['id'], checkpoint.pop('journalOffset', 0)) for checkpoint in self.checkpoints]
+        for (checkpoint_id, start), (_, end) in zip(bounds, bounds[1:] + [(None, len(journal))]):
+            with open(os.path.join(self.directory, journal_name(checkpoint_id)), 'ab') as f:
+                f.write(journal[start:end])
+        for checkpoint in self.checkpoints:
+            checkpoint['journal'] = journal_name(checkpoint['id'])
+        self.save_index()
+        os.remove(legacy_path)
+        logger.info("Split roster journal per checkpoint", extra={'checkpoints': len(self.checkpoints)})
+
+    def save_index(self):
+        tmp_path = self.index_file + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.checkpoints, f, indent=2)
+        os.replace(tmp_path, self.index_file)
+
+    def journal_path(self):
+        """Journal that new cell edits go to"""
+        return os.path.join(self.directory, journal_name(self.checkpoints[-1]['id'] if self.checkpoints else 0))
+
+    def journal_size(self):
+        return sum(os.path.getsize(os.path.join(self.directory, name)) for name in os.listdir(self.directory)
+                   if JOURNAL_PATTERN.match(name)) if os.path.isdir(self.directory) else 0
+
+    def record_cell(self, employee_id, date, old_shift, new_shift):
+        """Journal one displayed cell change"""
+        if old_shift == new_shift:
+            return
+        entry = {'ts': datetime.now().isoformat(timespec='microseconds'), 'id': employee_id,
+                 'date': date, 'old': old_shift, 'new': new_shift}
+        line = json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + '\n'
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.journal_path(), 'a', encoding='utf-8') as f:
+                f.write(line)
+            self.pending += 1
+
+    def checkpoint(self, data, reason):
+        """Write data (the display roster) as a new checkpoint, then apply retention"""
+        with self.lock:
+            os.makedirs(self.directory, exist_ok=True)
+            checkpoint_id = self.checkpoints[-1]['id'] + 1 if self.checkpoints else 1
+            file_name = f'checkpoint-{checkpoint_id:06d}.snap'
+            write_snapshot(os.path.join(self.directory, file_name), pack_roster(data))
+            self.checkpoints.append({
+                'id': checkpoint_id,
+                'timestamp': datetime.now().isoformat(timespec='microseconds'),
+                'reason': reason,
+                'file': file_name,
+                'journal': journal_name(checkpoint_id),
+                'employees': sum(len(employees) for employees in data.get('teams', {}).values()),
+                'dates': len(data.get('headers', []))
+            })
+            self.pending = 0
+            self.deferred = None
+            self.prune()
+            self.save_index()
+
+    def seconds_since_checkpoint(self):
+        if not self.checkpoints:
+            return None
+        return (datetime.now() - datetime.fromisoformat(self.checkpoints[-1]['timestamp'])).total_seconds()
+
+    def structural_change(self, data, reason):
+        """Checkpoint after a change that is not a cell edit, coalescing frequent ones"""
+        elapsed = self.seconds_since_checkpoint()
+        if reason in FORCED_REASONS or elapsed is None or elapsed >= self.min_seconds:
+            self.checkpoint(data, reason)
+        else:
+            self.deferred = reason
+
+    def maybe_checkpoint(self, data):
+        """Checkpoint once CHECKPOINT_INTERVAL edits have been journaled since the last one,
+        or when a deferred structural checkpoint is due"""
+        if not self.loaded:
+            return
+        if not self.checkpoints and data.get('headers'):
+            self.checkpoint(data, 'initial')
+        elif self.pending >= self.checkpoint_interval:
+            self.checkpoint(data, self.deferred or 'periodic')
+        elif self.deferred and self.seconds_since_checkpoint() >= self.min_seconds:
+            self.checkpoint(data, self.deferred)
+
+    def prune(self):
+        """Delete checkpoints (and their journals) past RETAIN_DAYS or MAX_CHECKPOINTS; call with the lock held"""
+        cutoff = (datetime.now() - timedelta(days=self.retain_days)).isoformat()
+        keep_from = max(0, len(self.checkpoints) - self.max_checkpoints)
+        while keep_from < len(self.checkpoints) - 1 and self.checkpoints[keep_from]['timestamp'] < cutoff:
+            keep_from += 1
+        if not keep_from:
+            return
+        dropped, self.checkpoints = self.checkpoints[:keep_from], self.checkpoints[keep_from:]
+        for name in [journal_name(0)] + [name for checkpoint in dropped for name in (checkpoint['file'], checkpoint['journal'])]:
+            path = os.path.join(self.directory, name)
+            if os.path.exists(path):
+                os.remove(path)
+        if self.cached and self.cached[0] < self.checkpoints[0]['id']:
+            self.cached = None
+        logger.info("Pruned roster checkpoints", extra={'dropped': len(dropped), 'kept': len(self.checkpoints)})
+
+    def read_checkpoint(self, checkpoint):
+        with self.lock:
+            if self.cached and self.cached[0] == checkpoint['id']:
+                return self.cached[1]
+        roster = unpack_roster(read_snapshot(os.path.join(self.directory, checkpoint['file'])))
+        with self.lock:
+            self.cached = (checkpoint['id'], roster)
+        return roster
+
+    def as_of(self, timestamp):
+        """The display roster at timestamp, plus {'checkpoint', 'replayed'}"""
+        with self.lock:
+            candidates = [checkpoint for checkpoint in self.checkpoints if checkpoint['timestamp'] <= timestamp]
+            first = self.checkpoints[0]['timestamp'] if self.checkpoints else None
+        if not candidates:
+            raise RosterHistoryError(f"No roster history before {first}" if first else "No roster history recorded yet")
+        checkpoint = candidates[-1]
+        base = self.read_checkpoint(checkpoint)
+
+        # Copy-on-write replay: the cached checkpoint itself is never changed
+        teams = {team_name: list(employees) for team_name, employees in base['teams'].items()}
+        positions = {}
+        for team_name, employees in teams.items():
+            for i, employee in enumerate(employees):
+                positions.setdefault(employee['id'], (team_name, i))
+        date_positions = {header: i for i, header in enumerate(base.get('headers', []))}
+        copied = set()
+        replayed = 0
+
+        journal_path = os.path.join(self.directory, checkpoint['journal'])
+        if os.path.exists(journal_path):
+            with open(journal_path, 'rb') as f:
+                for line in f:
+                    entry = json.loads(line)
+                    if entry['ts'] > timestamp:
+                        break
+                    location = positions.get(entry['id'])
+                    date_index = date_positions.get(entry['date'])
+                    if location is None or date_index is None:
+                        continue
+                    team_name, i = location
+                    if location not in copied:
+                        employee = teams[team_name][i]
+                        teams[team_name][i] = dict(employee, schedule=list(employee.get('schedule', [])))
+                        copied.add(location)
+                    schedule = teams[team_name][i]['schedule']
+                    if date_index < len(schedule):
+                        schedule[date_index] = entry['new']
+                        replayed += 1
+
+        roster = {'teams': teams, 'headers': base.get('headers', []),
+                  'allEmployees': [employee for employees in teams.values() for employee in employees]}
+        return roster, {'checkpoint': {key: checkpoint[key] for key in ('id', 'timestamp', 'reason')},
+                        'replayed': replayed}
+
+    def stats(self):
+        with self.lock:
+            return {'checkpoints': len(self.checkpoints), 'pendingEdits': self.pending,
+                    'deferredCheckpoint': self.deferred,
+                    'journalBytes': self.journal_size(),
+                    'snapshotBytes': sum(os.path.getsize(os.path.join(self.directory, checkpoint['file']))
+                                         for checkpoint in self.checkpoints
+                                         if os.path.exists(os.path.join(self.directory, checkpoint['file']))),
+                    'retainDays': self.retain_days, 'maxCheckpoints': self.max_checkpoints,
+                    'first': self.checkpoints[0]['timestamp'] if self.checkpoints else None,
+                    'last': self.checkpoints[-1]['timestamp'] if self.checkpoints else None}
+
+# Global instance
+ROSTER_HISTORY = RosterHistory()
@@ -0,0 +1,481 @@
+# roster_overlay.py - Admin changes stored as a sparse overlay on Google data
+#
+# The admin roster is never stored in full. It is computed as google + overlay,
+# where the overlay only holds what the admins changed:
+#
+#   cells      {employee_id: {month_key: {date_header: shift}}}
+#   employees  {employee_id: {'name', 'id', 'team', 'added'}}  field overrides,
+#              or full records for employees that only exist in the overlay
+#   deleted_employees  [employee_id, ...]
+#   teams      {'added': [...], 'deleted': [...], 'renamed': {google_name: name}}
+#
+# Employees are keyed by their Google id (the "base id"), so an id edit is
+# just an override. Cells are keyed by month partition and date header rather
+# than column index, so they stay put when a sync adds or drops months.
+#
+# While a thread records an undoable action (see overlay_history.py), every
+# edit first remembers the previous value of what it touches, as a path into
+# the overlay data such as ('cells', employee_id, month_key, header).
+import copy
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+OVERLAY_VERSION = 1
+MISSING = object()   # Value of a path that does not exist
+
+def get_path(data, path):
+    for key in path:
+        if not isinstance(data, dict) or key not in data:
+            return MISSING
+        data = data[key]
+    return data
+
+def set_path(data, path, value):
+    """Set or (value MISSING) delete a path, dropping cell dicts left empty"""
+    parents = []
+    for key in path[:-1]:
+        if key not in data:
+            if value is MISSING:
+                return
+            data[key] = {}
+        parents.append((data, key))
+        data = data[key]
+    if value is MISSING:
+        data.pop(path[-1], None)
+        if path[0] == 'cells':
+            for parent, key in reversed(parents[1:]):
+                if parent[key]:
+                    break
+                del parent[key]
+    else:
+        data[path[-1]] = value
+
+def empty_overlay():
+    return {
+        'version': OVERLAY_VERSION,
+        'cells': {},
+        'employees': {},
+        'deleted_employees': [],
+        'teams': {'added': [], 'deleted': [], 'renamed': {}}
+    }
+
+class RosterOverlay:
+    def __init__(self, file_path):
+        self.file_path = file_path
+        self.lock = threading.RLock()
+        self.data = empty_overlay()
+        self.local = threading.local()   # .recording: {path: previous value} of the current action
+        self.shown_ids = None   # id shown in the admin view -> base id, for overridden ids; None = rebuild
+
+    # Persistence
+
+    def load(self):
+        """Load the overlay from file; returns False when there is none yet"""
+        if not os.path.exists(self.file_path):
+            return False
+        with open(self.file_path, 'r', encoding='utf-8') as f:
+            self.replace(json.load(f))
+        return True
+
+    def replace(self, data):
+        """Swap in new overlay data, keeping this instance (and whatever holds it)"""
+        with self.lock:
+            self.data = empty_overlay()
+            self.data.update(data)
+            self.shown_ids = None
+
+    def save(self):
+        """Atomically write the overlay to file"""
+        with self.lock:
+            payload = json.dumps(self.data, ensure_ascii=False, separators=(',', ':'))
+        os.makedirs(os.path.dirname(self.file_path) or '.', exist_ok=True)
+        tmp_path = self.file_path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(payload)
+        os.replace(tmp_path, self.file_path)
+
+    def clear(self):
+        """Drop every admin change (reset to Google data)"""
+        with self.lock:
+            # The old values are detached rather than edited, so they need no copy
+            for key in ('cells', 'employees', 'deleted_employees', 'teams'):
+                self.remember(key, copy_value=False)
+            self.data = empty_overlay()
+            self.shown_ids = None
+
+    # Undo support
+
+    def remember(self, *path, copy_value=True):
+        """Record the value at path before an edit, if an action is being recorded"""
+        recording = getattr(self.local, 'recording', None)
+        if recording is not None and path not in recording:
+            value = get_path(self.data, path)
+            recording[path] = copy.deepcopy(value) if copy_value and value is not MISSING else value
+
+    def capture(self, paths):
+        """Copies of the current values at paths"""
+        with self.lock:
+            values = {}
+            for path in paths:
+                value = get_path(self.data, path)
+                values[path] = value if value is MISSING else copy.deepcopy(value)
+            return values
+
+    def restore(self, values):
+        """Put back values recorded by remember or capture, last recorded first"""
+        with self.lock:
+            for path, value in reversed(list(values.items())):
+                set_path(self.data, path, value)
+            self.shown_ids = None
+
+    def is_empty(self):
+        return self.data == empty_overlay()
+
+    # Lookups
+
+    def base_id(self, employee_id):
+        """Map an employee id as shown in the admin view back to its base id"""
+        with self.lock:
+            if self.shown_ids is None:
+                self.shown_ids = {}
+                for base_id, override in self.data['employees'].items():
+                    if 'id' in override:
+                        self.shown_ids.setdefault(override['id'], base_id)
+            return self.shown_ids.get(employee_id, employee_id)
+
+    def update_shown_id(self, old_key, old_shown, new_key):
+        """Keep shown_ids current after the override at old_key (shown as old_shown) moved to new_key"""
+        if self.shown_ids is None:
+            return
+        if old_shown is not None and self.shown_ids.get(old_shown) == old_key:
+            del self.shown_ids[old_shown]
+        new_shown = self.data['employees'].get(new_key, {}).get('id')
+        if new_shown is not None:
+            self.shown_ids.setdefault(new_shown, new_key)
+
+    def cell_count(self):
+        return sum(len(headers) for months in self.data['cells'].values() for headers in months.values())
+
+    def month_cells(self, employee_id, month_key):
+        """Cell overrides {date_header: shift} of one employee in one month"""
+        return self.data['cells'].get(employee_id, {}).get(month_key, {})
+
+    def month_summary(self):
+        """Count cell overrides per month"""
+        counts = {}
+        for months in self.data['cells'].values():
+            for month_key, headers in months.items():
+                counts[month_key] = counts.get(month_key, 0) + len(headers)
+        return [{'month': month_key, 'cells': count} for month_key, count in counts.items()]
+
+    def stats(self):
+        return {
+            'cells': self.cell_count(),
+            'employees': len(self.data['employees']),
+            'deleted_employees': len(self.data['deleted_employees']),
+            'teams_added': len(self.data['teams']['added']),
+            'teams_deleted': len(self.data['teams']['deleted']),
+            'teams_renamed': len(self.data['teams']['renamed'])
+        }
+
+    # Edits
+
+    def set_shift(self, employee_id, month_key, header, shift, base_shift=None):
+        """Override one cell; setting it back to the Google value removes the override"""
+        with self.lock:
+            base_id = self.base_id(employee_id)
+            self.remember('cells', base_id, month_key, header)
+            cells = self.data['cells']
+            if base_shift is not None and shift == base_shift:
+                months = cells.get(base_id, {})
+                months.get(month_key, {}).pop(header, None)
+                if month_key in months and not months[month_key]:
+                    del months[month_key]
+                if base_id in cells and not cells[base_id]:
+                    del cells[base_id]
+            else:
+                cells.setdefault(base_id, {}).setdefault(month_key, {})[header] = shift
+
+    def add_employee(self, employee_id, name, team):
+        with self.lock:
+            self.remember('employees', employee_id)
+            self.remember('deleted_employees')
+            if employee_id in self.data['deleted_employees']:
+                self.data['deleted_employees'].remove(employee_id)
+                self.data['employees'].setdefault(employee_id, {}).update({'name': name, 'team': team})
+            else:
+                self.data['employees'][employee_id] = {'name': name, 'id': employee_id, 'team': team, 'added': True}
+                self.update_shown_id(employee_id, None, employee_id)
+
+    def update_employee(self, employee_id, name=None, team=None, new_id=None):
+        """Rename, move or re-id an employee shown in the admin view as employee_id"""
+        with self.lock:
+            base_id = self.base_id(employee_id)
+            self.remember('employees', base_id)
+            override = self.data['employees'].setdefault(base_id, {})
+            old_shown = override.get('id')
+            new_key = base_id
+            if name is not None:
+                override['name'] = name
+            if team is not None:
+                override['team'] = team
+            if new_id is not None and new_id != employee_id:
+                if override.get('added'):
+                    # Overlay-only employees are keyed by their own id
+                    for key in ('employees', 'cells'):
+                        self.remember(key, new_id)
+                    self.remember('cells', base_id)
+                    override['id'] = new_id
+                    self.data['employees'][new_id] = self.data['employees'].pop(base_id)
+                    if base_id in self.data['cells']:
+                        self.data['cells'][new_id] = self.data['cells'].pop(base_id)
+                    new_key = new_id
+                elif new_id == base_id:
+                    override.pop('id', None)
+                else:
+                    override['id'] = new_id
+            self.update_shown_id(base_id, old_shown, new_key)
+
+    def delete_employee(self, employee_id):
+        with self.lock:
+            base_id = self.base_id(employee_id)
+            for key in ('employees', 'cells'):
+                self.remember(key, base_id)
+            self.remember('deleted_employees')
+            override = self.data['employees'].pop(base_id, {})
+            self.update_shown_id(base_id, override.get('id'), base_id)
+            self.data['cells'].pop(base_id, None)
+            if not override.get('added') and base_id not in self.data['deleted_employees']:
+                self.data['deleted_employees'].append(base_id)
+
+    def add_team(self, team_name):
+        with self.lock:
+            self.remember('teams')
+            teams = self.data['teams']
+            if team_name in teams['deleted']:
+                teams['deleted'].remove(team_name)
+            elif team_name not in teams['added']:
+                teams['added'].append(team_name)
+
+    def rename_team(self, old_name, new_name):
+        with self.lock:
+            self.remember('teams')
+            teams = self.data['teams']
+            if old_name in teams['added']:
+                teams['added'][teams['added'].index(old_name)] = new_name
+            else:
+                google_name = next((g for g, n in teams['renamed'].items() if n == old_name), old_name)
+                if google_name == new_name:
+                    teams['renamed'].pop(google_name, None)
+                else:
+                    teams['renamed'][google_name] = new_name
+            for base_id, override in self.data['employees'].items():
+                if override.get('team') == old_name:
+                    self.remember('employees', base_id)
+                    override['team'] = new_name
+
+    def delete_team(self, team_name, employee_ids):
+        """Delete a team and the employees currently shown in it"""
+        with self.lock:
+            for employee_id in employee_ids:
+                self.delete_employee(employee_id)
+            self.remember('teams')
+            teams = self.data['teams']
+            if team_name in teams['added']:
+                teams['added'].remove(team_name)
+            elif team_name not in teams['deleted']:
+                teams['deleted'].append(team_name)
+
+    def reset_cells(self, base_ids=None, headers=None):
+        """Drop the cell overrides of some employees (by base id) and/or dates;
+        returns the number dropped"""
+        with self.lock:
+            dropped = 0
+            for base_id in list(self.data['cells']):
+                if base_ids is not None and base_id not in base_ids:
+                    continue
+                for month_key in list(self.data['cells'].get(base_id, {})):
+                    for header in list(self.data['cells'][base_id][month_key]):
+                        if headers is not None and header not in headers:
+                            continue
+                        self.remember('cells', base_id, month_key, header)
+                        set_path(self.data, ('cells', base_id, month_key, header), MISSING)
+                        dropped += 1
+            return dropped
+
+    def base_ids(self, employee_ids):
+        """Base ids of employees shown in the admin view as employee_ids"""
+        shown = {override['id']: base_id for base_id, override in self.data['employees'].items() if 'id' in override}
+        return {shown.get(employee_id, employee_id) for employee_id in employee_ids}
+
+    def reconcile(self, base):
+        """Fold a new Google roster into the overlay after a sync
+
+        One pass over base, with dictionary lookups only:
+          - an employee the admins added who now exists in Google becomes an
+            override of the Google record, keeping its name, team and cells
+          - a team override that matches Google's (moved) team is dropped
+          - a deletion of an employee Google no longer has is dropped
+        Returns counts of each.
+        """
+        with self.lock:
+            overrides = self.data['employees']
+            renamed = self.data['teams']['renamed']
+            adopted = team_overrides_dropped = 0
+            base_ids = set()
+            for team_name, employees in base.get('teams', {}).items():
+                team = renamed.get(team_name, team_name)
+                for employee in employees:
+                    base_id = employee['id']
+                    base_ids.add(base_id)
+                    override = overrides.get(base_id)
+                    if not override:
+                        continue
+                    if override.pop('added', False):
+                        override.pop('id', None)
+                        if override.get('name') == employee.get('name'):
+                            del override['name']
+                        adopted += 1
+                    if override.get('team') == team:
+                        del override['team']
+                        team_overrides_dropped += 1
+                    if not override:
+                        del overrides[base_id]
+
+            self.shown_ids = None
+            deleted = self.data['deleted_employees']
+            kept = [employee_id for employee_id in deleted if employee_id in base_ids]
+            self.data['deleted_employees'] = kept
+            return {
+                'adopted': adopted,
+                'teamOverridesDropped': team_overrides_dropped,
+                'deletionsDropped': len(deleted) - len(kept)
+            }
+
+    # Views
+
+    def apply(self, base, month_key):
+        """Compute the admin view google + overlay
+
+        month_key(header) gives the partition key of a date header. Employees
+        without changes are shared with base rather than copied, so the view
+        must be treated as read-only; change it through the edit methods.
+        """
+        with self.lock:
+            overlay = self.data
+            headers = list(base.get('headers', []))
+            header_months = [month_key(header) for header in headers]
+            renamed = overlay['teams']['renamed']
+            deleted = set(overlay['deleted_employees'])
+            employee_overrides = overlay['employees']
+
+            teams = {}
+            for team_name in base.get('teams', {}):
+                teams.setdefault(renamed.get(team_name, team_name), [])
+            for team_name in overlay['teams']['added']:
+                teams.setdefault(team_name, [])
+
+            for team_name, employees in base.get('teams', {}).items():
+                for employee in employees:
+                    base_id = employee['id']
+                    if base_id in deleted:
+                        continue
+                    override = employee_overrides.get(base_id, {})
+                    if override.get('added'):
+                        continue  # Overlay record wins over a Google employee with the same id
+                    team = override.get('team', renamed.get(team_name, team_name))
+                    record = self.materialize(employee, override, team, headers, header_months)
+                    teams.setdefault(team, []).append(record)
+
+            for base_id, override in employee_overrides.items():
+                if not override.get('added'):
+                    continue
+                employee = {
+                    'name': override.get('name', ''),
+                    'id': base_id,
+                    'currentTeam': override.get('team', ''),
+                    'allTeams': [override.get('team', '')],
+                    'schedule': [''] * len(headers)
+                }
+                team = override.get('team', '')
+                record = self.materialize(employee, {}, team, headers, header_months)
+                teams.setdefault(team, []).append(record)
+
+            for team_name in overlay['teams']['deleted']:
+                teams.pop(team_name, None)
+
+            return {
+                'teams': teams,
+                'headers': headers,
+                'allEmployees': [employee for employees in teams.values() for employee in employees]
+            }
+
+    def materialize(self, employee, override, team, headers, header_months):
+        """Copy-on-write: only employees with changes get their own record"""
+        cells = self.data['cells'].get(employee['id'])
+        fields = {key: value for key, value in override.items() if key in ('name', 'id')}
+        if not cells and not fields and employee.get('currentTeam') == team:
+            return employee
+
+        record = dict(employee, **fields)
+        record['currentTeam'] = team
+        if 'team' in record:
+            record['team'] = team
+        if cells:
+            schedule = list(employee.get('schedule', []))
+            if len(schedule) < len(headers):
+                schedule.extend([''] * (len(headers) - len(schedule)))
+            for i, header in enumerate(headers):
+                month_cells = cells.get(header_months[i])
+                if month_cells and header in month_cells:
+                    schedule[i] = month_cells[header]
+            record['schedule'] = schedule
+        return record
+
+    @classmethod
+    def from_diff(cls, file_path, base, admin, month_key):
+        """Build an overlay from a full admin roster (migration from admin_data.json)"""
+        overlay = cls(file_path)
+        base_employees = {}
+        for team_name, employees in base.get('teams', {}).items():
+            for employee in employees:
+                base_employees[employee['id']] = (team_name, employee)
+        base_index = {header: i for i, header in enumerate(base.get('headers', []))}
+
+        admin_ids = set()
+        for team_name, employees in admin.get('teams', {}).items():
+            if team_name not in base.get('teams', {}):
+                overlay.add_team(team_name)
+            for employee in employees:
+                employee_id = employee['id']
+                admin_ids.add(employee_id)
+                if employee_id in base_employees:
+                    base_team, base_employee = base_employees[employee_id]
+                    if employee.get('name') != base_employee.get('name'):
+                        overlay.update_employee(employee_id, name=employee.get('name'))
+                    if team_name != base_team:
+                        overlay.update_employee(employee_id, team=team_name)
+                    base_schedule = base_employee.get('schedule', [])
+                else:
+                    overlay.add_employee(employee_id, employee.get('name', ''), team_name)
+                    base_schedule = []
+
+                for i, header in enumerate(admin.get('headers', [])):
+                    schedule = employee.get('schedule', [])
+                    shift = schedule[i] if i < len(schedule) else ''
+                    j = base_index.get(header)
+                    base_shift = base_schedule[j] if j is not None and j < len(base_schedule) else ''
+                    if shift != base_shift:
+                        overlay.set_shift(employee_id, month_key(header), header, shift)
+
+        for employee_id in base_employees:
+            if employee_id not in admin_ids:
+                overlay.delete_employee(employee_id)
+        for team_name in base.get('teams', {}):
+            if team_name not in admin.get('teams', {}):
+                overlay.data['teams']['deleted'].append(team_name)
+        return overlay
@@ -0,0 +1,103 @@
+# roster_projection.py - Team, employee and date-window projection of roster responses
+#
+# Read endpoints accept these parameters (query string, or JSON body for POST):
+#
+#   teams      comma-separated team names
+#   employees  comma-separated employee ids
+#   month      month partition key, e.g. "Oct-2025"
+#   start/end  first/last date to include, as a header label ("3Oct") or index
+#
+# A projected response carries 'dateOffset', the index of its first date in
+# the full header list, so dateIndex values sent back to the server (e.g. to
+# update-shift) can still be computed.
+
+class ProjectionError(ValueError):
+    pass
+
+def parse_list(value):
+    """Accept 'a,b', ['a', 'b'] or None"""
+    if value is None:
+        return None
+    if isinstance(value, str):
+        items = [item.strip() for item in value.split(',')]
+    else:
+        items = [str(item).strip() for item in value]
+    items = [item for item in items if item]
+    return items or None
+
+class RosterProjection:
+    def __init__(self, teams=None, employee_ids=None, month=None, start=None, end=None):
+        self.teams = set(teams) if teams else None
+        self.employee_ids = set(employee_ids) if employee_ids else None
+        self.month = month or None
+        self.start = start
+        self.end = end
+
+    @classmethod
+    def from_args(cls, args):
+        """Build a projection from request.args or a JSON body"""
+        return cls(
+            teams=parse_list(args.get('teams')),
+            employee_ids=parse_list(args.get('employees')),
+            month=args.get('month'),
+            start=args.get('start'),
+            end=args.get('end')
+        )
+
+    def is_empty(self):
+        return not (self.teams or self.employee_ids or self.month or self.start is not None or self.end is not None)
+
+    def has_date_window(self):
+        return bool(self.month) or self.start is not None or self.end is not None
+
+    def date_index(self, headers, value, name):
+        """Resolve a start/end value given as an index or a header label"""
+        if isinstance(value, int) or (isinstance(value, str) and value.strip().lstrip('-').isdigit()):
+            index = int(value)
+            if not 0 <= index < len(headers):
+                raise ProjectionError(f"{name} index {index} is out of range (0-{len(headers) - 1})")
+            return index
+        if value not in headers:
+            raise ProjectionError(f"Unknown {name} date '{value}'")
+        return headers.index(value)
+
+    def date_window(self, headers, month_key):
+        """Get the (lo, hi) slice of headers selected by month/start/end"""
+        lo, hi = 0, len(headers)
+        if self.month:
+            indexes = [i for i, header in enumerate(headers) if month_key(header) == self.month]
+            if not indexes:
+                raise ProjectionError(f"Unknown month '{self.month}'")
+            lo, hi = indexes[0], indexes[-1] + 1
+        if self.start is not None:
+            lo = max(lo, self.date_index(headers, self.start, 'start'))
+        if self.end is not None:
+            hi = min(hi, self.date_index(headers, self.end, 'end') + 1)
+        return lo, max(lo, hi)
+
+    def keep_employee(self, employee):
+        return self.employee_ids is None or employee['id'] in self.employee_ids
+
+    def apply(self, data, month_key):
+        """Project a {'teams', 'headers', 'allEmployees'} roster"""
+        headers = data.get('headers', [])
+        lo, hi = self.date_window(headers, month_key) if self.has_date_window() else (0, len(headers))
+        full_window = (lo, hi) == (0, len(headers))
+
+        teams = {}
+        for team_name, employees in data.get('teams', {}).items():
+            if self.teams is not None and team_name not in self.teams:
+                continue
+            kept = [employee for employee in employees if self.keep_employee(employee)]
+            if self.employee_ids is not None and not kept:
+                continue
+            if not full_window:
+                kept = [dict(employee, schedule=employee.get('schedule', [])[lo:hi]) for employee in kept]
+            teams[team_name] = kept
+
+        return {
+            'teams': teams,
+            'headers': headers[lo:hi],
+            'allEmployees': [employee for employees in teams.values() for employee in employees],
+            'dateOffset': lo
+        }
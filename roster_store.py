@@ -0,0 +1,346 @@
+# roster_store.py - Month-partitioned storage for roster datasets
+#
+# A dataset ({'teams', 'headers', 'allEmployees'}) is stored as:
+#
+#   <root>/<name>/manifest.json    teams and employees without schedules, plus the month list
+#   <root>/<name>/<Mon-YYYY>.json  {'headers': [...], 'schedules': {employee_id: [...]}}
+#
+# Partition keys use the same "Oct-2025" form as the Google Sheets link keys.
+# Only active months are loaded into the in-memory dataset; older months stay
+# on disk and are read on demand through load_month(). Saving writes only the
+# partitions whose contents changed. Each file is mirrored to a binary
+# snapshot by snapshot.py.
+import calendar
+import json
+import logging
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from snapshot import load_data_file, save_snapshot_file
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_VERSION = 1
+UNDATED_MONTH = 'undated'
+MONTH_ABBRS = [calendar.month_abbr[i] for i in range(1, 13)]
+MONTH_LOOKUP = {name.lower(): i + 1 for i, name in enumerate(MONTH_ABBRS)}
+MONTH_LOOKUP.update({calendar.month_name[i].lower(): i for i in range(1, 13)})
+MONTH_LOOKUP['sept'] = 9
+
+# Months before the current one that stay resident (ROSTER_ACTIVE_MONTHS)
+ACTIVE_PAST_MONTHS = int(os.environ.get('ROSTER_ACTIVE_MONTHS', '1'))
+# Archived partitions kept in memory after a history lookup
+ARCHIVE_CACHE_SIZE = 6
+
+def parse_month_key(key):
+    """Parse 'Oct-2025' into (2025, 10), or None"""
+    match = re.match(r'^([A-Za-z]+)[-\s]?(\d{4})$', key or '')
+    if not match or match.group(1).lower() not in MONTH_LOOKUP:
+        return None
+    return int(match.group(2)), MONTH_LOOKUP[match.group(1).lower()]
+
+def format_month_key(year, month):
+    return f"{MONTH_ABBRS[month - 1]}-{year}"
+
+def month_sort_key(key):
+    """Chronological sort key; undated/unknown partitions sort last"""
+    parsed = parse_month_key(key)
+    return parsed if parsed else (9999, 99)
+
+def header_month(header):
+    """Get the month number (1-12) of a date header like '3Oct', or None"""
+    match = re.match(r'\s*\d{1,2}[-.\s]*([A-Za-z]+)', header or '')
+    if match:
+        return MONTH_LOOKUP.get(match.group(1).lower()) or MONTH_LOOKUP.get(match.group(1).lower()[:3])
+    return None
+
+def header_month_key(header, known_keys=(), today=None):
+    """Get the partition key for a date header
+
+    Headers carry no year, so the year comes from a known month key for the
+    same month (latest first), or else the year that puts the month closest
+    to today.
+    """
+    month = header_month(header)
+    if month is None:
+        return UNDATED_MONTH
+
+    years = sorted(
+        (parsed[0] for parsed in (parse_month_key(key) for key in known_keys) if parsed and parsed[1] == month),
+        reverse=True
+    )
+    if years:
+        return format_month_key(years[0], month)
+
+    today = today or datetime.now()
+    candidates = [today.year - 1, today.year, today.year + 1]
+    year = min(candidates, key=lambda y: abs((y * 12 + month) - (today.year * 12 + today.month)))
+    return format_month_key(year, month)
+
+def active_month_keys(keys, today=None, past_months=ACTIVE_PAST_MONTHS, fallback_count=2):
+    """Pick the months to keep resident: from past_months before today onward
+
+    When every stored month is older than that, the latest fallback_count
+    months stay resident so the roster is never empty.
+    """
+    today = today or datetime.now()
+    cutoff = today.year * 12 + today.month - 1 - past_months
+    dated = [key for key in keys if parse_month_key(key)]
+    active = [key for key in dated if parse_month_key(key)[0] * 12 + parse_month_key(key)[1] - 1 >= cutoff]
+    if not active:
+        active = sorted(dated, key=month_sort_key)[-fallback_count:]
+    if UNDATED_MONTH in keys:
+        active.append(UNDATED_MONTH)
+    return sorted(active, key=month_sort_key)
+
+def partition_fingerprint(partition):
+    """Cheap change detector for a partition"""
+    return hash((
+        tuple(partition['headers']),
+        tuple((emp_id, tuple(shifts)) for emp_id, shifts in partition['schedules'].items())
+    ))
+
+def read_json_file(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+class RosterStore:
+    def __init__(self, root_dir, name, write_json=True):
+        self.directory = os.path.join(root_dir, name)
+        self.name = name
+        self.write_json = write_json
+        self.lock = threading.RLock()
+        self.months = []            # every stored month, chronological
+        self.resident_months = []   # months present in the in-memory dataset
+        self.header_keys = {}       # date header -> partition key, kept stable between saves
+        self.header_scope = None    # (link keys, stored months) header_keys was resolved against
+        self._fingerprints = {}
+        self._manifest_fingerprint = None
+        self._archive_cache = OrderedDict()
+
+    @property
+    def manifest_path(self):
+        return os.path.join(self.directory, 'manifest.json')
+
+    def partition_path(self, key):
+        return os.path.join(self.directory, f"{key}.json")
+
+    def exists(self):
+        return os.path.exists(self.manifest_path) or os.path.exists(os.path.splitext(self.manifest_path)[0] + '.snap')
+
+    def write_file(self, path, payload):
+        """Write a JSON file (unless disabled) and its snapshot mirror"""
+        os.makedirs(self.directory, exist_ok=True)
+        if self.write_json:
+            tmp_path = path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(payload, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+        save_snapshot_file(path, payload, roster=False)
+
+    def read_file(self, path):
+        return load_data_file(path, read_json_file, roster=False)
+
+    def month_key(self, header, known_keys=()):
+        """Get (and remember) the partition key of a date header
+
+        Headers carry no year, so a remembered key only holds while the link
+        keys and stored months it was resolved against stay the same: once a
+        newer link key (e.g. 'Oct-2026') appears, "1Oct" resolves to it and
+        the archived 'Oct-2025' partition is left alone.
+        """
+        scope = (frozenset(known_keys), tuple(self.months))
+        if scope != self.header_scope:
+            self.header_scope = scope
+            self.header_keys = {cached_header: key for cached_header, key in self.header_keys.items()
+                                if not self.superseded(key, known_keys)}
+        key = self.header_keys.get(header)
+        if key is None:
+            key = header_month_key(header, list(known_keys) + self.months)
+            self.header_keys[header] = key
+        return key
+
+    def superseded(self, key, known_keys=()):
+        """Whether a later year of key's month is linked or stored"""
+        parsed = parse_month_key(key)
+        if not parsed:
+            return False
+        return any(other[1] == parsed[1] and other[0] > parsed[0]
+                   for other in map(parse_month_key, list(known_keys) + self.months) if other)
+
+    def split(self, data, known_keys=(), only=None):
+        """Split a dataset into {month key: partition}, optionally just the months in only"""
+        indices = OrderedDict()
+        for i, header in enumerate(data.get('headers', [])):
+            key = self.month_key(header, known_keys)
+            if only is None or key in only:
+                indices.setdefault(key, []).append(i)
+
+        partitions = {}
+        employees = [employee for team in data.get('teams', {}).values() for employee in team]
+        for key, positions in indices.items():
+            schedules = {}
+            for employee in employees:
+                schedule = employee.get('schedule', [])
+                schedules[employee['id']] = [schedule[i] if i < len(schedule) else '' for i in positions]
+            partitions[key] = {
+                'headers': [data['headers'][i] for i in positions],
+                'schedules': schedules
+            }
+        return partitions
+
+    def build_manifest(self, data, months):
+        return {
+            'version': MANIFEST_VERSION,
+            'months': months,
+            'teams': {
+                team_name: [
+                    {field: value for field, value in employee.items() if field != 'schedule'}
+                    for employee in employees
+                ]
+                for team_name, employees in data.get('teams', {}).items()
+            }
+        }
+
+    def save(self, data, months=None, known_keys=()):
+        """Persist the resident months of a dataset
+
+        months limits the partitions considered (e.g. the month of an edited
+        cell); by default every resident partition is checked and only the
+        changed ones are rewritten. The manifest is rewritten only when
+        teams or employees changed.
+        """
+        with self.lock:
+            partitions = self.split(data, known_keys, only=months)
+
+            written = []
+            for key, partition in partitions.items():
+                if key in self.months and key not in self.resident_months and self.superseded(key, known_keys):
+                    # Never overwrite an archived month with a later year's data
+                    logger.warning("Skipped writing a superseded archived month", extra={'store': self.name, 'month': key})
+                    continue
+                fingerprint = partition_fingerprint(partition)
+                if self._fingerprints.get(key) == fingerprint:
+                    continue
+                self.write_file(self.partition_path(key), partition)
+                self._fingerprints[key] = fingerprint
+                self._archive_cache.pop(key, None)
+                written.append(key)
+
+            data_months = self.split_keys(data, known_keys)
+            all_months = sorted(set(self.months) | set(data_months), key=month_sort_key)
+            manifest = self.build_manifest(data, all_months)
+            manifest_fingerprint = hash(json.dumps(manifest, sort_keys=True))
+            if manifest_fingerprint != self._manifest_fingerprint:
+                self.write_file(self.manifest_path, manifest)
+                self._manifest_fingerprint = manifest_fingerprint
+                written.append('manifest')
+
+            self.months = all_months
+            self.resident_months = [key for key in all_months if key in data_months]
+            if written:
+                logger.debug("Roster partitions saved", extra={'store': self.name, 'written': written})
+            return written
+
+    def split_keys(self, data, known_keys=()):
+        """Month keys present in a dataset's headers"""
+        keys = []
+        for header in data.get('headers', []):
+            key = self.month_key(header, known_keys)
+            if key not in keys:
+                keys.append(key)
+        return keys
+
+    def load(self, months=None):
+        """Load the dataset with only the given (default: active) months resident"""
+        with self.lock:
+            manifest = self.read_file(self.manifest_path)
+            if manifest is None:
+                return None
+            self.months = manifest.get('months', [])
+            self.header_keys = {}
+            self.header_scope = None
+            self._manifest_fingerprint = hash(json.dumps(manifest, sort_keys=True))
+            resident = months if months is not None else active_month_keys(self.months)
+            resident = [key for key in self.months if key in resident]
+
+            headers = []
+            month_partitions = []
+            for key in resident:
+                partition = self.read_file(self.partition_path(key))
+                if partition is None:
+                    continue
+                self._fingerprints[key] = partition_fingerprint(partition)
+                for header in partition['headers']:
+                    self.header_keys[header] = key
+                headers.extend(partition['headers'])
+                month_partitions.append(partition)
+
+            teams = {}
+            all_employees = []
+            for team_name, employees in manifest.get('teams', {}).items():
+                teams[team_name] = []
+                for employee in employees:
+                    schedule = []
+                    for partition in month_partitions:
+                        shifts = partition['schedules'].get(employee['id'])
+                        if shifts is None:
+                            shifts = [''] * len(partition['headers'])
+                        schedule.extend(sys.intern(shift) for shift in shifts)
+                    record = dict(employee, schedule=schedule)
+                    teams[team_name].append(record)
+                    all_employees.append(record)
+
+            self.resident_months = [key for key in resident if key in self.months]
+            return {
+                'teams': teams,
+                'headers': headers,
+                'allEmployees': all_employees
+            }
+
+    def evict_inactive(self, data, known_keys=()):
+        """Get data without the months that are no longer active (after saving it)
+
+        data itself is not changed: its employee dicts may be shared with a
+        view other requests are reading, so the trimmed dataset is built anew
+        for the caller to swap in. Returns data itself when nothing is evicted.
+        """
+        with self.lock:
+            keys = self.split_keys(data, known_keys)
+            active = set(active_month_keys(sorted(set(keys) | set(self.months), key=month_sort_key)))
+            keep = [i for i, header in enumerate(data.get('headers', [])) if self.month_key(header, known_keys) in active]
+            if len(keep) == len(data.get('headers', [])):
+                return data
+            teams = {}
+            for team_name, employees in data.get('teams', {}).items():
+                teams[team_name] = []
+                for employee in employees:
+                    schedule = employee.get('schedule', [])
+                    teams[team_name].append(dict(employee, schedule=[schedule[i] if i < len(schedule) else '' for i in keep]))
+            self.resident_months = [key for key in keys if key in active]
+            logger.info("Evicted inactive months", extra={'store': self.name, 'resident': self.resident_months})
+            return dict(data, teams=teams, headers=[data['headers'][i] for i in keep],
+                        allEmployees=[employee for employees in teams.values() for employee in employees])
+
+    def load_month(self, key):
+        """Read one partition, resident or archived, for history views; None for unknown months"""
+        with self.lock:
+            if key not in self.months:
+                return None
+            if key in self._archive_cache:
+                self._archive_cache.move_to_end(key)
+                return self._archive_cache[key]
+            partition = self.read_file(self.partition_path(key))
+            if partition is not None:
+                self._archive_cache[key] = partition
+                while len(self._archive_cache) > ARCHIVE_CACHE_SIZE:
+                    self._archive_cache.popitem(last=False)
+            return partition
+
+    def month_summary(self):
+        """List stored months with their residency"""
+        return [{'month': key, 'resident': key in self.resident_months} for key in self.months]
@@ -1,14 +1,31 @@
 # schedule_requests.py - Schedule swap and change requests management
 import json
+import logging
 import os
 from datetime import datetime
+from metrics import METRICS
+from shift_catalog import SHIFT_CATALOG
+from retention import resolved_at
+
+logger = logging.getLogger(__name__)
 
 SCHEDULE_REQUESTS_FILE = 'data/schedule_requests.json'
+REQUEST_LISTS = {'shift_change_requests': 'shift_change', 'swap_requests': 'swap'}
+
+def request_employee_ids(request):
+    """Employees a request belongs to: the employee, or the swap requester and target"""
+    return [employee_id for employee_id in (request.get('employee_id'), request.get('requester_id'),
+                                            request.get('target_employee_id')) if employee_id]
 
 class ScheduleRequests:
     def __init__(self):
         self.requests = {}
+        # (employee id, date) -> pending request id; see index_pending
+        self.pending_wants = {}
+        self.pending_targets = {}
         self.load_requests()
+        self.init_counters()
+        self.index_pending()
     
     def load_requests(self):
         """Load schedule requests from file"""
@@ -24,8 +41,8 @@ class ScheduleRequests:
                     'pending_count': 0
                 }
                 self.save_requests()
-        except Exception as e:
-            print(f"Error loading schedule requests: {e}")
+        except Exception:
+            logger.exception("Error loading schedule requests")
             self.requests = {
                 'shift_change_requests': [],
                 'swap_requests': [],
@@ -33,6 +50,77 @@ class ScheduleRequests:
                 'pending_count': 0
             }
     
+    def init_counters(self):
+        """Request id counters and archived counts, derived from the ids on file when missing
+
+        Ids cannot come from the list lengths once resolved requests are archived.
+        """
+        next_ids = self.requests.setdefault('next_ids', {})
+        for list_key, prefix in REQUEST_LISTS.items():
+            if prefix not in next_ids:
+                numbers = [int(r['id'].rsplit('_', 1)[1]) for r in self.requests.get(list_key, [])
+                           if r.get('id', '').rsplit('_', 1)[-1].isdigit()]
+                next_ids[prefix] = max(numbers, default=0) + 1
+        self.requests.setdefault('archived_counts', {list_key: 0 for list_key in REQUEST_LISTS})
+        self.requests.setdefault('archived_months', {})   # employee id -> archive months holding their requests
+    
+    def next_id(self, prefix):
+        next_ids = self.requests['next_ids']
+        request_id = f"{prefix}_{next_ids[prefix]}"
+        next_ids[prefix] += 1
+        return request_id
+    
+    def total_count(self, list_key):
+        """Requests ever submitted to a list, archived ones included"""
+        return len(self.requests[list_key]) + self.requests['archived_counts'].get(list_key, 0)
+    
+    def set_status(self, request, status, approved_by=None):
+        request['status'] = status
+        request['resolved_at'] = datetime.now().isoformat()
+        if status == 'approved':
+            request['approved_at'] = request['resolved_at']
+            request['approved_by'] = approved_by
+            self.requests['approved_count'] += 1
+    
+    def archive_resolved(self, archive, cutoff):
+        """Move requests resolved before cutoff into month archives by creation month;
+        returns the number moved
+
+        Archives are written before the trimmed requests file. Requests an
+        archive already holds (a run interrupted in between) are not
+        appended again.
+        """
+        moved = 0
+        archived_months = self.requests['archived_months']
+        for list_key in REQUEST_LISTS:
+            hot = []
+            old = {}
+            for r in self.requests[list_key]:
+                if r['status'] != 'pending' and resolved_at(r) < cutoff:
+                    old.setdefault((r.get('created_at') or resolved_at(r))[:7], []).append(r)
+                else:
+                    hot.append(r)
+            for month, records in old.items():
+                archive.append('requests', month, records)
+                for r in records:
+                    for employee_id in request_employee_ids(r):
+                        months = archived_months.setdefault(employee_id, [])
+                        if month not in months:
+                            months.append(month)
+                moved += len(records)
+                self.requests['archived_counts'][list_key] = self.requests['archived_counts'].get(list_key, 0) + len(records)
+            self.requests[list_key] = hot
+        if moved:
+            self.save_requests()
+        return moved
+    
+    def get_archived_requests(self, archive, month, employee_id=None, status=None):
+        """Archived requests of one month, optionally for one employee and status"""
+        return [r for r in archive.read('requests', month)
+                if (employee_id is None or employee_id in request_employee_ids(r))
+                and (status is None or r['status'] == status)]
+    
+    @METRICS.timed('save_requests')
     def save_requests(self):
         """Save schedule requests to file"""
         try:
@@ -41,14 +129,14 @@ class ScheduleRequests:
             with open(SCHEDULE_REQUESTS_FILE, 'w', encoding='utf-8') as f:
                 json.dump(self.requests, f, indent=2, ensure_ascii=False)
             return True
-        except Exception as e:
-            print(f"Error saving schedule requests: {e}")
+        except Exception:
+            logger.exception("Error saving schedule requests")
             return False
     
     def add_shift_change_request(self, employee_id, employee_name, team, date, current_shift, requested_shift, reason):
         """Add a new shift change request"""
         request = {
-            'id': f"shift_change_{len(self.requests['shift_change_requests']) + 1}",
+            'id': self.next_id('shift_change'),
             'employee_id': employee_id,
             'employee_name': employee_name,
             'team': team,
@@ -71,7 +159,7 @@ class ScheduleRequests:
     def add_swap_request(self, requester_id, requester_name, target_employee_id, target_employee_name, team, date, requester_shift, target_shift, reason):
         """Add a new swap request"""
         request = {
-            'id': f"swap_{len(self.requests['swap_requests']) + 1}",
+            'id': self.next_id('swap'),
             'requester_id': requester_id,
             'requester_name': requester_name,
             'target_employee_id': target_employee_id,
@@ -98,11 +186,7 @@ class ScheduleRequests:
         # Search in shift change requests
         for request in self.requests['shift_change_requests']:
             if request['id'] == request_id:
-                request['status'] = status
-                if status == 'approved':
-                    request['approved_at'] = datetime.now().isoformat()
-                    request['approved_by'] = approved_by
-                    self.requests['approved_count'] += 1
+                self.set_status(request, status, approved_by)
                 self.update_counts()
                 self.save_requests()
                 return request
@@ -110,17 +194,33 @@ class ScheduleRequests:
         # Search in swap requests
         for request in self.requests['swap_requests']:
             if request['id'] == request_id:
-                request['status'] = status
-                if status == 'approved':
-                    request['approved_at'] = datetime.now().isoformat()
-                    request['approved_by'] = approved_by
-                    self.requests['approved_count'] += 1
+                self.set_status(request, status, approved_by)
                 self.update_counts()
                 self.save_requests()
                 return request
         
         return None
     
+    def get_request(self, request_id):
+        """Find a shift change or swap request by id"""
+        for request in self.requests['shift_change_requests'] + self.requests['swap_requests']:
+            if request['id'] == request_id:
+                return request
+        return None
+    
+    def update_requests_status(self, request_ids, status, approved_by=None):
+        """Update several requests at once, saving the file once"""
+        updated = []
+        for request_id in request_ids:
+            request = self.get_request(request_id)
+            if request is None:
+                continue
+            self.set_status(request, status, approved_by)
+            updated.append(request)
+        self.update_counts()
+        self.save_requests()
+        return updated
+    
     def update_counts(self):
         """Update pending and approved counts"""
         pending_count = 0
@@ -130,6 +230,35 @@ class ScheduleRequests:
         pending_count += len([r for r in self.requests['swap_requests'] if r['status'] == 'pending'])
         
         self.requests['pending_count'] = pending_count
+        self.index_pending()
+    
+    def index_pending(self):
+        """Rebuild the indexes of pending requests by (employee id, date)
+
+        pending_wants holds the cell an employee asked to change (shift change
+        or swap requester); pending_targets holds the cell a swap asks to take.
+        Being a swap target does not stop an employee from asking for a
+        change of their own, so chains of requests stay possible.
+        """
+        pending_wants = {}
+        pending_targets = {}
+        for r in self.requests.get('shift_change_requests', []):
+            if r['status'] == 'pending':
+                pending_wants.setdefault((r['employee_id'], r['date']), r['id'])
+        for r in self.requests.get('swap_requests', []):
+            if r['status'] == 'pending':
+                pending_wants.setdefault((r['requester_id'], r['date']), r['id'])
+                pending_targets.setdefault((r['target_employee_id'], r['date']), r['id'])
+        self.pending_wants = pending_wants
+        self.pending_targets = pending_targets
+    
+    def pending_want(self, employee_id, date):
+        """Id of employee_id's own pending request on date, or None"""
+        return self.pending_wants.get((employee_id, date))
+    
+    def pending_target(self, employee_id, date):
+        """Id of a pending swap asking for employee_id's shift on date, or None"""
+        return self.pending_targets.get((employee_id, date))
     
     def get_pending_requests(self):
         """Get all pending requests"""
@@ -138,23 +267,30 @@ class ScheduleRequests:
         pending_requests.extend([r for r in self.requests['swap_requests'] if r['status'] == 'pending'])
         return pending_requests
     
-    def get_employee_requests(self, employee_id):
-        """Get all requests for a specific employee"""
+    def get_employee_requests(self, employee_id, archive=None):
+        """Get all requests for a specific employee; with archive, archived ones
+        (marked 'archived') follow, read only from the months that hold theirs"""
         employee_requests = []
         # Get shift change requests for this employee
         employee_requests.extend([r for r in self.requests['shift_change_requests'] if r['employee_id'] == employee_id])
         # Get swap requests where this employee is requester or target
         employee_requests.extend([r for r in self.requests['swap_requests'] if r['requester_id'] == employee_id or r['target_employee_id'] == employee_id])
+        if archive is not None:
+            for month in sorted(self.requests['archived_months'].get(employee_id, []), reverse=True):
+                employee_requests.extend(dict(r, archived=True)
+                                         for r in self.get_archived_requests(archive, month, employee_id))
         return employee_requests
     
     def get_team_members(self, team_name, current_employee_id, date, admin_data):
         """Get team members for swap requests"""
         team_members = []
         if team_name in admin_data.get('teams', {}):
+            # Same date for every teammate, so look it up once
+            headers = admin_data.get('headers', [])
+            date_index = headers.index(date) if date in headers else -1
             for employee in admin_data['teams'][team_name]:
                 if employee['id'] != current_employee_id:  # Exclude self
                     # Get shift for the specific date
-                    date_index = admin_data['headers'].index(date) if date in admin_data['headers'] else -1
                     shift = employee['schedule'][date_index] if date_index != -1 and date_index < len(employee['schedule']) else ''
                     
                     team_members.append({
@@ -167,19 +303,7 @@ class ScheduleRequests:
     
     def get_shift_display(self, shift_code):
         """Get human-readable shift display"""
-        shift_map = {
-            "M2": "8 AM – 5 PM",
-            "M3": "9 AM – 6 PM",
-            "M4": "10 AM – 7 PM",
-            "D1": "12 PM – 9 PM",
-            "D2": "1 PM – 10 PM",
-            "DO": "OFF",
-            "SL": "Sick Leave",
-            "CL": "Casual Leave",
-            "EL": "Emergency Leave",
-            "": "N/A"
-        }
-        return shift_map.get(shift_code, shift_code)
+        return SHIFT_CATALOG.display(shift_code)
 
 # Global instance
 SCHEDULE_REQUESTS = ScheduleRequests()
\ No newline at end of file
@@ -0,0 +1,129 @@
+# shift_catalog.py - Configurable shift codes with labels, times and categories
+#
+# data/shift_catalog.json holds a list of shifts:
+#
+#   [{"code": "M2", "label": "8 AM – 5 PM", "start": "08:00", "end": "17:00", "category": "day"}, ...]
+#
+# Categories: day, night (working shifts), off, leave, unassigned. Hours are
+# derived from start/end, wrapping past midnight when end <= start, unless a
+# shift sets "hours" explicitly. Codes that are not in the catalog display as
+# themselves and count as zero-hour working days.
+import json
+import logging
+import os
+import threading
+
+logger = logging.getLogger(__name__)
+
+SHIFT_CATALOG_FILE = 'data/shift_catalog.json'
+
+CATEGORIES = ('day', 'night', 'off', 'leave', 'unassigned')
+WORK_CATEGORIES = ('day', 'night')
+UNKNOWN_CATEGORY = 'day'
+
+DEFAULT_SHIFTS = [
+    {'code': 'M2', 'label': '8 AM – 5 PM', 'start': '08:00', 'end': '17:00', 'category': 'day'},
+    {'code': 'M3', 'label': '9 AM – 6 PM', 'start': '09:00', 'end': '18:00', 'category': 'day'},
+    {'code': 'M4', 'label': '10 AM – 7 PM', 'start': '10:00', 'end': '19:00', 'category': 'day'},
+    {'code': 'D1', 'label': '12 PM – 9 PM', 'start': '12:00', 'end': '21:00', 'category': 'day'},
+    {'code': 'D2', 'label': '1 PM – 10 PM', 'start': '13:00', 'end': '22:00', 'category': 'day'},
+    {'code': 'DO', 'label': 'OFF', 'category': 'off'},
+    {'code': 'SL', 'label': 'Sick Leave', 'category': 'leave'},
+    {'code': 'CL', 'label': 'Casual Leave', 'category': 'leave'},
+    {'code': 'EL', 'label': 'Emergency Leave', 'category': 'leave'},
+    {'code': '', 'label': 'N/A', 'category': 'unassigned'}
+]
+
+def parse_time(value, field, code):
+    """'HH:MM' -> minutes after midnight"""
+    try:
+        hours, minutes = str(value).split(':')
+        hours, minutes = int(hours), int(minutes)
+    except ValueError:
+        raise ValueError(f"{field} of {code or 'N/A'} must be HH:MM, got '{value}'")
+    if not (0 <= hours < 24 and 0 <= minutes < 60):
+        raise ValueError(f"{field} of {code or 'N/A'} is out of range: '{value}'")
+    return hours * 60 + minutes
+
+def clean_shift(shift):
+    """Validate one catalog entry and fill in its hours"""
+    code = str(shift.get('code', '')).strip()
+    category = shift.get('category') or UNKNOWN_CATEGORY
+    if category not in CATEGORIES:
+        raise ValueError(f"Unknown category '{category}' for {code or 'N/A'}")
+
+    cleaned = {'code': code, 'label': shift.get('label') or code, 'category': category}
+    if shift.get('start') or shift.get('end'):
+        if not (shift.get('start') and shift.get('end')):
+            raise ValueError(f"{code or 'N/A'} needs both start and end")
+        start = parse_time(shift['start'], 'start', code)
+        end = parse_time(shift['end'], 'end', code)
+        cleaned['start'] = shift['start']
+        cleaned['end'] = shift['end']
+        cleaned['hours'] = round(((end - start) % (24 * 60) or 24 * 60) / 60, 2)
+    if shift.get('hours') is not None:
+        cleaned['hours'] = float(shift['hours'])
+        if cleaned['hours'] < 0:
+            raise ValueError(f"hours of {code or 'N/A'} must not be negative")
+    cleaned.setdefault('hours', 0.0)
+    return cleaned
+
+class ShiftCatalog:
+    def __init__(self, file_path=SHIFT_CATALOG_FILE):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.version = 0
+        self.shifts = {}
+        self.set_shifts(DEFAULT_SHIFTS)
+        self.load()
+
+    def load(self):
+        """Load the catalog from file, keeping the defaults if there is none"""
+        try:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, 'r', encoding='utf-8') as f:
+                    self.set_shifts(json.load(f))
+        except Exception:
+            logger.exception("Error loading shift catalog", extra={'file': self.file_path})
+
+    def set_shifts(self, shifts):
+        cleaned = {}
+        for shift in shifts:
+            shift = clean_shift(shift)
+            if shift['code'] in cleaned:
+                raise ValueError(f"Duplicate shift code '{shift['code']}'")
+            cleaned[shift['code']] = shift
+        with self.lock:
+            self.shifts = cleaned
+            self.version += 1
+        return cleaned
+
+    def save(self, shifts):
+        """Validate, apply and save a new list of shifts"""
+        cleaned = self.set_shifts(shifts)
+        os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+        with open(self.file_path, 'w', encoding='utf-8') as f:
+            json.dump(list(cleaned.values()), f, indent=2, ensure_ascii=False)
+        return self.to_list()
+
+    def to_list(self):
+        return list(self.shifts.values())
+
+    def get(self, shift_code):
+        return self.shifts.get(shift_code)
+
+    def display(self, shift_code):
+        """Get human-readable shift display"""
+        shift = self.shifts.get(shift_code)
+        return shift['label'] if shift else shift_code
+
+    def category(self, shift_code):
+        shift = self.shifts.get(shift_code)
+        return shift['category'] if shift else UNKNOWN_CATEGORY
+
+    def hours(self, shift_code):
+        shift = self.shifts.get(shift_code)
+        return shift['hours'] if shift else 0.0
+
+# Global instance
+SHIFT_CATALOG = ShiftCatalog()
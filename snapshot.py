@@ -0,0 +1,103 @@
+# snapshot.py - Compact binary snapshots of roster data files
+#
+# A snapshot is a short header followed by a pickle (protocol 5) payload:
+#
+#   b'RSNAP' | format version (1 byte) | pickle payload
+#
+# Rosters are stored without their derived 'allEmployees' list and with shift
+# codes interned, so every repeated code is written once. Snapshots sit next
+# to the JSON file they mirror (google_data.json -> google_data.snap) and are
+# only trusted while they are at least as new as that JSON file.
+import logging
+import os
+import pickle
+import sys
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_MAGIC = b'RSNAP'
+SNAPSHOT_VERSION = 1
+SNAPSHOT_EXTENSION = '.snap'
+
+class SnapshotError(Exception):
+    pass
+
+def snapshot_path(json_path):
+    """Get the snapshot file that mirrors a JSON data file"""
+    return os.path.splitext(json_path)[0] + SNAPSHOT_EXTENSION
+
+def write_snapshot(path, data):
+    """Atomically write data as a versioned snapshot"""
+    payload = pickle.dumps(data, protocol=5)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(SNAPSHOT_MAGIC)
+        f.write(bytes([SNAPSHOT_VERSION]))
+        f.write(payload)
+    os.replace(tmp_path, path)
+
+def read_snapshot(path):
+    """Read a snapshot written by write_snapshot"""
+    with open(path, 'rb') as f:
+        blob = f.read()
+    header_size = len(SNAPSHOT_MAGIC) + 1
+    if blob[:len(SNAPSHOT_MAGIC)] != SNAPSHOT_MAGIC:
+        raise SnapshotError(f"{path} is not a roster snapshot")
+    version = blob[len(SNAPSHOT_MAGIC)]
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"{path} has snapshot version {version}, expected {SNAPSHOT_VERSION}")
+    return pickle.loads(memoryview(blob)[header_size:])
+
+def pack_roster(data):
+    """Drop derived fields and intern shift codes before snapshotting a roster"""
+    if not isinstance(data, dict) or 'teams' not in data:
+        return data
+    packed = {key: value for key, value in data.items() if key != 'allEmployees'}
+    packed['teams'] = {
+        team_name: [
+            dict(employee, schedule=[sys.intern(shift) for shift in employee.get('schedule', [])])
+            for employee in employees
+        ]
+        for team_name, employees in data['teams'].items()
+    }
+    return packed
+
+def unpack_roster(data):
+    """Rebuild the allEmployees list of a snapshotted roster"""
+    if not isinstance(data, dict) or 'teams' not in data:
+        return data
+    data['allEmployees'] = [employee for employees in data['teams'].values() for employee in employees]
+    return data
+
+def load_data_file(json_path, load_json, roster=True):
+    """Load a data file from its snapshot when fresh, otherwise from JSON
+
+    load_json(path) does the JSON read. A snapshot is written after a JSON
+    load so the next cold start can skip JSON parsing. Pass roster=False for
+    files that are not teams/headers/allEmployees rosters. Returns None when
+    neither file exists.
+    """
+    pack = pack_roster if roster else (lambda data: data)
+    unpack = unpack_roster if roster else (lambda data: data)
+    snap_path = snapshot_path(json_path)
+    json_exists = os.path.exists(json_path)
+
+    if os.path.exists(snap_path) and (not json_exists or os.path.getmtime(snap_path) >= os.path.getmtime(json_path)):
+        try:
+            return unpack(read_snapshot(snap_path))
+        except Exception:
+            logger.warning("Ignoring unreadable snapshot", extra={'file': snap_path}, exc_info=True)
+
+    if not json_exists:
+        return None
+
+    data = load_json(json_path)
+    try:
+        write_snapshot(snap_path, pack(data))
+    except Exception:
+        logger.warning("Could not write snapshot", extra={'file': snap_path}, exc_info=True)
+    return data
+
+def save_snapshot_file(json_path, data, roster=True):
+    """Write the snapshot that mirrors a JSON data file"""
+    write_snapshot(snapshot_path(json_path), pack_roster(data) if roster else data)
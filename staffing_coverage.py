@@ -0,0 +1,239 @@
+# staffing_coverage.py - Headcount per date x team x shift, computed with NumPy
+#
+# The roster is turned into an (employees x dates) array of shift code
+# indexes once, and a single bincount produces the whole
+# (teams x dates x shift codes) count cube. The cube is cached until the
+# roster version changes (every update_display_data bumps it).
+#
+# Staffing targets live in data/staffing_targets.json:
+#
+#   {
+#     "default": {"M2": {"min": 2}, "D1": {"min": 1, "max": 6}},
+#     "teams": {"VOICE": {"M2": {"min": 4}}},
+#     "overrides": [
+#       {"weekdays": ["Sat", "Sun"], "shifts": {"M2": {"min": 1}}},
+#       {"dates": ["2025-12-25"], "team": "VOICE", "shifts": {"M2": {"max": 2}}}
+#     ]
+#   }
+#
+# Team targets override the default target of the same shift. Overrides
+# replace a shift's target on some days, by weekday or by ISO date, for every
+# team or just one; a date rule beats a weekday rule, a team rule beats an
+# all-teams rule of the same kind, and a later rule beats an earlier one.
+import calendar
+import json
+import logging
+import os
+import re
+import threading
+from datetime import date
+
+import numpy as np
+
+from metrics import METRICS
+from roster_store import parse_month_key
+
+logger = logging.getLogger(__name__)
+
+STAFFING_TARGETS_FILE = 'data/staffing_targets.json'
+WEEKDAYS = [calendar.day_abbr[i] for i in range(7)]   # Mon ... Sun
+
+def header_date(header, month_key):
+    """Calendar date of a header like '3Oct' in its month partition, or None"""
+    parsed = parse_month_key(month_key(header))
+    day = re.match(r'\s*(\d{1,2})', header or '')
+    if not parsed or not day:
+        return None
+    try:
+        return date(parsed[0], parsed[1], int(day.group(1)))
+    except ValueError:
+        return None
+
+def clean_shift_targets(shifts):
+    """Validate {shift: {'min', 'max'}} targets"""
+    cleaned = {}
+    for shift, bounds in (shifts or {}).items():
+        entry = {}
+        for bound in ('min', 'max'):
+            if bounds.get(bound) is not None:
+                value = int(bounds[bound])
+                if value < 0:
+                    raise ValueError(f"{bound} for {shift} must not be negative")
+                entry[bound] = value
+        if 'min' in entry and 'max' in entry and entry['min'] > entry['max']:
+            raise ValueError(f"min is above max for {shift}")
+        cleaned[shift] = entry
+    return cleaned
+
+def clean_override(rule):
+    """Validate one {'weekdays' | 'dates', 'team'?, 'shifts'} override"""
+    if ('weekdays' in rule) == ('dates' in rule):
+        raise ValueError("An override needs either weekdays or dates")
+    cleaned = {}
+    if 'weekdays' in rule:
+        unknown = [day for day in rule['weekdays'] if day not in WEEKDAYS]
+        if unknown:
+            raise ValueError(f"Unknown weekdays {unknown}, expected {', '.join(WEEKDAYS)}")
+        cleaned['weekdays'] = list(rule['weekdays'])
+    else:
+        cleaned['dates'] = [date.fromisoformat(day).isoformat() for day in rule['dates']]
+    if rule.get('team'):
+        cleaned['team'] = rule['team']
+    cleaned['shifts'] = clean_shift_targets(rule.get('shifts'))
+    return cleaned
+
+def schedule_matrix(employees, date_count):
+    """Encode schedules as an (employees x dates) array of shift code indexes"""
+    code_index = {'': 0}
+    rows = np.zeros((len(employees), date_count), dtype=np.int32)
+    for row, employee in enumerate(employees):
+        schedule = employee.get('schedule', [])[:date_count]
+        for shift in set(schedule).difference(code_index):
+            code_index[shift] = len(code_index)
+        rows[row, :len(schedule)] = [code_index[shift] for shift in schedule]
+    return rows, list(code_index)
+
+class CoverageCube:
+    """Headcounts indexed by [team, date, shift code]"""
+    def __init__(self, teams, headers, codes, counts):
+        self.teams = teams
+        self.headers = headers
+        self.codes = codes
+        self.counts = counts
+
+    @classmethod
+    def build(cls, data):
+        teams = list(data.get('teams', {}))
+        headers = list(data.get('headers', []))
+        employees = []
+        team_of_employee = []
+        for team_index, team_name in enumerate(teams):
+            for employee in data['teams'][team_name]:
+                employees.append(employee)
+                team_of_employee.append(team_index)
+
+        matrix, codes = schedule_matrix(employees, len(headers))
+        team_ids = np.asarray(team_of_employee, dtype=np.int64)[:, None]
+        date_ids = np.arange(len(headers), dtype=np.int64)[None, :]
+        # One flat key per (team, date, code) cell, counted in a single pass
+        keys = (team_ids * len(headers) + date_ids) * len(codes) + matrix
+        counts = np.bincount(keys.ravel(), minlength=len(teams) * len(headers) * len(codes))
+        return cls(teams, headers, codes, counts.reshape(len(teams), len(headers), len(codes)))
+
+class CoverageEngine:
+    def __init__(self, targets_file=STAFFING_TARGETS_FILE):
+        self.targets_file = targets_file
+        self.lock = threading.Lock()
+        self.cube = None
+        self.version = None
+        self.targets = {'default': {}, 'teams': {}, 'overrides': []}
+        self.load_targets()
+
+    def load_targets(self):
+        """Load staffing targets from file"""
+        try:
+            if os.path.exists(self.targets_file):
+                with open(self.targets_file, 'r', encoding='utf-8') as f:
+                    targets = json.load(f)
+                self.targets = {'default': targets.get('default', {}), 'teams': targets.get('teams', {}),
+                                'overrides': targets.get('overrides', [])}
+        except Exception:
+            logger.exception("Error loading staffing targets", extra={'file': self.targets_file})
+
+    def save_targets(self, targets):
+        """Validate and save staffing targets"""
+        cleaned = {
+            'default': clean_shift_targets(targets.get('default', {})),
+            'teams': {team_name: clean_shift_targets(shifts) for team_name, shifts in targets.get('teams', {}).items()},
+            'overrides': [clean_override(rule) for rule in targets.get('overrides', [])]
+        }
+
+        os.makedirs(os.path.dirname(self.targets_file), exist_ok=True)
+        with open(self.targets_file, 'w', encoding='utf-8') as f:
+            json.dump(cleaned, f, indent=2, ensure_ascii=False)
+        self.targets = cleaned
+        return cleaned
+
+    def get_cube(self, data, version):
+        """Get the count cube for data, rebuilding it when version changed"""
+        with self.lock:
+            if self.cube is None or self.version != version:
+                with METRICS.timer('coverage_build'):
+                    self.cube = CoverageCube.build(data)
+                self.version = version
+            return self.cube
+
+    def target_for(self, team_name, shift):
+        return self.targets['teams'].get(team_name, {}).get(shift) or self.targets['default'].get(shift)
+
+    def target_grid(self, team_name, shifts, headers, month_key):
+        """(minimums, maximums) of a team as dates x shifts arrays, -1 where there is no bound"""
+        minimums = np.full((len(headers), len(shifts)), -1, dtype=np.int64)
+        maximums = np.full((len(headers), len(shifts)), -1, dtype=np.int64)
+        for s, shift in enumerate(shifts):
+            target = self.target_for(team_name, shift) or {}
+            minimums[:, s] = target.get('min', -1)
+            maximums[:, s] = target.get('max', -1)
+
+        # Least specific first, so more specific rules overwrite
+        rules = sorted((rule for rule in self.targets.get('overrides', []) if rule.get('team') in (None, team_name)),
+                       key=lambda rule: ('dates' in rule, 'team' in rule))
+        if not rules:
+            return minimums, maximums
+        for d, header in enumerate(headers):
+            day = header_date(header, month_key)
+            if day is None:
+                continue
+            iso, weekday = day.isoformat(), WEEKDAYS[day.weekday()]
+            for rule in rules:
+                if iso not in rule.get('dates', ()) and weekday not in rule.get('weekdays', ()):
+                    continue
+                for s, shift in enumerate(shifts):
+                    if shift in rule['shifts']:
+                        minimums[d, s] = rule['shifts'][shift].get('min', -1)
+                        maximums[d, s] = rule['shifts'][shift].get('max', -1)
+        return minimums, maximums
+
+    def report(self, data, version, teams=None, date_window=None, shifts=None, month_key=None):
+        """Counts per team/shift/date for the selected slice, with staffing flags
+
+        month_key dates the headers for weekday/date overrides; without it
+        only the per-shift targets apply.
+        """
+        cube = self.get_cube(data, version)
+        lo, hi = date_window or (0, len(cube.headers))
+        team_indexes = [i for i, team_name in enumerate(cube.teams) if not teams or team_name in teams]
+        code_indexes = [i for i, code in enumerate(cube.codes) if code and (not shifts or code in shifts)]
+
+        selected = cube.counts[team_indexes][:, lo:hi][:, :, code_indexes]
+        headers = cube.headers[lo:hi]
+        codes = [cube.codes[i] for i in code_indexes]
+
+        counts = {}
+        flags = []
+        for t, team_index in enumerate(team_indexes):
+            team_name = cube.teams[team_index]
+            counts[team_name] = {code: selected[t, :, c].tolist() for c, code in enumerate(codes)}
+            minimums, maximums = self.target_grid(team_name, codes, headers, month_key or (lambda header: None))
+            for c, code in enumerate(codes):
+                column = selected[t, :, c]
+                for d in np.flatnonzero((minimums[:, c] >= 0) & (column < minimums[:, c])).tolist():
+                    flags.append({'team': team_name, 'date': headers[d], 'shift': code,
+                                  'count': int(column[d]), 'target': int(minimums[d, c]), 'status': 'under'})
+                for d in np.flatnonzero((maximums[:, c] >= 0) & (column > maximums[:, c])).tolist():
+                    flags.append({'team': team_name, 'date': headers[d], 'shift': code,
+                                  'count': int(column[d]), 'target': int(maximums[d, c]), 'status': 'over'})
+
+        return {
+            'headers': headers,
+            'dateOffset': lo,
+            'teams': [cube.teams[i] for i in team_indexes],
+            'shifts': codes,
+            'counts': counts,
+            'totals': {code: selected[:, :, c].sum(axis=0).tolist() for c, code in enumerate(codes)},
+            'flags': flags,
+            'targets': self.targets
+        }
+
+# Global instance
+COVERAGE = CoverageEngine()
@@ -1,6 +1,7 @@
 // admin-schedule-requests.js - Admin schedule requests management
 const ADMIN_SCHEDULE_REQUESTS = {
     pendingRequests: [],
+    matches: [],
     stats: {},
     
     // Shift mapping for admin side
@@ -49,6 +50,13 @@ const ADMIN_SCHEDULE_REQUESTS = {
                 console.log('Reject button clicked for:', requestId);
                 this.updateRequestStatus(requestId, 'rejected');
             }
+            
+            // Approve a whole matched set
+            if (e.target.classList.contains('approve-match-btn')) {
+                const requestIds = e.target.dataset.requestIds.split(',');
+                console.log('Approve match clicked for:', requestIds);
+                this.approveMatch(requestIds);
+            }
         });
 
         // Filter change
@@ -86,6 +94,7 @@ const ADMIN_SCHEDULE_REQUESTS = {
                 console.log(`Loaded ${this.pendingRequests.length} pending requests`);
                 this.updateStatsDisplay();
                 this.renderRequestsList();
+                this.loadMatches();
             } else {
                 console.error('Error loading requests:', data.error);
                 this.showError('Failed to load requests: ' + data.error);
@@ -96,6 +105,82 @@ const ADMIN_SCHEDULE_REQUESTS = {
         }
     },
 
+    // Load sets of pending requests that can be approved together
+    async loadMatches() {
+        try {
+            const response = await fetch('/admin/api/schedule-requests/matches');
+            const data = await response.json();
+            this.matches = data.success ? data.matches : [];
+        } catch (error) {
+            console.error('Error loading request matches:', error);
+            this.matches = [];
+        }
+        this.renderMatches();
+    },
+
+    // Render matched sets above the requests list
+    renderMatches() {
+        const matchesList = document.getElementById('requestMatchesList');
+        if (!matchesList) return;
+
+        matchesList.innerHTML = this.matches.map(match => `
+            <div class="request-item">
+                <div class="request-header">
+                    <div class="request-type swap">🔗 Matched Set (${match.length} requests)</div>
+                    <div class="request-date">Date: ${match.date}</div>
+                </div>
+                <div class="request-details">
+                    ${match.moves.map(move => `
+                        <div class="shift-from-to">
+                            <strong>${move.employeeName} (${move.employeeId}):</strong>
+                            <span class="shift-from">${this.getShiftDisplay(move.from)}</span>
+                            <span class="shift-arrow">→</span>
+                            <span class="shift-to">${this.getShiftDisplay(move.to)}</span>
+                        </div>
+                    `).join('')}
+                </div>
+                <div class="request-actions">
+                    <button class="action-btn success approve-match-btn" data-request-ids="${match.requestIds.join(',')}">
+                        ✅ Approve All
+                    </button>
+                </div>
+            </div>
+        `).join('');
+    },
+
+    // Approve every request of a matched set in one action
+    async approveMatch(requestIds) {
+        if (!confirm(`Approve all ${requestIds.length} requests of this set?`)) {
+            return;
+        }
+
+        try {
+            const response = await fetch('/admin/api/schedule-requests/approve-match', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/json',
+                },
+                body: JSON.stringify({ requestIds: requestIds })
+            });
+
+            const data = await response.json();
+
+            if (data.success) {
+                alert(`${requestIds.length} requests approved successfully!`);
+                this.loadPendingRequests();
+                
+                if (typeof ADMIN !== 'undefined' && ADMIN.loadDataStats) {
+                    ADMIN.loadDataStats();
+                }
+            } else {
+                alert('Error approving matched requests: ' + data.error);
+            }
+        } catch (error) {
+            console.error('Error approving matched requests:', error);
+            alert('Error approving matched requests. Please try again.');
+        }
+    },
+
     // Update statistics display
     updateStatsDisplay() {
         console.log('Updating stats display:', this.stats);
@@ -23,6 +23,7 @@ const ADMIN = {
     // Initialize admin panel
     init() {
         this.loadAutoSyncSetting();
+        this.loadShiftCatalog();
         this.initLogin();
         this.initNavigation();
         this.initDataSync();
@@ -32,6 +33,7 @@ const ADMIN = {
         this.initAdminData();
         this.initCSVImport();
         this.initModifiedShifts();
+        this.loadSyncTraces();
         this.loadDataStats();
         this.updateMonthDisplay();
         this.startAutoSyncIfEnabled();
@@ -268,6 +270,19 @@ handleNavigation(btn) {
         return this.shiftMap[shiftCode] || shiftCode;
     },
 
+    // Load shift labels from the server's shift catalog
+    async loadShiftCatalog() {
+        try {
+            const response = await fetch('/api/shift-catalog');
+            const result = await response.json();
+            if (result.success) {
+                this.shiftMap = Object.fromEntries(result.shifts.map(shift => [shift.code, shift.label]));
+            }
+        } catch (error) {
+            console.warn('Could not load shift catalog, using default labels:', error);
+        }
+    },
+
     // Initialize data sync functionality
     initDataSync() {
         const syncBtn = document.getElementById('syncGoogleSheets');
@@ -286,6 +301,9 @@ handleNavigation(btn) {
             resetBtn.addEventListener('click', () => this.resetToGoogle());
         }
         
+        document.getElementById('undoAdminChange')?.addEventListener('click', () => this.stepAdminHistory('undo'));
+        document.getElementById('redoAdminChange')?.addEventListener('click', () => this.stepAdminHistory('redo'));
+        
         if (autoSyncToggle) {
             autoSyncToggle.addEventListener('change', (e) => {
                 if (e.target.checked) {
@@ -331,11 +349,12 @@ handleNavigation(btn) {
             const result = await response.json();
             
             if (result.success) {
-                this.showSyncMessage(result.message, 'success');
+                this.showSyncMessage(`${result.message}${this.describeSyncMerge(result.merge)}`, 'success');
                 this.updateDataStatus();
                 this.loadDataStats();
                 this.loadModifiedShiftsStats();
                 this.loadGoogleLinks();
+                this.loadSyncTraces();
                 
                 if (document.querySelector('#google-data').classList.contains('active')) {
                     this.loadGoogleData();
@@ -345,6 +364,7 @@ handleNavigation(btn) {
                 }
             } else {
                 this.showSyncMessage(result.error, 'error');
+                this.loadSyncTraces();
             }
         } catch (error) {
             console.error('Sync error:', error);
@@ -355,9 +375,45 @@ handleNavigation(btn) {
         }
     },
 
+    // Undo or redo the latest admin edit
+    async stepAdminHistory(direction) {
+        try {
+            const response = await fetch(`/admin/api/${direction}`, { method: 'POST' });
+            const result = await response.json();
+            
+            if (result.success) {
+                this.showSyncMessage(result.message, 'success');
+                this.modifiedShifts.clear();
+                this.updateDataStatus();
+                this.loadDataStats();
+                this.loadAdminData();
+            } else {
+                this.showSyncMessage(result.error, 'error');
+            }
+        } catch (error) {
+            console.error(`${direction} error:`, error);
+            this.showSyncMessage(`${direction === 'undo' ? 'Undo' : 'Redo'} failed. Please try again.`, 'error');
+        }
+    },
+
+    // Short description of what a sync changed, e.g. " (2 new employees, 31 new dates)"
+    describeSyncMerge(merge) {
+        if (!merge) return '';
+        const counts = merge.counts;
+        const parts = [
+            [counts.newEmployees, 'new employee', 'new employees'],
+            [counts.removedEmployees, 'employee removed', 'employees removed'],
+            [counts.movedEmployees, 'team move', 'team moves'],
+            [counts.headersAdded, 'new date', 'new dates'],
+            [counts.changedCells, 'changed shift', 'changed shifts'],
+            [merge.overlay.cells, 'admin override kept', 'admin overrides kept']
+        ].filter(([count]) => count > 0).map(([count, one, many]) => `${count} ${count === 1 ? one : many}`);
+        return parts.length ? ` (${parts.join(', ')})` : '';
+    },
+
     // Reset to Google data
     async resetToGoogle() {
-        if (!confirm('Are you sure you want to reset all admin modifications? This cannot be undone.')) {
+        if (!confirm('Are you sure you want to reset all admin modifications? You can undo this afterwards.')) {
             return;
         }
         
@@ -417,17 +473,21 @@ handleNavigation(btn) {
         }, 3000);
     },
 
+    // Fetch a roster endpoint in the compact wire format and decode it
+    async fetchRoster(url) {
+        const response = await fetch(`${url}?format=compact`);
+        const data = await response.json();
+        return { response, data: response.ok ? WIRE_FORMAT.decodeRoster(data) : data };
+    },
+
     // Update data status display
     async updateDataStatus() {
         try {
-            const [googleResponse, adminResponse] = await Promise.all([
-                fetch('/admin/api/get-google-data'),
-                fetch('/admin/api/get-admin-data')
+            const [{ data: googleData }, { data: adminData }] = await Promise.all([
+                this.fetchRoster('/admin/api/get-google-data'),
+                this.fetchRoster('/admin/api/get-admin-data')
             ]);
             
-            const googleData = await googleResponse.json();
-            const adminData = await adminResponse.json();
-            
             const googleStatus = document.getElementById('googleDataStatus');
             const adminStatus = document.getElementById('adminDataStatus');
             
@@ -450,8 +510,7 @@ handleNavigation(btn) {
     // Load data statistics
     async loadDataStats() {
         try {
-            const response = await fetch('/admin/api/get-display-data');
-            const data = await response.json();
+            const { response, data } = await this.fetchRoster('/admin/api/get-display-data');
             
             if (response.ok) {
                 const totalEmployees = data.allEmployees?.length || 0;
@@ -472,36 +531,22 @@ handleNavigation(btn) {
         this.updateDataStatus();
     },
 
+    // Fetch the server-side diff of admin data against Google data
+    async fetchRosterDiff() {
+        const response = await fetch('/admin/api/roster-diff');
+        const result = await response.json();
+        if (!response.ok || !result.success) {
+            throw new Error(result.error || 'Failed to load roster diff');
+        }
+        return result;
+    },
+
     // Calculate modified shifts count
     async calculateModifiedShifts() {
         try {
-            const [googleResponse, adminResponse] = await Promise.all([
-                fetch('/admin/api/get-google-data'),
-                fetch('/admin/api/get-admin-data')
-            ]);
-            
-            const googleData = await googleResponse.json();
-            const adminData = await adminResponse.json();
-            
-            let modifiedCount = 0;
-            
-            for (const teamName in adminData.teams) {
-                if (googleData.teams[teamName]) {
-                    for (const adminEmployee of adminData.teams[teamName]) {
-                        const googleEmployee = googleData.teams[teamName].find(emp => emp.id === adminEmployee.id);
-                        if (googleEmployee) {
-                            for (let i = 0; i < adminEmployee.schedule.length; i++) {
-                                if (adminEmployee.schedule[i] !== googleEmployee.schedule[i] && 
-                                    adminEmployee.schedule[i] !== '') {
-                                    modifiedCount++;
-                                }
-                            }
-                        }
-                    }
-                }
-            }
-            
-            return modifiedCount;
+            const diff = await this.fetchRosterDiff();
+            // changed cells are [employeeId, dateIndex, googleShift, adminShift]
+            return diff.changed.filter(cell => cell[3] !== '').length;
         } catch (error) {
             console.error('Error calculating modified shifts:', error);
             return 0;
@@ -783,8 +828,7 @@ handleNavigation(btn) {
     // Load teams and employees
     async loadTeamsAndEmployees() {
         try {
-            const response = await fetch('/admin/api/get-admin-data');
-            const data = await response.json();
+            const { response, data } = await this.fetchRoster('/admin/api/get-admin-data');
             
             if (response.ok) {
                 this.currentTeams = data.teams;
@@ -1033,8 +1077,7 @@ handleNavigation(btn) {
     // Edit employee
     async editEmployee(employeeId) {
         try {
-            const response = await fetch('/admin/api/get-admin-data');
-            const data = await response.json();
+            const { response, data } = await this.fetchRoster('/admin/api/get-admin-data');
             
             if (response.ok) {
                 for (const [teamName, employees] of Object.entries(data.teams)) {
@@ -1164,8 +1207,7 @@ handleNavigation(btn) {
         if (tableBody) tableBody.innerHTML = '';
         
         try {
-            const response = await fetch('/admin/api/get-google-data');
-            const data = await response.json();
+            const { response, data } = await this.fetchRoster('/admin/api/get-google-data');
             
             if (response.ok) {
                 this.currentGoogleData = data;
@@ -1320,19 +1362,16 @@ handleNavigation(btn) {
         if (tableBody) tableBody.innerHTML = '';
         
         try {
-            const [adminResponse, googleResponse] = await Promise.all([
-                fetch('/admin/api/get-admin-data'),
-                fetch('/admin/api/get-google-data')
+            const [{ response: adminResponse, data: adminData }, diff] = await Promise.all([
+                this.fetchRoster('/admin/api/get-admin-data'),
+                this.fetchRosterDiff()
             ]);
             
-            const adminData = await adminResponse.json();
-            const googleData = await googleResponse.json();
-            
-            if (adminResponse.ok && googleResponse.ok) {
-                this.populateAdminTable(adminData, googleData);
+            if (adminResponse.ok) {
+                this.populateAdminTable(adminData, diff);
                 this.populateAdminFilters(adminData);
             } else {
-                throw new Error('Failed to load admin or Google data');
+                throw new Error('Failed to load admin data');
             }
         } catch (error) {
             console.error('Error loading admin data:', error);
@@ -1351,7 +1390,7 @@ handleNavigation(btn) {
     },
 
     // Populate Admin data table
-    populateAdminTable(adminData, googleData) {
+    populateAdminTable(adminData, diff) {
         const tableHead = document.querySelector('#adminRosterTable thead tr');
         const tableBody = document.querySelector('#adminRosterTable tbody');
         
@@ -1362,6 +1401,10 @@ handleNavigation(btn) {
         
         const monthDates = this.getCurrentMonthDates(adminData.headers);
         
+        // Google's shift for every cell the diff reports; other cells match Google
+        const googleShifts = new Map(diff.changed.map(([id, dateIndex, googleShift]) => [`${id}-${dateIndex}`, googleShift]));
+        const notInGoogle = new Set(diff.added.map(employee => employee.id));
+        
         monthDates.forEach((header, index) => {
             const th = document.createElement('th');
             th.className = 'date-header';
@@ -1379,12 +1422,12 @@ handleNavigation(btn) {
                     <td>${teamName}</td>
                 `;
                 
-                const googleEmployee = googleData.teams[teamName]?.find(emp => emp.id === employee.id);
-                
                 monthDates.forEach(header => {
                     const dateIndex = adminData.headers.indexOf(header);
                     const adminShift = employee.schedule[dateIndex] || '';
-                    const googleShift = googleEmployee?.schedule[dateIndex] || '';
+                    const cellKey = `${employee.id}-${dateIndex}`;
+                    const googleShift = notInGoogle.has(employee.id) ? ''
+                        : googleShifts.has(cellKey) ? googleShifts.get(cellKey) : adminShift;
                     
                     const cell = document.createElement('td');
                     cell.className = `shift-cell editable shift-${adminShift}`;
@@ -1395,7 +1438,7 @@ handleNavigation(btn) {
                     
                     if (adminShift !== googleShift && adminShift !== '') {
                         cell.classList.add('modified');
-                        this.modifiedShifts.add(`${employee.id}-${dateIndex}`);
+                        this.modifiedShifts.add(cellKey);
                     }
                     
                     const shiftMeaning = this.getShiftMeaning(adminShift);
@@ -1504,7 +1547,7 @@ handleNavigation(btn) {
             }
             
             option.addEventListener('click', () => {
-                this.updateShift(employeeId, dateIndex, shift, source, googleShift);
+                this.updateShift(employeeId, dateIndex, shift, source);
                 dropdown.remove();
                 this.activeShiftDropdown = null;
                 
@@ -1556,7 +1599,7 @@ handleNavigation(btn) {
     },
 
     // Update shift
-    async updateShift(employeeId, dateIndex, newShift, source, googleShift) {
+    async updateShift(employeeId, dateIndex, newShift, source) {
         try {
             const response = await fetch('/admin/api/update-shift', {
                 method: 'POST',
@@ -1567,8 +1610,7 @@ handleNavigation(btn) {
                     employeeId: employeeId,
                     dateIndex: dateIndex,
                     newShift: newShift,
-                    source: source,
-                    googleShift: googleShift
+                    source: source
                 })
             });
             
@@ -1831,6 +1873,69 @@ handleNavigation(btn) {
         if (details) {
             details.style.display = details.style.display === 'none' ? 'block' : 'none';
         }
+    },
+
+    // Load recent sync traces
+    async loadSyncTraces() {
+        try {
+            const response = await fetch('/admin/api/sync-traces?limit=10');
+            const data = await response.json();
+            
+            if (response.ok && data.success) {
+                this.updateSyncTracesList(data.traces);
+            }
+        } catch (error) {
+            console.error('Error loading sync traces:', error);
+        }
+    },
+
+    // Render sync traces with per-phase and per-sheet timings
+    updateSyncTracesList(traces) {
+        const tracesList = document.getElementById('syncTracesList');
+        if (!tracesList) return;
+        
+        if (traces.length === 0) {
+            tracesList.innerHTML = '<div class="no-modifications">No syncs recorded yet</div>';
+            return;
+        }
+        
+        const formatBytes = (bytes) => bytes >= 1024 ? `${(bytes / 1024).toFixed(1)} KB` : `${bytes} B`;
+        
+        tracesList.innerHTML = traces.map(trace => {
+            const slowest = Math.max(...trace.phases.map(phase => phase.ms), 1);
+            const counters = Object.entries(trace.counters || {})
+                .map(([name, value]) => `${name.replace(/_/g, ' ')}: ${value}`)
+                .join(' • ');
+            
+            return `
+                <div class="sync-trace-item ${trace.status}">
+                    <div class="sync-trace-header">
+                        <span class="sync-trace-time">${new Date(trace.started_at).toLocaleString()}</span>
+                        <span class="sync-trace-status">${trace.status}</span>
+                        <span class="sync-trace-total">${trace.total_ms.toFixed(0)} ms</span>
+                    </div>
+                    ${trace.error ? `<div class="sync-trace-error">${trace.error}</div>` : ''}
+                    <div class="sync-trace-counters">${counters}${trace.triggered_by ? ` • by ${trace.triggered_by}` : ''}</div>
+                    <div class="sync-trace-phases">
+                        ${trace.phases.map(phase => `
+                            <div class="sync-trace-phase">
+                                <span class="sync-trace-phase-name">${phase.name}</span>
+                                <span class="sync-trace-phase-bar" style="width: ${Math.max(2, phase.ms / slowest * 100)}%"></span>
+                                <span class="sync-trace-phase-ms">${phase.ms.toFixed(1)} ms</span>
+                            </div>
+                        `).join('')}
+                    </div>
+                    <div class="sync-trace-fetches">
+                        ${trace.fetches.map(fetchInfo => `
+                            <div class="sync-trace-fetch ${fetchInfo.ok ? '' : 'failed'}" title="${fetchInfo.url}">
+                                ${fetchInfo.ok ? '✅' : '❌'} ${fetchInfo.ms.toFixed(0)} ms • ${formatBytes(fetchInfo.bytes)}
+                                ${fetchInfo.error ? ` • ${fetchInfo.error}` : ''}
+                            </div>
+                        `).join('')}
+                    </div>
+                </div>
+            `;
+        }).join('');
     }
 };
 
@@ -5,6 +5,7 @@ const DASHBOARD = {
     shiftChanges: [],
     upcomingShifts: [],
     timeOff: [],
+    monthSummary: null,
 
     async init(employeeId) {
         this.currentEmployeeId = employeeId;
@@ -38,7 +39,8 @@ const DASHBOARD = {
                 this.loadHolidays(),
                 this.loadShiftChanges(),
                 this.loadUpcomingShifts(),
-                this.loadTimeOff()
+                this.loadTimeOff(),
+                this.loadMonthSummary()
             ]);
         } catch (error) {
             console.error('Error loading dashboard data:', error);
@@ -200,11 +202,29 @@ const DASHBOARD = {
         }
     },
 
+    // Counters for the current month, maintained by the server
+    async loadMonthSummary() {
+        try {
+            if (!this.currentEmployeeId) return;
+
+            const month = this.monthKey(new Date());
+            const response = await fetch(`/api/employees/${encodeURIComponent(this.currentEmployeeId)}/summary?months=${month}`);
+            if (response.ok) {
+                const data = await response.json();
+                this.monthSummary = data.months[month] || null;
+            }
+        } catch (error) {
+            console.error('Error loading month summary:', error);
+            this.monthSummary = null;
+        }
+    },
+
     updateDashboardDisplay() {
         this.updateHolidaysDisplay();
         this.updateShiftChangesDisplay();
         this.updateUpcomingShiftsDisplay();
         this.updateTimeOffDisplay();
+        this.updateMonthSummaryDisplay();
     },
 
     updateHolidaysDisplay() {
@@ -289,6 +309,41 @@ const DASHBOARD = {
         }
     },
 
+    updateMonthSummaryDisplay() {
+        const countElement = document.getElementById('monthSummaryCount');
+        const listElement = document.getElementById('monthSummaryList');
+        const summary = this.monthSummary;
+        
+        if (countElement) countElement.textContent = summary ? summary.workDays : 0;
+        
+        if (listElement) {
+            if (summary) {
+                const rows = [
+                    ['Hours', summary.hours],
+                    ['Off days', summary.offDays],
+                    ['Leave days', summary.leaveDays],
+                    ...Object.entries(summary.shifts)
+                        .filter(([code]) => code)
+                        .sort((a, b) => b[1] - a[1])
+                        .map(([code, days]) => [UTILS.getShiftDisplay(code), days])
+                ];
+                listElement.innerHTML = rows.map(([label, value]) => `
+                    <div class="detail-item">
+                        <div class="detail-date">${label}</div>
+                        <div class="detail-shift">${value}</div>
+                    </div>
+                `).join('');
+            } else {
+                listElement.innerHTML = '<div class="empty-state">No schedule for this month</div>';
+            }
+        }
+    },
+
+    // Month partition key of a date, e.g. "Oct-2025"
+    monthKey(date) {
+        return `${date.toLocaleDateString('en-US', { month: 'short' })}-${date.getFullYear()}`;
+    },
+
     formatDateForHeader(date) {
         const day = date.getDate();
         const month = date.toLocaleDateString('en-US', { month: 'short' });
@@ -9,7 +9,7 @@ const MAIN = {
             this.showLoadingState();
             
             // Initial data load from admin panel
-            await SYNC.syncData();
+            await Promise.all([SYNC.syncData(), UTILS.loadShiftCatalog()]);
             
             // Initialize modules
             SEARCH.populateTeamDropdown();
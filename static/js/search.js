@@ -69,38 +69,43 @@ const SEARCH = {
     },
 
     // Handle search input
-    handleSearchInput(event) {
-        const searchTerm = event.target.value.toLowerCase().trim();
+    async handleSearchInput(event) {
+        const searchTerm = event.target.value.trim();
         const searchResults = document.getElementById('searchResults');
         
         if (!searchResults) return;
         
-        searchResults.innerHTML = '';
-        
         if (searchTerm.length < 2) {
+            searchResults.innerHTML = '';
             searchResults.style.display = 'none';
             return;
         }
         
-        // Filter employees by name or ID across ALL teams
-        const matches = [];
-        for (const team in DATA_LOADER.teamsData) {
-            DATA_LOADER.teamsData[team].forEach(emp => {
-                if ((emp.name.toLowerCase().includes(searchTerm) || 
-                     emp.id.toLowerCase().includes(searchTerm)) &&
-                    !matches.find(m => m.id === emp.id)) {
-                    matches.push(emp);
-                }
-            });
+        // Search names and IDs on the server instead of scanning the roster here
+        let matches = [];
+        try {
+            const response = await fetch(`/api/employees/search?q=${encodeURIComponent(searchTerm)}`);
+            const data = await response.json();
+            matches = data.success ? data.results : [];
+        } catch (error) {
+            console.error('Error searching employees:', error);
         }
         
+        // Ignore responses that arrive after the input has changed
+        if (event.target.value.trim() !== searchTerm) return;
+        
+        searchResults.innerHTML = '';
+        
         if (matches.length > 0) {
-            matches.forEach(emp => {
+            matches.forEach(match => {
                 const result = document.createElement('div');
                 result.className = 'search-result';
-                result.textContent = `${emp.name} (${emp.id}) - ${emp.currentTeam || 'Multiple Teams'}`;
-                result.addEventListener('click', () => {
-                    this.selectEmployeeFromSearch(emp);
+                result.textContent = `${match.name} (${match.id}) - ${match.team || 'Multiple Teams'}`;
+                result.addEventListener('click', async () => {
+                    const emp = await this.loadEmployee(match.id);
+                    if (emp) {
+                        this.selectEmployeeFromSearch(emp);
+                    }
                 });
                 searchResults.appendChild(result);
             });
@@ -110,6 +115,21 @@ const SEARCH = {
         }
     },
 
+    // Get a full employee record, fetching just that employee if it is not loaded yet
+    async loadEmployee(employeeId) {
+        const loaded = this.findEmployeeById(employeeId);
+        if (loaded) return loaded;
+        
+        try {
+            const response = await fetch(`/admin/api/get-display-data?format=compact&employees=${encodeURIComponent(employeeId)}`);
+            const data = WIRE_FORMAT.decodeRoster(await response.json());
+            return data.allEmployees?.[0] || null;
+        } catch (error) {
+            console.error('Error loading employee:', error);
+            return null;
+        }
+    },
+
     // Select employee from search results
     selectEmployeeFromSearch(employee) {
         MAIN.displayEmployeeInfo(employee);
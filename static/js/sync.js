@@ -39,8 +39,8 @@ const SYNC = {
         try {
             console.log('Syncing data from admin panel...');
             
-            const response = await fetch('/admin/api/get-display-data');
-            const data = await response.json();
+            const response = await fetch('/admin/api/get-display-data?format=compact');
+            const data = WIRE_FORMAT.decodeRoster(await response.json());
             
             if (response.ok) {
                 // Update global data
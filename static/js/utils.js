@@ -58,6 +58,19 @@ const UTILS = {
         return this.SHIFT_MAP[shiftCode] || shiftCode;
     },
 
+    // Replace SHIFT_MAP labels with the server's shift catalog (keeps the defaults on failure)
+    async loadShiftCatalog() {
+        try {
+            const response = await fetch('/api/shift-catalog');
+            const result = await response.json();
+            if (result.success) {
+                this.SHIFT_MAP = Object.fromEntries(result.shifts.map(shift => [shift.code, shift.label]));
+            }
+        } catch (error) {
+            console.warn('Could not load shift catalog, using default labels:', error);
+        }
+    },
+
     // Debounce function for search
     debounce(func, wait) {
         let timeout;
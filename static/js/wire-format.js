@@ -0,0 +1,38 @@
+// Compact roster wire format (?format=compact), shared by the roster viewer
+// and the admin dashboard; the server side is wire_format.py
+const WIRE_FORMAT = {
+    // Decode a compact roster back to { teams, headers, allEmployees };
+    // other payloads pass through
+    decodeRoster(data) {
+        if (!data || data.format !== 'compact') {
+            return data;
+        }
+        
+        const teams = {};
+        const allEmployees = [];
+        data.teams.forEach(teamName => {
+            teams[teamName] = [];
+        });
+        
+        data.employees.forEach(([name, id, teamIndex, schedule, allTeams]) => {
+            const teamName = data.teams[teamIndex];
+            const employee = {
+                name: name,
+                id: id,
+                team: teamName,
+                currentTeam: teamName,
+                // Sent only when it is not just the current team
+                allTeams: allTeams || [teamName],
+                schedule: Array.from(schedule, codeKey => data.shiftCodes[codeKey])
+            };
+            teams[teamName].push(employee);
+            allEmployees.push(employee);
+        });
+        
+        return {
+            teams: teams,
+            headers: data.headers,
+            allEmployees: allEmployees
+        };
+    }
+};
@@ -0,0 +1,93 @@
+# swap_candidates.py - Find swap partners across dates, shifts and teams
+#
+# ShiftDateIndex maps each date of the display roster to
+# {shift code: [(team, employee), ...]}, so "who works D1 on 3Oct" is one
+# dictionary lookup. It is built once per roster version (see ROSTER_VERSION
+# in app.py) and reused by every query until the roster changes.
+#
+# A query takes a requester, a date window, the shift codes they want
+# (wantShifts), optionally the shifts they are willing to give away
+# (yourShifts) and the teams to search, and returns one entry per candidate
+# with every date they could swap on.
+import threading
+
+from shift_catalog import SHIFT_CATALOG
+
+DEFAULT_LIMIT = 20
+
+class ShiftDateIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.dates = []   # per date index: {shift code: [(team name, employee)]}
+        self.version = None
+
+    def ensure(self, data, version):
+        """Rebuild the index if the roster version changed"""
+        with self.lock:
+            if self.version != version:
+                self.build(data)
+                self.version = version
+        return self
+
+    def build(self, data):
+        dates = [{} for _ in data.get('headers', [])]
+        for team_name, employees in data.get('teams', {}).items():
+            for employee in employees:
+                for by_shift, shift in zip(dates, employee.get('schedule', [])):
+                    by_shift.setdefault(shift, []).append((team_name, employee))
+        self.dates = dates
+
+    def working(self, date_index, shift):
+        """(team name, employee) pairs working shift on a date"""
+        if not 0 <= date_index < len(self.dates):
+            return []
+        return self.dates[date_index].get(shift, [])
+
+def find_swap_candidates(index, headers, requester, requester_team, date_window,
+                         want_shifts=None, your_shifts=None, teams=None, limit=DEFAULT_LIMIT):
+    """Rank employees who work one of want_shifts on a day the requester could give up
+
+    teams=None searches every team. Candidates from the requester's own team
+    come first, then those with the most matching days.
+    """
+    lo, hi = date_window
+    schedule = requester.get('schedule', [])
+    candidates = {}
+
+    for date_index in range(lo, hi):
+        your_shift = schedule[date_index] if date_index < len(schedule) else ''
+        if your_shifts and your_shift not in your_shifts:
+            continue
+        if want_shifts:
+            wanted = want_shifts
+        else:
+            wanted = [shift for shift in index.dates[date_index] if shift]
+        for shift in wanted:
+            if shift == your_shift:
+                continue
+            for team_name, employee in index.working(date_index, shift):
+                if employee['id'] == requester['id'] or (teams is not None and team_name not in teams):
+                    continue
+                candidate = candidates.get(employee['id'])
+                if candidate is None:
+                    candidate = candidates[employee['id']] = {
+                        'id': employee['id'],
+                        'name': employee.get('name', ''),
+                        'team': team_name,
+                        'sameTeam': team_name == requester_team,
+                        'matches': []
+                    }
+                candidate['matches'].append({
+                    'date': headers[date_index],
+                    'dateIndex': date_index,
+                    'yourShift': your_shift,
+                    'yourShiftDisplay': SHIFT_CATALOG.display(your_shift),
+                    'theirShift': shift,
+                    'theirShiftDisplay': SHIFT_CATALOG.display(shift)
+                })
+
+    ranked = sorted(candidates.values(), key=lambda c: (not c['sameTeam'], -len(c['matches']), c['name']))
+    return ranked[:limit], len(ranked)
+
+# Global instance, indexing the display roster
+SHIFT_DATE_INDEX = ShiftDateIndex()
@@ -0,0 +1,148 @@
+# swap_matching.py - Find chains of pending requests that can be approved together
+#
+# Every pending request becomes a "want" for one employee on one date:
+#
+#   shift change  employee moves from current_shift to requested_shift
+#   swap          requester moves from requester_shift to the target's shift,
+#                 and only the named target may hand it over
+#
+# On a given date, request u can take over from request v when v's employee
+# currently works the shift u wants (and v's employee is u's target, for a
+# swap). A cycle u1 -> u2 -> ... -> u1 is a rotation: everyone gets the shift
+# they asked for and every shift given up is taken by someone else, so
+# staffing is unchanged. Matching picks disjoint cycles, shortest first, one
+# date at a time.
+from collections import deque
+
+DEFAULT_MAX_CYCLE_LENGTH = 6
+
+def request_node(request, current_shift=None, require_current=False):
+    """The (employee, from, to, target) want of a pending request
+
+    current_shift(employee_id, date) gives the roster's shift, which wins
+    over the shift recorded when the request was submitted. With
+    require_current, a request whose employee or date is no longer in the
+    roster raises ValueError instead of falling back to the recorded shift.
+    """
+    if request['type'] == 'swap':
+        employee_id = request['requester_id']
+        node = {'from': request.get('requester_shift', ''), 'to': request.get('target_shift', ''),
+                'target': request.get('target_employee_id'), 'name': request.get('requester_name', '')}
+    else:
+        employee_id = request['employee_id']
+        node = {'from': request.get('current_shift', ''), 'to': request.get('requested_shift', ''),
+                'target': None, 'name': request.get('employee_name', '')}
+    if current_shift is not None:
+        actual = current_shift(employee_id, request['date'])
+        if actual is not None:
+            node['from'] = actual
+        elif require_current:
+            raise ValueError(f"Request {request['id']}: employee {employee_id} or date {request['date']} "
+                             f"is no longer in the roster")
+    node.update(id=request['id'], type=request['type'], employee_id=employee_id, date=request['date'])
+    return node
+
+def can_take_from(taker, giver):
+    """Whether taker can get giver's current shift"""
+    return (taker['employee_id'] != giver['employee_id']
+            and taker['to'] == giver['from']
+            and (taker['target'] is None or taker['target'] == giver['employee_id']))
+
+class DateMatcher:
+    """Cycle search among the requests of one date"""
+    def __init__(self, nodes, max_length=DEFAULT_MAX_CYCLE_LENGTH):
+        self.nodes = [node for node in nodes if node['from'] != node['to']]
+        self.max_length = max_length
+        self.by_from = {}
+        for index, node in enumerate(self.nodes):
+            self.by_from.setdefault(node['from'], []).append(index)
+        self.used = set()
+
+    def successors(self, index):
+        taker = self.nodes[index]
+        for giver in self.by_from.get(taker['to'], ()):
+            if giver not in self.used and can_take_from(taker, self.nodes[giver]):
+                yield giver
+
+    def shortest_cycle(self, start):
+        """Shortest cycle through start over unused requests, as node indexes"""
+        parents = {start: None}
+        depth = {start: 1}
+        queue = deque([start])
+        while queue:
+            index = queue.popleft()
+            if depth[index] >= self.max_length:
+                continue
+            for successor in self.successors(index):
+                if successor == start:
+                    cycle = []
+                    step = index
+                    while step is not None:
+                        cycle.append(step)
+                        step = parents[step]
+                    cycle.reverse()
+                    employees = [self.nodes[i]['employee_id'] for i in cycle]
+                    if len(set(employees)) == len(employees):
+                        return cycle
+                    continue
+                if successor not in parents:
+                    parents[successor] = index
+                    depth[successor] = depth[index] + 1
+                    queue.append(successor)
+        return None
+
+    def match(self):
+        """Disjoint cycles, each employee in at most one, shortest found first"""
+        cycles = []
+        busy_employees = set()
+        for start in range(len(self.nodes)):
+            if start in self.used or self.nodes[start]['employee_id'] in busy_employees:
+                continue
+            cycle = self.shortest_cycle(start)
+            if cycle is None or busy_employees.intersection(self.nodes[i]['employee_id'] for i in cycle):
+                continue
+            cycles.append([self.nodes[i] for i in cycle])
+            self.used.update(cycle)
+            busy_employees.update(self.nodes[i]['employee_id'] for i in cycle)
+            # An employee's other requests on this date can no longer be used
+            for index, node in enumerate(self.nodes):
+                if node['employee_id'] in busy_employees:
+                    self.used.add(index)
+        return cycles
+
+def find_matches(pending_requests, current_shift=None, max_length=DEFAULT_MAX_CYCLE_LENGTH):
+    """Matched request sets across all dates, oldest requests tried first"""
+    by_date = {}
+    for request in sorted(pending_requests, key=lambda r: r.get('created_at') or ''):
+        by_date.setdefault(request['date'], []).append(request_node(request, current_shift))
+
+    matches = []
+    for date, nodes in by_date.items():
+        for cycle in DateMatcher(nodes, max_length).match():
+            matches.append({
+                'date': date,
+                'requestIds': [node['id'] for node in cycle],
+                'length': len(cycle),
+                'moves': [{'requestId': node['id'], 'type': node['type'], 'employeeId': node['employee_id'],
+                           'employeeName': node['name'], 'from': node['from'], 'to': node['to']} for node in cycle]
+            })
+    return matches
+
+def check_match(requests, current_shift=None):
+    """Nodes of requests if, in this order or any rotation of it, they form one
+    cycle on one date; raises ValueError otherwise"""
+    if len(requests) < 2:
+        raise ValueError("A matched set needs at least two requests")
+    if any(request.get('status') != 'pending' for request in requests):
+        raise ValueError("Every request in the set must be pending")
+    if len({request['date'] for request in requests}) != 1:
+        raise ValueError("Every request in the set must be for the same date")
+
+    nodes = [request_node(request, current_shift, require_current=current_shift is not None) for request in requests]
+    if len({node['employee_id'] for node in nodes}) != len(nodes):
+        raise ValueError("An employee appears more than once in the set")
+    for taker, giver in zip(nodes, nodes[1:] + nodes[:1]):
+        if not can_take_from(taker, giver):
+            raise ValueError(f"Request {taker['id']} cannot take {giver['employee_id']}'s shift "
+                             f"({giver['from'] or 'N/A'}, wanted {taker['to'] or 'N/A'})")
+    return nodes
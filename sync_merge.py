@@ -0,0 +1,57 @@
+# sync_merge.py - Merge a freshly synced Google roster with the admin overlay
+#
+# The admin view is always Google data + overlay, so a sync only has to fold
+# the new Google roster into the overlay (RosterOverlay.reconcile) and then
+# rebuild the view. This module does that and reports what the sync changed,
+# by diffing the previous Google roster against the new one:
+#
+#   newEmployees / removedEmployees / movedEmployees / renamedEmployees
+#   headersAdded / headersRemoved      new or dropped month columns
+#   changedCells                       Google cells that changed value on
+#                                      dates both rosters have
+#   overlay                            overrides adopted or dropped, and how
+#                                      many admin cells are kept for dates the
+#                                      roster no longer has
+#
+# Everything is one pass over each roster with id and header lookups.
+from roster_diff import diff_rosters
+
+MAX_LISTED = 100
+
+def cells_outside(overlay, headers):
+    """Admin cell overrides whose date is not among headers"""
+    header_set = set(headers)
+    with overlay.lock:
+        return sum(1 for months in overlay.data['cells'].values()
+                   for month_cells in months.values()
+                   for header in month_cells if header not in header_set)
+
+def merge_sync(overlay, old_base, new_base):
+    """Reconcile overlay with new_base; returns the sync summary"""
+    diff = diff_rosters(old_base or {}, new_base)
+    reconciled = overlay.reconcile(new_base)
+    # Cells of new dates are reported through headersAdded, not as changes
+    new_dates = set(diff['headersAdded'])
+    changed_cells = sum(1 for cell in diff['changed'] if diff['headers'][cell[1]] not in new_dates)
+    summary = {
+        'counts': {
+            'newEmployees': len(diff['added']),
+            'removedEmployees': len(diff['removed']),
+            'movedEmployees': len(diff['moved']),
+            'renamedEmployees': len(diff['renamed']),
+            'headersAdded': len(diff['headersAdded']),
+            'headersRemoved': len(diff['headersRemoved']),
+            'changedCells': changed_cells
+        },
+        'newEmployees': diff['added'][:MAX_LISTED],
+        'removedEmployees': diff['removed'][:MAX_LISTED],
+        'movedEmployees': diff['moved'][:MAX_LISTED],
+        'renamedEmployees': diff['renamed'][:MAX_LISTED],
+        'headersAdded': diff['headersAdded'],
+        'headersRemoved': diff['headersRemoved'],
+        'overlay': dict(reconciled,
+                        cells=overlay.cell_count(),
+                        cellsOutsideRoster=cells_outside(overlay, new_base.get('headers', [])))
+    }
+    summary['changed'] = any(summary['counts'].values()) or any(reconciled.values())
+    return summary
@@ -0,0 +1,110 @@
+# sync_trace.py - Phase-level trace reports for Google Sheets sync runs
+import json
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
+
+SYNC_TRACES_FILE = 'data/sync_traces.json'
+MAX_SYNC_TRACES = 50
+
+class SyncTrace:
+    def __init__(self, triggered_by=None):
+        self.started_at = datetime.now().isoformat()
+        self.triggered_by = triggered_by
+        self.status = 'running'
+        self.error = None
+        self.total_ms = 0.0
+        self.phases = {}     # phase name -> accumulated milliseconds, in first-seen order
+        self.fetches = []    # one entry per Google Sheets URL
+        self.counters = {}   # rows_parsed, employees_merged, ...
+        self._start = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name):
+        """Time a block of code, adding to any earlier time for the same phase"""
+        # Register the phase on entry so nested phases are listed after their parent
+        self.phases.setdefault(name, 0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_phase_time(name, time.perf_counter() - start)
+
+    def add_phase_time(self, name, seconds):
+        self.phases[name] = self.phases.get(name, 0.0) + seconds * 1000
+
+    def record_fetch(self, url, seconds, size, ok, error=None):
+        """Record the outcome of fetching one sheet"""
+        self.fetches.append({
+            'url': url,
+            'ms': round(seconds * 1000, 2),
+            'bytes': size,
+            'ok': ok,
+            'error': error
+        })
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def finish(self, status='success', error=None):
+        """Close the trace with its final status"""
+        self.status = status
+        self.error = error
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_dict(self):
+        return {
+            'started_at': self.started_at,
+            'triggered_by': self.triggered_by,
+            'status': self.status,
+            'error': self.error,
+            'total_ms': round(self.total_ms, 2),
+            'phases': [{'name': name, 'ms': round(ms, 2)} for name, ms in self.phases.items()],
+            'fetches': self.fetches,
+            'counters': self.counters
+        }
+
+class SyncTraceHistory:
+    def __init__(self, max_traces=MAX_SYNC_TRACES):
+        self.lock = threading.Lock()
+        self.traces = deque(maxlen=max_traces)
+        self.load_traces()
+
+    def load_traces(self):
+        """Load the trace history from file"""
+        try:
+            if os.path.exists(SYNC_TRACES_FILE):
+                with open(SYNC_TRACES_FILE, 'r', encoding='utf-8') as f:
+                    self.traces.extend(json.load(f))
+        except Exception:
+            logger.exception("Error loading sync traces")
+
+    def save_traces(self):
+        """Save the trace history to file"""
+        try:
+            os.makedirs('data', exist_ok=True)
+            with open(SYNC_TRACES_FILE, 'w', encoding='utf-8') as f:
+                json.dump(list(self.traces), f, indent=2, ensure_ascii=False)
+        except Exception:
+            logger.exception("Error saving sync traces")
+
+    def add(self, trace):
+        """Store a finished trace, dropping the oldest once the history is full"""
+        with self.lock:
+            self.traces.append(trace.to_dict())
+            self.save_traces()
+
+    def recent(self, limit=None):
+        """Get traces newest first"""
+        with self.lock:
+            traces = list(reversed(self.traces))
+        return traces[:limit] if limit else traces
+
+# Global instance
+SYNC_TRACES = SyncTraceHistory()
@@ -0,0 +1,61 @@
+# wire_format.py - Compact JSON encoding of roster responses
+#
+# The default roster response repeats every employee under 'teams' and
+# 'allEmployees', each with its schedule spelled out as shift strings. The
+# compact format (requested with ?format=compact) sends each employee once:
+#
+#   {
+#     'format': 'compact',
+#     'version': 2,
+#     'headers': ['1Oct', ...],
+#     'teams': ['VOICE', ...],
+#     'shiftCodes': {'0': '', '1': 'M2', '2': 'DO', ...},
+#     'employees': [[name, id, team index, '1120...', allTeams?], ...]
+#   }
+#
+# A schedule is a string with one character per date; each character is a
+# key of 'shiftCodes'. Keys are handed out as new shift codes are met; past
+# the 62 alphanumeric keys, code n gets chr(0x100 + n). allTeams (a list of
+# team names) is appended only when it is not just [team]; version 1 never
+# sent it. Employees are listed in team order. WIRE_FORMAT.decodeRoster in
+# static/js/wire-format.js rebuilds 'teams', 'headers' and 'allEmployees',
+# with each employee's team and currentTeam set from its team index.
+import json
+
+COMPACT_FORMAT = 'compact'
+COMPACT_FORMAT_VERSION = 2
+CODE_ALPHABET = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz'
+
+def code_key(index):
+    """Single-character key of the index-th shift code"""
+    return CODE_ALPHABET[index] if index < len(CODE_ALPHABET) else chr(0x100 + index)
+
+def encode_roster(data):
+    """Encode a {'teams', 'headers', 'allEmployees'} roster in the compact format"""
+    teams = list(data.get('teams', {}))
+    code_keys = {'': code_key(0)}
+    employees = []
+
+    for team_index, team_name in enumerate(teams):
+        for employee in data['teams'][team_name]:
+            schedule = employee.get('schedule', [])
+            for shift in set(schedule).difference(code_keys):
+                code_keys[shift] = code_key(len(code_keys))
+            row = [employee.get('name', ''), employee['id'], team_index, ''.join(map(code_keys.__getitem__, schedule))]
+            all_teams = employee.get('allTeams', [team_name])
+            if all_teams != [team_name]:
+                row.append(all_teams)
+            employees.append(row)
+
+    return {
+        'format': COMPACT_FORMAT,
+        'version': COMPACT_FORMAT_VERSION,
+        'headers': data.get('headers', []),
+        'teams': teams,
+        'shiftCodes': {key: shift for shift, key in code_keys.items()},
+        'employees': employees
+    }
+
+def dumps_compact(payload):
+    """Serialize without whitespace or key sorting"""
+    return json.dumps(payload, ensure_ascii=False, separators=(',', ':'))
@@ -0,0 +1,129 @@
+# workload_report.py - Per-employee and per-team monthly workload, computed with NumPy
+#
+# One month of the roster is encoded as an (employees x dates) array of shift
+# code indexes (see staffing_coverage.schedule_matrix). Per-code lookup
+# arrays from the shift catalog turn it into hours and category masks, so
+# every employee's totals and streaks come out of a handful of array
+# operations instead of a loop per cell.
+#
+# Reports are cached per month and dropped when the roster version or the
+# shift catalog changes.
+import threading
+
+import numpy as np
+
+from metrics import METRICS
+from shift_catalog import SHIFT_CATALOG, WORK_CATEGORIES
+from staffing_coverage import schedule_matrix
+
+# A working streak longer than this is reported under 'longStreaks'
+MAX_CONSECUTIVE_DAYS = 6
+
+def run_lengths(mask):
+    """Length of the run of True ending at each cell, along axis 1"""
+    positions = np.arange(mask.shape[1])
+    last_false = np.maximum.accumulate(np.where(mask, -1, positions), axis=1)
+    return np.where(mask, positions - last_false, 0)
+
+def spread(values):
+    """min/max/mean/std of a 1-d array, for team fairness figures"""
+    if not len(values):
+        return {'min': 0, 'max': 0, 'mean': 0, 'std': 0}
+    return {
+        'min': round(float(values.min()), 2),
+        'max': round(float(values.max()), 2),
+        'mean': round(float(values.mean()), 2),
+        'std': round(float(values.std()), 2)
+    }
+
+class WorkloadReports:
+    def __init__(self, catalog=SHIFT_CATALOG, max_consecutive_days=MAX_CONSECUTIVE_DAYS):
+        self.catalog = catalog
+        self.max_consecutive_days = max_consecutive_days
+        self.lock = threading.Lock()
+        self.cache = {}   # month key -> report
+        self.cache_key = None
+
+    def month_report(self, data, version, month, month_key):
+        """Report of one month of data, from cache when nothing changed"""
+        key = (version, self.catalog.version)
+        with self.lock:
+            if self.cache_key != key:
+                self.cache = {}
+                self.cache_key = key
+            if month not in self.cache:
+                with METRICS.timer('workload_report'):
+                    self.cache[month] = self.build(data, month, month_key)
+            return self.cache[month]
+
+    def build(self, data, month, month_key):
+        headers = data.get('headers', [])
+        dates = [i for i, header in enumerate(headers) if month_key(header) == month]
+        lo, hi = (dates[0], dates[-1] + 1) if dates else (0, 0)
+
+        teams = list(data.get('teams', {}))
+        employees = []
+        team_of_employee = []
+        for team_index, team_name in enumerate(teams):
+            for employee in data['teams'][team_name]:
+                employees.append(dict(employee, schedule=employee.get('schedule', [])[lo:hi]))
+                team_of_employee.append(team_index)
+
+        matrix, codes = schedule_matrix(employees, hi - lo)
+        categories = np.array([self.catalog.category(code) for code in codes])
+        hours = np.array([self.catalog.hours(code) for code in codes])[matrix]
+        working = np.isin(categories, WORK_CATEGORIES)[matrix]
+        off = (categories == 'off')[matrix]
+        leave = (categories == 'leave')[matrix]
+        night = (categories == 'night')[matrix]
+
+        streaks = run_lengths(working)
+        # A run ends where the next day is not a working day (or the month ends)
+        run_ends = working & ~np.concatenate([working[:, 1:], np.zeros((len(employees), 1), dtype=bool)], axis=1)
+        long_streaks = (run_ends & (streaks > self.max_consecutive_days)).sum(axis=1)
+
+        totals = {
+            'hours': hours.sum(axis=1),
+            'workDays': working.sum(axis=1),
+            'offDays': off.sum(axis=1),
+            'leaveDays': leave.sum(axis=1),
+            'nightShifts': night.sum(axis=1),
+            'longestStreak': streaks.max(axis=1) if hi > lo else np.zeros(len(employees), dtype=int),
+            'longStreaks': long_streaks
+        }
+
+        employee_rows = []
+        for row, employee in enumerate(employees):
+            entry = {'id': employee['id'], 'name': employee.get('name', ''), 'team': teams[team_of_employee[row]]}
+            for name, values in totals.items():
+                entry[name] = round(float(values[row]), 2) if name == 'hours' else int(values[row])
+            employee_rows.append(entry)
+
+        team_ids = np.asarray(team_of_employee, dtype=np.int64)
+        team_rows = {}
+        for team_index, team_name in enumerate(teams):
+            members = team_ids == team_index
+            team_rows[team_name] = {
+                'employees': int(members.sum()),
+                'hours': round(float(totals['hours'][members].sum()), 2),
+                'offDays': int(totals['offDays'][members].sum()),
+                'leaveDays': int(totals['leaveDays'][members].sum()),
+                'nightShifts': int(totals['nightShifts'][members].sum()),
+                'longestStreak': int(totals['longestStreak'][members].max()) if members.any() else 0,
+                'longStreaks': int(totals['longStreaks'][members].sum()),
+                'hoursSpread': spread(totals['hours'][members]),
+                'nightShiftSpread': spread(totals['nightShifts'][members]),
+                'offDaySpread': spread(totals['offDays'][members])
+            }
+
+        return {
+            'month': month,
+            'headers': headers[lo:hi],
+            'dateOffset': lo,
+            'maxConsecutiveDays': self.max_consecutive_days,
+            'employees': employee_rows,
+            'teams': team_rows
+        }
+
+# Global instance
+WORKLOAD_REPORTS = WorkloadReports()